@@ -0,0 +1,8 @@
+"""
+A2A Protocol Benchmarks
+
+Standalone throughput benchmarks for the A2A core components. Run a
+benchmark from the repository root, e.g.:
+
+    python -m adk_agents.a2a.benchmarks.bench_message_queue
+"""
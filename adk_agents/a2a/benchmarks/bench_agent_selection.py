@@ -0,0 +1,175 @@
+"""
+Load-aware Agent Selection Benchmark
+
+Simulates an orchestrator assigning tasks to a pool of workers (50 by
+default) that all offer the same capability, once per selection
+strategy. Workers handle one task at a time, some of them several times
+slower than the rest, and report their load to a DiscoveryService with
+a heartbeat every --heartbeat seconds. Tasks arrive at random at a fixed
+fraction of the pool's total capacity. The simulation runs in virtual
+time, so results do not depend on the machine; it reports throughput,
+task latency percentiles (queueing plus service) and the real time spent
+per selection.
+"""
+
+import argparse
+import heapq
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import deque
+
+from adk_agents.a2a.core.discovery import DiscoveryService, AgentRecord
+from adk_agents.a2a.core.discovery_cache import DiscoveryCache
+from adk_agents.a2a.core.load_balancing import AgentSelector, LoadTracker, STRATEGIES
+
+ARRIVAL, DONE, HEARTBEAT = 0, 1, 2
+
+
+class Worker:
+    def __init__(self, agent_id: str, mean_service: float):
+        self.agent_id = agent_id
+        self.mean_service = mean_service
+        self.queue = deque()  # (task arrival time, workflow)
+        self.busy = False
+        self.load = LoadTracker()
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def simulate(args, strategy: str, registry_file: str):
+    rng = random.Random(args.seed)
+    discovery = DiscoveryService(registry_file)
+    cache = DiscoveryCache(discovery)
+    selector = AgentSelector(discovery.get_agent_load, strategy, rng=random.Random(args.seed))
+
+    workers = {}
+    slow = set(rng.sample(range(args.workers), int(args.workers * args.slow_fraction)))
+    for i in range(args.workers):
+        agent_id = f"worker-{i:03d}"
+        mean = args.service_time * (args.slow_factor if i in slow else 1)
+        workers[agent_id] = Worker(agent_id, mean)
+        discovery.register_agent(AgentRecord(agent_id=agent_id, agent_did=f"did:a2a:{agent_id}",
+                                             capabilities=["work"], endpoints=[], metadata={}))
+
+    capacity = sum(1 / worker.mean_service for worker in workers.values())
+    arrival_rate = capacity * args.utilization
+
+    events = []
+    seq = 0
+
+    def schedule(at, kind, data=None):
+        nonlocal seq
+        seq += 1
+        heapq.heappush(events, (at, seq, kind, data))
+
+    def begin(worker, now):
+        worker.busy = True
+        worker.load.inflight += 1
+        schedule(now + rng.expovariate(1 / worker.mean_service), DONE, (worker, now))
+
+    for worker in workers.values():
+        schedule(rng.uniform(0, args.heartbeat), HEARTBEAT, worker)
+
+    now = 0.0
+    schedule(rng.expovariate(arrival_rate), ARRIVAL)
+    arrived = 0
+    latencies = []
+    selection_time = 0.0
+    max_queue = 0
+
+    while len(latencies) < args.tasks:
+        now, _, kind, data = heapq.heappop(events)
+
+        if kind == ARRIVAL:
+            arrived += 1
+            if arrived < args.tasks:
+                schedule(now + rng.expovariate(arrival_rate), ARRIVAL)
+
+            workflow = f"workflow-{rng.randrange(args.workflows)}"
+            start = time.perf_counter()
+            candidates = cache.find(["work"], max_results=args.workers)
+            worker = workers[selector.select(candidates, key=workflow).agent_id]
+            selector.acquire(worker.agent_id)
+            selection_time += time.perf_counter() - start
+
+            worker.queue.append(now)
+            max_queue = max(max_queue, len(worker.queue))
+            if not worker.busy:
+                begin(worker, now)
+
+        elif kind == DONE:
+            worker, started = data
+            arrival = worker.queue.popleft()
+            latencies.append(now - arrival)
+            worker.load.inflight -= 1
+            worker.load.observe(now - started)
+            selector.release(worker.agent_id)
+            worker.busy = False
+            if worker.queue:
+                begin(worker, now)
+
+        else:
+            worker = data
+            waiting = len(worker.queue) - worker.busy
+            discovery.heartbeat(worker.agent_id, worker.load.snapshot(waiting))
+            schedule(now + args.heartbeat, HEARTBEAT, worker)
+
+    cache.close()
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / now,
+        "offered": arrival_rate,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "p999": percentile(latencies, 0.999),
+        "max_queue": max_queue,
+        "selection_us": selection_time / args.tasks * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=50,
+                        help="Number of worker agents (default: 50)")
+    parser.add_argument("--tasks", type=int, default=50000,
+                        help="Tasks per strategy (default: 50000)")
+    parser.add_argument("--utilization", type=float, default=0.85,
+                        help="Arrival rate as a fraction of pool capacity (default: 0.85)")
+    parser.add_argument("--service-time", type=float, default=0.02,
+                        help="Mean task time on a fast worker, in seconds (default: 0.02)")
+    parser.add_argument("--slow-fraction", type=float, default=0.2,
+                        help="Fraction of workers that are slow (default: 0.2)")
+    parser.add_argument("--slow-factor", type=float, default=4.0,
+                        help="How many times slower the slow workers are (default: 4)")
+    parser.add_argument("--heartbeat", type=float, default=1.0,
+                        help="Seconds between load reports (default: 1.0)")
+    parser.add_argument("--workflows", type=int, default=500,
+                        help="Distinct workflow IDs, the affinity key (default: 500)")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help="Comma-separated strategies to compare (default: all)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print(f"{args.workers} workers ({args.slow_fraction:.0%} {args.slow_factor:g}x slower), "
+          f"{args.utilization:.0%} utilization, heartbeat every {args.heartbeat:g}s, "
+          f"{args.tasks:,} tasks")
+    print(f"{'strategy':<14}{'tasks/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'p99.9 ms':>10}"
+          f"{'max queue':>11}{'select us':>11}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for strategy in args.strategies.split(","):
+            result = simulate(args, strategy, os.path.join(tmp, f"{strategy}.json"))
+            print(f"{strategy:<14}{result['throughput']:>10,.0f}{result['p50'] * 1000:>10.1f}"
+                  f"{result['p99'] * 1000:>10.1f}{result['p999'] * 1000:>10.1f}"
+                  f"{result['max_queue']:>11,}{result['selection_us']:>11.1f}")
+        print(f"(offered load {result['offered']:,.0f} tasks/s)")
+
+
+if __name__ == "__main__":
+    main()
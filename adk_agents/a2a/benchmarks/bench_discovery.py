@@ -0,0 +1,122 @@
+"""
+Agent Discovery Query Benchmark
+
+Measures DiscoveryService.discover_agents latency at 10k and 100k
+registered agents for typical queries (by agent_id, by rare and common
+capability, capability intersections, status only), comparing the
+indexed query planner with the previous approach of filtering a copy of
+the whole registry.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from typing import List
+
+from adk_agents.a2a.core.discovery import AgentRecord, DiscoveryService, ServiceQuery
+
+
+def linear_discover(service: DiscoveryService, query: ServiceQuery) -> List[AgentRecord]:
+    """The previous discover_agents: copy the registry and filter it in four passes."""
+
+    candidates = list(service.agents.values())
+    if query.agent_id:
+        candidates = [agent for agent in candidates if agent.agent_id == query.agent_id]
+    if query.status:
+        candidates = [agent for agent in candidates if agent.status == query.status]
+    if query.capabilities:
+        candidates = [agent for agent in candidates
+                      if all(agent.has_capability(cap) for cap in query.capabilities)]
+    candidates = [agent for agent in candidates if not agent.is_expired()]
+    return candidates[:query.max_results]
+
+
+def build_registry(count: int, capability_count: int, seed: int) -> DiscoveryService:
+    """Load a synthetic registry through the service's own registry file loader."""
+
+    rng = random.Random(seed)
+    # Zipf-like capability popularity: a few very common, a long tail of rare ones
+    weights = [1.0 / (rank + 1) for rank in range(capability_count)]
+    capabilities = [f"capability-{rank}" for rank in range(capability_count)]
+    now = datetime.utcnow().isoformat()
+
+    agents = []
+    for i in range(count):
+        roll = rng.random()
+        agents.append({
+            "agent_id": f"agent-{i}",
+            "agent_did": f"did:a2a:agent-{i}",
+            "capabilities": sorted(set(rng.choices(capabilities, weights, k=3))),
+            "endpoints": [f"https://agent-{i}.local:8443"],
+            "metadata": {"region": rng.choice(["us", "eu", "ap"])},
+            "registered_at": now,
+            "last_seen": now,
+            "status": "active" if roll < 0.9 else "inactive" if roll < 0.98 else "suspended",
+            "ttl": 3600,
+        })
+
+    path = os.path.join(tempfile.mkdtemp(prefix="a2a-discovery-"), "agent_registry.json")
+    with open(path, "w") as f:
+        json.dump({"agents": agents}, f)
+    return DiscoveryService(registry_file=path)
+
+
+def time_query(discover, service: DiscoveryService, query: ServiceQuery, min_time: float) -> float:
+    """Average seconds per call, repeating until min_time has elapsed."""
+
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        discover(service, query)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000],
+                        help="Registry sizes to test (default: 10000 100000)")
+    parser.add_argument("--capabilities", type=int, default=500,
+                        help="Distinct capabilities in the registry (default: 500)")
+    parser.add_argument("--min-time", type=float, default=0.3,
+                        help="Seconds to run each query variant (default: 0.3)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    queries = [
+        ("agent_id", ServiceQuery(agent_id="agent-4242", include_metadata=True)),
+        ("rare capability", ServiceQuery(capabilities=["capability-400"], include_metadata=True)),
+        ("common capability", ServiceQuery(capabilities=["capability-0"], include_metadata=True)),
+        ("two capabilities", ServiceQuery(capabilities=["capability-0", "capability-7"],
+                                          include_metadata=True)),
+        ("status only", ServiceQuery(status="suspended", include_metadata=True)),
+    ]
+
+    for size in args.sizes:
+        service = build_registry(size, args.capabilities, seed=size)
+        print(f"\n{size:,} agents")
+        print(f"{'query':<20} {'results':>8} {'linear us':>12} {'indexed us':>12} {'speedup':>9}")
+
+        for name, query in queries:
+            # Same matches, in any order, when the result limit is lifted
+            unlimited = ServiceQuery(query.capabilities, query.agent_id, query.status,
+                                     max_results=size, include_metadata=True)
+            expected = {agent.agent_id for agent in linear_discover(service, unlimited)}
+            assert {agent.agent_id for agent in service.discover_agents(unlimited)} == expected
+
+            linear = time_query(linear_discover, service, query, args.min_time)
+            indexed = time_query(DiscoveryService.discover_agents, service, query, args.min_time)
+            results = len(service.discover_agents(query))
+            print(f"{name:<20} {results:>8} {linear * 1e6:>12,.1f} {indexed * 1e6:>12,.1f} "
+                  f"{linear / indexed:>8,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Message Encryption Throughput Benchmark
+
+Measures encrypt/decrypt throughput of MessageEncryptor in messages per
+second and MB/s for small and large payloads, comparing the binary frame
+used by HTTP/2 with the base64 JSON envelope. The per-message Cipher
+construction it replaced is included as a baseline.
+"""
+
+import argparse
+import base64
+import json
+import os
+import time
+from datetime import datetime
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from adk_agents.a2a.core.messaging import EncryptedMessage, Message, MessageEncryptor
+
+
+class LegacyEncryptor:
+    """The previous encryptor: a new Cipher per message and sorted JSON, kept as a baseline."""
+
+    def encrypt(self, message: Message, session_key: bytes) -> str:
+        message_json = json.dumps(message.to_dict(), sort_keys=True)
+        iv = os.urandom(12)
+        encryptor = Cipher(algorithms.AES(session_key), modes.GCM(iv),
+                           backend=default_backend()).encryptor()
+        ciphertext = encryptor.update(message_json.encode()) + encryptor.finalize()
+        return json.dumps({
+            "encrypted_data": base64.b64encode(ciphertext).decode(),
+            "iv": base64.b64encode(iv).decode(),
+            "auth_tag": base64.b64encode(encryptor.tag).decode(),
+        })
+
+    def decrypt(self, wire: str, session_key: bytes) -> Message:
+        data = json.loads(wire)
+        decryptor = Cipher(algorithms.AES(session_key),
+                           modes.GCM(base64.b64decode(data["iv"]), base64.b64decode(data["auth_tag"])),
+                           backend=default_backend()).decryptor()
+        plaintext = decryptor.update(base64.b64decode(data["encrypted_data"])) + decryptor.finalize()
+        return Message.from_dict(json.loads(plaintext.decode()))
+
+
+def make_message(payload_bytes: int) -> Message:
+    return Message(
+        message_id="bench",
+        sender_id="agent-a",
+        receiver_id="agent-b",
+        message_type="task_request",
+        payload={"blob": "x" * payload_bytes},
+        timestamp=datetime.utcnow(),
+    )
+
+
+def run_current(message: Message, key: bytes, count: int, binary: bool):
+    encryptor = MessageEncryptor()
+    wire_bytes = 0
+
+    start = time.perf_counter()
+    for _ in range(count):
+        encrypted = encryptor.encrypt_message(message, key)
+        if binary:
+            wire = encrypted.to_frame()
+            received = EncryptedMessage.from_frame(wire)
+        else:
+            wire = json.dumps(encrypted.to_dict()).encode()
+            received = EncryptedMessage.from_dict(json.loads(wire))
+        wire_bytes += len(wire)
+        encryptor.decrypt_message(received, key)
+    return time.perf_counter() - start, wire_bytes
+
+
+def run_legacy(message: Message, key: bytes, count: int):
+    encryptor = LegacyEncryptor()
+    wire_bytes = 0
+
+    start = time.perf_counter()
+    for _ in range(count):
+        wire = encryptor.encrypt(message, key)
+        wire_bytes += len(wire)
+        encryptor.decrypt(wire, key)
+    return time.perf_counter() - start, wire_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--small", type=int, default=256,
+                        help="Small payload size in bytes (default: 256)")
+    parser.add_argument("--large", type=int, default=1024 * 1024,
+                        help="Large payload size in bytes (default: 1 MiB)")
+    parser.add_argument("--count", type=int, default=20000,
+                        help="Round trips for the small payload (default: 20000)")
+    parser.add_argument("--large-count", type=int, default=200,
+                        help="Round trips for the large payload (default: 200)")
+    args = parser.parse_args()
+
+    key = os.urandom(32)
+    print(f"{'variant':<14} {'payload':>10} {'msg/s':>12} {'MB/s':>10} {'wire/msg':>12}")
+
+    for payload, count in ((args.small, args.count), (args.large, args.large_count)):
+        message = make_message(payload)
+        runs = [
+            ("legacy-json", run_legacy(message, key, count)),
+            ("aesgcm-json", run_current(message, key, count, binary=False)),
+            ("aesgcm-frame", run_current(message, key, count, binary=True)),
+        ]
+        for name, (elapsed, wire_bytes) in runs:
+            print(f"{name:<14} {payload:>10,} {count / elapsed:>12,.0f} "
+                  f"{payload * count / elapsed / 1e6:>10,.1f} {wire_bytes // count:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Gossip Peer Discovery Benchmark
+
+Runs N PeerDiscoveryService nodes on localhost in one process and
+measures how long the group takes to converge: every node seeing every
+member after joining, an agent published on one node reaching all
+others, a crashed node being declared dead (its agents dropped
+everywhere) and a node leaving gracefully. Reports gossip bandwidth per
+node alongside.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from typing import Callable, List
+
+from adk_agents.a2a.core.discovery import AgentRecord, PeerDiscoveryService, ServiceQuery
+from adk_agents.a2a.core.gossip import ALIVE, DEAD, GossipConfig
+
+
+async def wait_until(condition: Callable[[], bool], timeout: float) -> float:
+    """Seconds until condition() holds, polling every few milliseconds."""
+
+    start = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - start > timeout:
+            raise TimeoutError("group did not converge")
+        await asyncio.sleep(0.005)
+    return time.perf_counter() - start
+
+
+def bytes_sent(nodes: List[PeerDiscoveryService]) -> int:
+    return sum(node.node.stats["bytes_sent"] for node in nodes)
+
+
+async def run(args) -> None:
+    config = GossipConfig(protocol_period=args.period, probe_timeout=args.period / 4,
+                          sync_interval=0)
+    nodes = [PeerDiscoveryService(f"node-{i}", config=config) for i in range(args.nodes)]
+
+    await nodes[0].start_discovery()
+    for node in nodes[1:]:
+        node.add_known_peer(nodes[0].address)
+    start = time.perf_counter()
+    await asyncio.gather(*(node.start_discovery() for node in nodes[1:]))
+
+    def all_members_alive(group, count):
+        return all(sum(m.state == ALIVE for m in node.node.members.values()) == count
+                   for node in group)
+
+    await wait_until(lambda: all_members_alive(nodes, args.nodes), args.timeout)
+    join_time = time.perf_counter() - start
+    print(f"{args.nodes} nodes, protocol period {args.period}s")
+    print(f"join: all members known everywhere after {join_time * 1000:.0f} ms")
+
+    # Steady-state bandwidth with nothing changing
+    before, start = bytes_sent(nodes), time.perf_counter()
+    await asyncio.sleep(args.period * 5)
+    idle_rate = (bytes_sent(nodes) - before) / (time.perf_counter() - start) / len(nodes)
+    print(f"idle: {idle_rate:,.0f} bytes/s per node")
+
+    # Agent publication
+    publisher = random.choice(nodes)
+    record = AgentRecord(agent_id="bench-agent", agent_did="did:a2a:bench-agent",
+                         capabilities=["analysis"], endpoints=["https://bench.local:8443"],
+                         metadata={})
+    before = bytes_sent(nodes)
+    publisher.publish_agent(record)
+    elapsed = await wait_until(
+        lambda: all("bench-agent" in node.discovered_agents for node in nodes), args.timeout)
+    print(f"publish: agent known on every node after {elapsed * 1000:.0f} ms "
+          f"({(bytes_sent(nodes) - before) / len(nodes):,.0f} bytes/node meanwhile)")
+    found = await nodes[0].query_peers(ServiceQuery(capabilities=["analysis"]))
+    assert [agent.agent_id for agent in found] == ["bench-agent"]
+
+    # Crash: the node stops answering without announcing it
+    survivors = [node for node in nodes if node is not publisher]
+    await publisher.node.stop(leave=False)
+    elapsed = await wait_until(
+        lambda: all(node.node.members[publisher.local_agent_id].state == DEAD and
+                    "bench-agent" not in node.discovered_agents for node in survivors),
+        args.timeout)
+    print(f"crash: node declared dead and its agent dropped everywhere after "
+          f"{elapsed * 1000:.0f} ms")
+
+    # Graceful leave
+    leaver, rest = survivors[0], survivors[1:]
+    await leaver.stop_discovery()
+    elapsed = await wait_until(
+        lambda: all(node.node.members.get(leaver.local_agent_id) is None or
+                    node.node.members[leaver.local_agent_id].state != ALIVE for node in rest),
+        args.timeout)
+    print(f"leave: departure known everywhere after {elapsed * 1000:.0f} ms")
+
+    stats = [node.get_stats() for node in rest]
+    print(f"suspicions {sum(s['suspicions'] for s in stats)}, "
+          f"refutations {sum(s['refutations'] for s in stats)}, "
+          f"propagation delay max {max(s['propagation_delay_max'] for s in stats) * 1000:.0f} ms")
+
+    for node in rest:
+        await node.stop_discovery()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=20,
+                        help="Number of gossip nodes (default: 20)")
+    parser.add_argument("--period", type=float, default=0.2,
+                        help="Protocol period in seconds (default: 0.2)")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="Give up waiting for convergence after this long (default: 60)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
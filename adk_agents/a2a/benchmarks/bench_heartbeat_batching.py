@@ -0,0 +1,165 @@
+"""
+Heartbeat Batching and Delta Registration Benchmark
+
+Compares per-agent heartbeats with one batched heartbeat for all of a
+host's agents, and full re-registrations with delta registrations that
+carry only the changed fields. Runs against an in-process DiscoveryService
+(cost per agent, and registry log bytes per change) and against a local
+discovery cluster (requests and wall time per heartbeat round), finishing
+with a HeartbeatAggregator round over the cluster.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from adk_agents.a2a.core.discovery import DiscoveryService, AgentRecord
+from adk_agents.a2a.core.discovery_cluster import DiscoveryClusterClient, LocalCluster
+from adk_agents.a2a.core.heartbeat import HeartbeatAggregator
+from adk_agents.a2a.core.load_balancing import AgentLoad
+
+
+def make_record(i: int) -> AgentRecord:
+    return AgentRecord(
+        agent_id=f"agent-{i}",
+        agent_did=f"did:a2a:agent-{i}",
+        capabilities=[f"capability-{i % 20}", "a2a:messaging", "a2a:analysis"],
+        endpoints=[f"https://host.local:{8000 + i}/a2a"],
+        metadata={"description": f"Agent {i} on this host", "version": "1.4.2",
+                  "owner": "risk-analytics", "region": "eu-west-1"},
+    )
+
+
+def report(label: str, count: int, elapsed: float, unit: str = "agent"):
+    print(f"{label:<42} {elapsed / count * 1e6:>10.1f} us/{unit}")
+
+
+def run_local(args, directory: str):
+    registry_file = os.path.join(directory, "agent_registry.json")
+    discovery = DiscoveryService(registry_file)
+    records = [make_record(i) for i in range(args.agents)]
+    for record in records:
+        discovery.register_agent(record)
+    loads = {record.agent_id: AgentLoad(1, 2, 0.05) for record in records}
+    print(f"In-process registry, {args.agents:,} agents")
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for agent_id, load in loads.items():
+            discovery.heartbeat(agent_id, load)
+    report("heartbeat, one call per agent", args.agents * args.rounds, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        discovery.heartbeat_many(loads)
+    report("heartbeat_many, one batch", args.agents * args.rounds, time.perf_counter() - start)
+
+    def log_size():
+        return os.path.getsize(discovery.log.log_path)
+
+    # Full re-registration: every field of the record is sent and logged
+    size, start = log_size(), time.perf_counter()
+    for i, record in enumerate(records):
+        record.endpoints = [f"https://host.local:{9000 + i}/a2a"]
+        discovery.register_agent(record)
+    elapsed = time.perf_counter() - start
+    full_bytes = (log_size() - size) / len(records)
+    report("re-register full record", len(records), elapsed, "change")
+
+    # Delta registration, one agent at a time and as one bulk apply
+    size, start = log_size(), time.perf_counter()
+    for i, record in enumerate(records):
+        discovery.update_agent(record.agent_id, {"endpoints": [f"https://host.local:{7000 + i}/a2a"]})
+    elapsed = time.perf_counter() - start
+    delta_bytes = (log_size() - size) / len(records)
+    report("update_agent, changed field only", len(records), elapsed, "change")
+
+    updates = {record.agent_id: {"status": "busy"} for record in records}
+    start = time.perf_counter()
+    discovery.apply_updates(updates)
+    report("apply_updates, one batch", len(records), time.perf_counter() - start, "change")
+
+    print(f"registry log per change: full record {full_bytes:,.0f} bytes, "
+          f"delta {delta_bytes:,.0f} bytes")
+
+
+async def run_cluster(args, directory: str):
+    cluster = LocalCluster(args.nodes, args.replicas, registry_dir=directory, log_level="ERROR")
+    config = await cluster.start()
+    client = DiscoveryClusterClient(config)
+    print(f"\nDiscovery cluster, {args.nodes} nodes, replication factor {args.replicas}, "
+          f"{args.agents:,} agents")
+
+    try:
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        records = [make_record(i) for i in range(args.agents)]
+        await asyncio.gather(*(bounded(client.register_agent(record)) for record in records))
+        loads = {record.agent_id: AgentLoad(1, 2, 0.05) for record in records}
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded(client.heartbeat(agent_id, load))
+                                         for agent_id, load in loads.items()))
+        elapsed = time.perf_counter() - start
+        assert all(results)
+        print(f"{'heartbeat, one request per agent':<42} {elapsed * 1000:>10.0f} ms/round "
+              f"({len(loads):,} requests)")
+
+        start = time.perf_counter()
+        failed = await client.heartbeat_many(loads)
+        elapsed = time.perf_counter() - start
+        assert not failed, failed
+        print(f"{'heartbeat_many, one request per node':<42} {elapsed * 1000:>10.0f} ms/round "
+              f"({len(config.nodes)} requests)")
+
+        # A host aggregator: heartbeats for every agent plus a few queued deltas
+        aggregator = HeartbeatAggregator(client, interval=3600)
+        for agent_id, load in loads.items():
+            aggregator.add_agent(agent_id, lambda load=load: load)
+        for record in records[:args.agents // 10]:
+            aggregator.update_agent(record.agent_id, {"status": "busy"})
+            aggregator.update_agent(record.agent_id, {"capabilities": list(record.capabilities) + ["extra"]})
+
+        start = time.perf_counter()
+        rejected = await aggregator.flush()
+        elapsed = time.perf_counter() - start
+        assert not rejected, rejected
+        print(f"{'aggregator round (+10% deltas)':<42} {elapsed * 1000:>10.0f} ms/round "
+              f"({aggregator.get_stats()['updates']:,} deltas)")
+
+        record = await client.get_agent_record(records[0].agent_id)
+        assert record.status == "busy" and "extra" in record.capabilities
+    finally:
+        await client.close()
+        await cluster.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=500,
+                        help="Agents on the host (default: 500)")
+    parser.add_argument("--rounds", type=int, default=20,
+                        help="In-process heartbeat rounds (default: 20)")
+    parser.add_argument("--nodes", type=int, default=3,
+                        help="Discovery cluster nodes (default: 3)")
+    parser.add_argument("--replicas", type=int, default=2,
+                        help="Replication factor (default: 2)")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="Concurrent per-agent requests (default: 32)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as directory:
+        run_local(args, directory)
+        asyncio.run(run_cluster(args, directory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Identity Storage Benchmark
+
+Compares loading N stored identities from the previous per-agent layout
+(a JSON file and two PEM files per agent, keys parsed on load) with the
+single-file IdentityStore (one indexed file, keys parsed on first use).
+Reports write time, the time to open the storage, the average lookup of
+one identity by agent_id, the time to load every identity with its keys
+parsed, and the time to migrate the per-file layout into the store.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+from cryptography import x509
+
+from adk_agents.a2a.core.identity import AgentIdentity, IdentityManager
+
+
+def make_records(count: int, key_type: str):
+    records = []
+    for i in range(count):
+        identity, private_key, cert = AgentIdentity.create(
+            ["a2a:messaging"], agent_id=f"bench-agent-{i}", key_type=key_type
+        )
+        records.append((
+            identity.agent_id,
+            json.dumps(identity.to_dict(), indent=2).encode(),
+            private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption()
+            ),
+            cert.public_bytes(serialization.Encoding.PEM),
+        ))
+    return records
+
+
+def write_legacy(directory: str, records) -> float:
+    start = time.perf_counter()
+    for agent_id, identity, private_key, cert in records:
+        for suffix, data in (("_identity.json", identity), ("_private.pem", private_key),
+                             ("_cert.pem", cert)):
+            with open(f"{directory}/{agent_id}{suffix}", "wb") as f:
+                f.write(data)
+    return time.perf_counter() - start
+
+
+def load_legacy(directory: str) -> int:
+    """The previous load path: list the directory, read and parse three files per agent."""
+
+    loaded = 0
+    for name in os.listdir(directory):
+        if not name.endswith("_identity.json"):
+            continue
+        agent_id = name[:-len("_identity.json")]
+        with open(f"{directory}/{agent_id}_identity.json") as f:
+            AgentIdentity.from_dict(json.load(f))
+        with open(f"{directory}/{agent_id}_private.pem", "rb") as f:
+            serialization.load_pem_private_key(f.read(), password=None, backend=default_backend())
+        with open(f"{directory}/{agent_id}_cert.pem", "rb") as f:
+            x509.load_pem_x509_certificate(f.read(), default_backend())
+        loaded += 1
+    return loaded
+
+
+def lookup_legacy(directory: str, agent_id: str):
+    """The previous lookup: read three files and parse the identity (keys left unparsed)."""
+
+    with open(f"{directory}/{agent_id}_identity.json") as f:
+        AgentIdentity.from_dict(json.load(f))
+    for suffix in ("_private.pem", "_cert.pem"):
+        with open(f"{directory}/{agent_id}{suffix}", "rb") as f:
+            f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--identities", type=int, default=2000,
+                        help="Number of stored identities (default: 2000)")
+    parser.add_argument("--key-type", default="ed25519", choices=("rsa", "ed25519"),
+                        help="Identity key type (default: ed25519, faster to generate)")
+    args = parser.parse_args()
+
+    records = make_records(args.identities, args.key_type)
+    agent_ids = [record[0] for record in records]
+
+    legacy_dir = tempfile.mkdtemp(prefix="a2a-legacy-")
+    legacy_write = write_legacy(legacy_dir, records)
+
+    start = time.perf_counter()
+    os.listdir(legacy_dir)
+    legacy_open = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_legacy(legacy_dir)
+    legacy_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for agent_id in agent_ids:
+        lookup_legacy(legacy_dir, agent_id)
+    legacy_lookup = (time.perf_counter() - start) / len(agent_ids)
+
+    store_dir = tempfile.mkdtemp(prefix="a2a-store-")
+    start = time.perf_counter()
+    IdentityManager(store_dir).store.put_many(
+        (agent_id, (identity, private_key, cert)) for agent_id, identity, private_key, cert in records
+    )
+    store_write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    manager = IdentityManager(store_dir)
+    store_open = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for agent_id in agent_ids:
+        manager.load_identity(agent_id)
+    store_lookup = (time.perf_counter() - start) / len(agent_ids)
+
+    # Loading everything the way the old layout did: identities and parsed keys
+    start = time.perf_counter()
+    manager = IdentityManager(store_dir)
+    manager.preload_identities()
+    for agent_id in agent_ids:
+        manager.get_private_key(agent_id)
+        manager.get_certificate(agent_id)
+    store_load = time.perf_counter() - start
+
+    migrate_dir = tempfile.mkdtemp(prefix="a2a-migrate-")
+    write_legacy(migrate_dir, records)
+    start = time.perf_counter()
+    migrated = IdentityManager(migrate_dir).store
+    migrate_time = time.perf_counter() - start
+
+    print(f"{args.identities:,} {args.key_type} identities")
+    print(f"{'layout':<10} {'write s':>9} {'open ms':>9} {'lookup us':>10} {'load all s':>11}")
+    for name, write, opened, lookup, load in (
+        ("per-file", legacy_write, legacy_open, legacy_lookup, legacy_load),
+        ("keystore", store_write, store_open, store_lookup, store_load),
+    ):
+        print(f"{name:<10} {write:>9.3f} {opened * 1000:>9.2f} {lookup * 1e6:>10.1f} {load:>11.3f}")
+    print(f"(migrating the per-file layout: {migrate_time:.3f}s for {len(migrated)} identities)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+MessageQueue Throughput Benchmark
+
+Measures enqueue, dequeue, per-receiver drain and TTL expiry throughput of
+MessageQueue from 10^3 to 10^6 messages. The list-based queue it replaced
+is included for comparison at sizes where its quadratic cost stays bearable.
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from adk_agents.a2a.core.messaging import Message, MessageQueue
+
+
+class ListMessageQueue:
+    """The previous list-backed queue, kept only as a baseline."""
+
+    def __init__(self, max_size: int = 1000):
+        self.queue: List[Message] = []
+        self.max_size = max_size
+
+    def enqueue(self, message: Message) -> bool:
+        if len(self.queue) >= self.max_size:
+            return False
+        self.queue.append(message)
+        return True
+
+    def dequeue(self):
+        return self.queue.pop(0) if self.queue else None
+
+    def clear_expired(self):
+        self.queue = [msg for msg in self.queue if not msg.is_expired()]
+
+    def get_messages_for_agent(self, agent_id: str) -> List[Message]:
+        messages = [msg for msg in self.queue if msg.receiver_id == agent_id]
+        self.queue = [msg for msg in self.queue if msg.receiver_id != agent_id]
+        return messages
+
+
+def make_messages(count: int, receivers: int, ttl: int = None,
+                  expired: bool = False) -> List[Message]:
+    """Build messages spread round-robin over receivers."""
+
+    timestamp = datetime.utcnow()
+    if expired:
+        timestamp -= timedelta(seconds=2 * (ttl or 1))
+
+    return [
+        Message(
+            message_id=f"msg-{i}",
+            sender_id="bench-sender",
+            receiver_id=f"agent-{i % receivers}",
+            message_type="notification",
+            payload={"i": i},
+            timestamp=timestamp,
+            ttl=ttl,
+        )
+        for i in range(count)
+    ]
+
+
+def rate(count: int, seconds: float) -> str:
+    """Format operations per second."""
+    return f"{count / seconds:>14,.0f}/s" if seconds > 0 else f"{'inf':>14}/s"
+
+
+def run(queue_factory: Callable, count: int, receivers: int) -> dict:
+    """Time each queue operation for a given message count."""
+
+    results = {}
+    messages = make_messages(count, receivers)
+
+    queue = queue_factory(count)
+    start = time.perf_counter()
+    for message in messages:
+        queue.enqueue(message)
+    results["enqueue"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while queue.dequeue() is not None:
+        pass
+    results["dequeue"] = time.perf_counter() - start
+
+    queue = queue_factory(count)
+    for message in messages:
+        queue.enqueue(message)
+    start = time.perf_counter()
+    for receiver in range(receivers):
+        queue.get_messages_for_agent(f"agent-{receiver}")
+    results["drain"] = time.perf_counter() - start
+
+    queue = queue_factory(count)
+    for message in make_messages(count, receivers, ttl=1, expired=True):
+        queue.enqueue(message)
+    start = time.perf_counter()
+    queue.clear_expired()
+    results["expire"] = time.perf_counter() - start
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-exponent", type=int, default=6,
+                        help="Largest message count as a power of ten (default: 6)")
+    parser.add_argument("--receivers", type=int, default=100,
+                        help="Number of distinct receivers (default: 100)")
+    parser.add_argument("--legacy-limit", type=int, default=10 ** 4,
+                        help="Largest count to run the list-based baseline at")
+    args = parser.parse_args()
+
+    print(f"{'queue':<8} {'messages':>10} {'enqueue':>16} {'dequeue':>16} "
+          f"{'drain':>16} {'expire':>16}")
+
+    for exponent in range(3, args.max_exponent + 1):
+        count = 10 ** exponent
+        candidates = [("indexed", MessageQueue)]
+        if count <= args.legacy_limit:
+            candidates.append(("list", ListMessageQueue))
+
+        for name, factory in candidates:
+            results = run(factory, count, args.receivers)
+            print(f"{name:<8} {count:>10,} {rate(count, results['enqueue'])} "
+                  f"{rate(count, results['dequeue'])} {rate(count, results['drain'])} "
+                  f"{rate(count, results['expire'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Discovery Registry Persistence Benchmark
+
+Measures registry mutations per second (registrations and status updates)
+against a registry of N agents, comparing the previous persistence, which
+rewrote the whole registry file after every change, with the change log
+written in batches off the event loop. Also reports the time to restart
+the service from a snapshot plus a log of pending changes.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from adk_agents.a2a.core.discovery import AgentRecord, DiscoveryService
+
+
+def make_record(i: int) -> AgentRecord:
+    now = datetime.utcnow()
+    return AgentRecord(
+        agent_id=f"agent-{i}",
+        agent_did=f"did:a2a:agent-{i}",
+        capabilities=[f"capability-{i % 50}", "a2a:messaging"],
+        endpoints=[f"https://agent-{i}.local:8443"],
+        metadata={"region": "us"},
+        registered_at=now,
+        last_seen=now,
+    )
+
+
+def full_rewrite(service: DiscoveryService):
+    """The previous persistence: serialize every agent after each change."""
+
+    data = {
+        'agents': [agent.to_dict() for agent in service.agents.values()],
+        'last_updated': datetime.utcnow().isoformat()
+    }
+    with open(service.registry_file, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def populate(count: int) -> DiscoveryService:
+    path = os.path.join(tempfile.mkdtemp(prefix="a2a-registry-"), "agent_registry.json")
+    service = DiscoveryService(registry_file=path)
+    for i in range(count):
+        service.agents[f"agent-{i}"] = make_record(i)
+    service._save_registry()
+    return service
+
+
+def mutate(service: DiscoveryService, step: int, count: int):
+    if step % 2:
+        service.update_agent_status(f"agent-{step % count}", "active")
+    else:
+        service.register_agent(make_record(step % count))
+
+
+def bench_rewrite(count: int, mutations: int) -> float:
+    service = populate(count)
+    # Route the service's change recording to the old whole-file rewrite
+    service._record_change = lambda entry: full_rewrite(service)
+    start = time.perf_counter()
+    for step in range(mutations):
+        mutate(service, step, count)
+    return mutations / (time.perf_counter() - start)
+
+
+async def bench_log(count: int, mutations: int, yield_every: int) -> float:
+    service = populate(count)
+    start = time.perf_counter()
+    for step in range(mutations):
+        mutate(service, step, count)
+        if step % yield_every == 0:
+            await asyncio.sleep(0)
+    await service.flush()
+    return mutations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="Registry sizes to test (default: 1000 10000)")
+    parser.add_argument("--mutations", type=int, default=2000,
+                        help="Mutations per run with the change log (default: 2000)")
+    parser.add_argument("--rewrite-mutations", type=int, default=50,
+                        help="Mutations per run with full rewrites (default: 50)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print(f"{'agents':>8} {'rewrite ops/s':>14} {'log ops/s':>12} {'speedup':>9} {'restart ms':>11}")
+
+    for size in args.sizes:
+        rewrite = bench_rewrite(size, args.rewrite_mutations)
+        log = asyncio.run(bench_log(size, args.mutations, yield_every=10))
+
+        # Restart from a snapshot with a log of pending changes behind it
+        service = populate(size)
+        for step in range(min(args.mutations, service.compact_after - 1)):
+            mutate(service, step, size)
+        start = time.perf_counter()
+        restarted = DiscoveryService(registry_file=service.registry_file)
+        restart = time.perf_counter() - start
+        assert len(restarted.agents) == size
+
+        print(f"{size:>8,} {rewrite:>14,.0f} {log:>12,.0f} {log / rewrite:>8,.0f}x "
+              f"{restart * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,22 +10,34 @@ __author__ = "Felicia's Finance Development Team"
 
 from .client import A2AClient
 from .agent import A2AAgent
-from .identity import AgentIdentity
+from .identity import AgentIdentity, KeyPool
+from .keystore import IdentityStore
 from .auth import AuthenticationManager
 from .messaging import Message, EncryptedMessage
 from .discovery import DiscoveryService
+from .discovery_cache import DiscoveryCache
+from .heartbeat import HeartbeatAggregator
 from .transport import TransportLayer, TransportConfig
 from .orchestrator import OrchestratorAgent
+from .durable_queue import DurableMessageQueue, DurableQueueConfig
+from .sessions import SessionConfig
 
 __all__ = [
     "A2AClient",
     "A2AAgent",
     "AgentIdentity",
+    "KeyPool",
+    "IdentityStore",
     "AuthenticationManager",
     "Message",
     "EncryptedMessage",
     "DiscoveryService",
+    "DiscoveryCache",
+    "HeartbeatAggregator",
     "TransportLayer",
     "TransportConfig",
     "OrchestratorAgent",
+    "DurableMessageQueue",
+    "DurableQueueConfig",
+    "SessionConfig",
 ]
\ No newline at end of file
@@ -7,14 +7,18 @@ for secure agent-to-agent communication.
 
 import asyncio
 import logging
-from typing import Dict, Optional, Any, List, Callable
+from typing import Dict, Optional, Any, List, Callable, AsyncIterator
 from datetime import datetime
 
-from .identity import IdentityManager, AgentIdentity
+from .identity import IdentityManager, AgentIdentity, KeyPool
 from .auth import AuthenticationManager, AuthToken
-from .messaging import MessagingService, Message
-from .discovery import DiscoveryService, AgentRecord, ServiceQuery
+from .messaging import MessagingService, Message, EncryptedMessage, SessionHandshake
+from .discovery import DiscoveryService, AgentRecord, AgentView, ServiceQuery
+from .discovery_cache import DiscoveryCache
+from .load_balancing import AgentLoad, LoadTracker
 from .transport import TransportLayer, TransportConfig
+from .durable_queue import DurableMessageQueue, DurableQueueConfig
+from .sessions import SessionConfig
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +28,15 @@ class A2AAgent:
 
     def __init__(self, agent_id: str, capabilities: List[str] = None,
                  transport_config: TransportConfig = None,
-                 identity_storage: str = "./identities"):
+                 identity_storage: str = "./identities",
+                 queue_config: DurableQueueConfig = None,
+                 preload_identities: bool = False,
+                 session_config: SessionConfig = None,
+                 require_peer_auth: bool = False,
+                 key_type: str = "rsa",
+                 key_pool: KeyPool = None,
+                 discovery_cache_ttl: float = 30.0,
+                 discovery: DiscoveryService = None):
         """
         Initialize an A2A agent.
 
@@ -33,16 +45,38 @@ class A2AAgent:
             capabilities: List of capabilities this agent provides
             transport_config: Transport layer configuration
             identity_storage: Path to store agent identities
+            queue_config: Durable queue configuration; in-memory queue if omitted
+            preload_identities: Load all stored identities into memory on initialize
+            session_config: Session key cache and rotation settings
+            require_peer_auth: Reject incoming messages whose bearer token does not
+                validate as the sender's (EdDSA tokens are checked against the
+                sender's discovery record)
+            key_type: Identity key type for a new identity, "rsa" or "ed25519"
+            key_pool: Pool of pre-generated key pairs, shareable between agents
+            discovery_cache_ttl: Seconds a cached endpoint or capability lookup is
+                trusted without a registry delta confirming it
+            discovery: Discovery service shared with other agents in this process;
+                the caller starts and stops it. A private one is created if omitted
         """
 
         self.agent_id = agent_id
         self.capabilities = capabilities or ["a2a:messaging"]
 
         # Initialize core components
-        self.identity_manager = IdentityManager(identity_storage)
-        self.auth_manager = AuthenticationManager(self.identity_manager)
-        self.messaging = MessagingService(self.identity_manager, self.auth_manager)
-        self.discovery = DiscoveryService()
+        self.identity_manager = IdentityManager(identity_storage, key_pool=key_pool)
+        self.key_type = key_type
+        self.preload_identities = preload_identities
+        self.auth_manager = AuthenticationManager(
+            self.identity_manager, key_resolver=self._resolve_token_key
+        )
+        self.require_peer_auth = require_peer_auth
+        queue = DurableMessageQueue(queue_config) if queue_config else None
+        self.messaging = MessagingService(
+            self.identity_manager, self.auth_manager, queue, session_config=session_config
+        )
+        self.discovery = discovery or DiscoveryService()
+        self._owns_discovery = discovery is None
+        self.discovery_cache = DiscoveryCache(self.discovery, ttl=discovery_cache_ttl)
 
         # Initialize transport
         self.transport_config = transport_config or TransportConfig()
@@ -53,6 +87,13 @@ class A2AAgent:
         self.auth_token: Optional[AuthToken] = None
         self.running = False
         self.message_handlers: Dict[str, Callable] = {}
+        self._session_handshakes: Dict[str, asyncio.Future] = {}  # receiver -> handshake in progress
+        self.load = LoadTracker()  # handler load, reported with heartbeats
+
+        # Route incoming transport messages to this agent
+        self.transport.register_handler("/a2a/message", self._handle_incoming_message)
+        self.transport.register_handler("/a2a/encrypted", self._handle_incoming_encrypted)
+        self.transport.set_peer_resolver(self._authenticated_peer)
 
         # Register default message handlers
         self._register_default_handlers()
@@ -61,19 +102,33 @@ class A2AAgent:
         """Initialize the agent with identity and authentication."""
 
         try:
-            # Load or create identity
-            self.identity = self.identity_manager.get_identity(self.agent_id)
+            if self.preload_identities:
+                loaded = await asyncio.get_running_loop().run_in_executor(
+                    None, self.identity_manager.preload_identities
+                )
+                logger.info(f"Preloaded {loaded} identities")
+
+            # Load or create identity; key loading and generation run off the event loop
+            self.identity = await self.identity_manager.get_identity_async(self.agent_id)
             if not self.identity:
                 logger.info(f"Creating new identity for agent: {self.agent_id}")
-                self.identity = self.identity_manager.create_identity(
+                self.identity = await self.identity_manager.create_identity_async(
+                    agent_id=self.agent_id,
                     capabilities=self.capabilities,
-                    metadata={"agent_type": "a2a_agent", "version": "1.0.0"}
+                    metadata={"agent_type": "a2a_agent", "version": "1.0.0"},
+                    key_type=self.key_type
+                )
+
+            # Ed25519 identities sign their own tokens; otherwise a token key is generated
+            if self.identity.key_type == "ed25519":
+                self.auth_manager.eddsa_auth.set_signing_key(
+                    self.agent_id, self.identity_manager.get_private_key(self.agent_id)
                 )
 
-            # Create authentication token
+            # Create an EdDSA token that peers can verify with our published key
             self.auth_token = self.auth_manager.authenticate_agent(
                 agent_id=self.agent_id,
-                auth_method="jwt",
+                auth_method="eddsa",
                 permissions=["a2a:messaging", "a2a:discovery"]
             )
 
@@ -87,7 +142,8 @@ class A2AAgent:
                 agent_did=self.identity.did,
                 capabilities=self.capabilities,
                 endpoints=[f"http://{self.transport_config.host}:{self.transport_config.port}/a2a"],
-                metadata={"status": "initializing"}
+                metadata={"status": "initializing"},
+                token_keys=self.auth_manager.eddsa_auth.published_keys
             )
 
             self.discovery.register_agent(agent_record)
@@ -111,7 +167,11 @@ class A2AAgent:
             await self.transport.start()
 
             # Start discovery service
-            self.discovery.start()
+            if self._owns_discovery:
+                self.discovery.start()
+
+            if isinstance(self.messaging.queue, DurableMessageQueue):
+                self.messaging.queue.start()
 
             # Start server for incoming messages
             await self.transport.start_server()
@@ -119,6 +179,7 @@ class A2AAgent:
             # Update status
             self.discovery.update_agent_status(self.agent_id, "active")
 
+            self.messaging.inbox.reopen(self.agent_id)
             self.running = True
             logger.info(f"Agent {self.agent_id} started successfully")
             return True
@@ -131,13 +192,19 @@ class A2AAgent:
         """Stop the agent and clean up resources."""
 
         self.running = False
+        self.messaging.inbox.close(self.agent_id)
+        self.messaging.verifier.close()
 
         # Update status
         self.discovery.update_agent_status(self.agent_id, "inactive")
 
         # Stop services
         await self.transport.stop()
-        self.discovery.stop()
+        if self._owns_discovery:
+            self.discovery.stop()
+
+        if isinstance(self.messaging.queue, DurableMessageQueue):
+            self.messaging.queue.close()
 
         logger.info(f"Agent {self.agent_id} stopped")
 
@@ -149,39 +216,124 @@ class A2AAgent:
             logger.error("Agent not running or not authenticated")
             return None
 
-        # Discover receiver
-        query = ServiceQuery(agent_id=receiver_id)
-        agents = self.discovery.discover_agents(query)
+        # Create message
+        message = Message(
+            message_id="",
+            sender_id=self.agent_id,
+            receiver_id=receiver_id,
+            message_type=message_type,
+            payload=payload,
+            correlation_id=correlation_id,
+            timestamp=datetime.utcnow()
+        )
+
+        if await self._deliver(message):
+            return message.message_id
+        return None
+
+    async def send_request(self, receiver_id: str, message_type: str,
+                          payload: Dict[str, Any], timeout: float = None) -> Optional[Message]:
+        """
+        Send a request to another agent and wait for its response.
 
-        if not agents:
-            logger.error(f"Agent {receiver_id} not found in discovery service")
+        The returned coroutine resolves as soon as a message whose
+        correlation_id matches the request arrives. Returns None if the
+        request could not be sent or timed out; cancelling the awaiting
+        task cancels the request.
+        """
+
+        if not self.running or not self.auth_token:
+            logger.error("Agent not running or not authenticated")
             return None
 
-        receiver = agents[0]
+        target_url = self._resolve_endpoint(receiver_id, "message")
+        if not target_url:
+            return None
 
-        # Create message
         message = Message(
             message_id="",
             sender_id=self.agent_id,
             receiver_id=receiver_id,
             message_type=message_type,
             payload=payload,
-            correlation_id=correlation_id,
             timestamp=datetime.utcnow()
         )
+        await self._authenticate(message)
+
+        try:
+            response = await self.transport.send_request(message, target_url, self.auth_token, timeout)
+        except RuntimeError as e:
+            logger.error(f"Failed to send request to {receiver_id}: {e}")
+            return None
 
-        # Send via transport
-        target_url = f"{receiver.endpoints[0]}/message"
+        # Responses returned in the HTTP reply skip _handle_incoming_message, so check them here
+        if response is not None and not await self.messaging.verify_message_async(response):
+            logger.warning(f"Invalid signature for response {response.message_id}")
+            return None
+        return response
+
+    async def _deliver(self, message: Message) -> bool:
+        """Send a fully built message to its receiver."""
+
+        target_url = self._resolve_endpoint(message.receiver_id, "message")
+        if not target_url:
+            return False
+
+        await self._authenticate(message)
 
         try:
-            response = await self.transport.send_message(message, target_url, self.auth_token)
-            logger.info(f"Message sent to {receiver_id}: {message.message_id}")
-            return message.message_id
+            if not await self.transport.send_message(message, target_url, self.auth_token):
+                logger.warning(f"Message {message.message_id} to {message.receiver_id} was not accepted")
+                return False
+            logger.info(f"Message sent to {message.receiver_id}: {message.message_id}")
+            return True
 
         except Exception as e:
-            logger.error(f"Failed to send message to {receiver_id}: {e}")
+            logger.error(f"Failed to send message to {message.receiver_id}: {e}")
+            return False
+
+    def _authenticated_peer(self, token: str) -> Optional[str]:
+        """The agent a peer's token authenticates, or None."""
+
+        is_valid, peer_id = self.auth_manager.validate_authentication(token, ["a2a:messaging"])
+        return peer_id if is_valid else None
+
+    async def _authenticate(self, message: Message, establish: bool = True):
+        """
+        Authenticate an outgoing message with the session MAC, running the
+        handshake first if establish is set. Types that require it, session
+        handshakes and messages without a session are RSA-signed instead.
+        """
+
+        if (message.message_type != "session_handshake"
+                and not self.messaging.requires_rsa_signature(message.message_type)):
+            if establish:
+                await self._ensure_session(message.receiver_id)
+            if self.messaging.mac_for_session(message):
+                return
+
+        # Sign off the event loop; the receiver verifies on its pool
+        message.metadata["signature"] = await asyncio.get_running_loop().run_in_executor(
+            None, self.messaging.signer.sign_message, message, self.agent_id
+        )
+
+    def _resolve_token_key(self, issuer_id: str, key_id: str) -> Optional[str]:
+        """Find a peer's token verification key in its discovery record."""
+
+        record = self.discovery.get_agent_record(issuer_id)
+        return record.token_keys.get(key_id) if record else None
+
+    def _resolve_endpoint(self, receiver_id: str, path: str) -> Optional[str]:
+        """Look up the URL of a receiver's endpoint for the given path."""
+
+        agent = self.discovery_cache.resolve(receiver_id)
+
+        if agent is None:
+            logger.error(f"Agent {receiver_id} not found in discovery service")
             return None
 
+        return f"{agent.endpoints[0]}/{path}"
+
     async def send_encrypted_message(self, receiver_id: str, message_type: str,
                                     payload: Dict[str, Any]) -> Optional[str]:
         """Send an encrypted message to another agent."""
@@ -190,10 +342,10 @@ class A2AAgent:
             logger.error("Agent not running or not authenticated")
             return None
 
-        # Create session key if needed
-        session_key = self.messaging.get_session_key(self.agent_id, receiver_id)
-        if not session_key:
-            session_key = self.messaging.create_session(self.agent_id, receiver_id)
+        # Establish a session on first use; later keys rotate without a handshake
+        if not await self._ensure_session(receiver_id):
+            logger.error(f"Could not establish a session with {receiver_id}")
+            return None
 
         # Create message
         message = Message(
@@ -206,32 +358,73 @@ class A2AAgent:
         )
 
         # Encrypt and send
-        encrypted_message = self.messaging.encryptor.encrypt_message(
-            message, session_key, self.identity
-        )
-
-        # Discover receiver
-        query = ServiceQuery(agent_id=receiver_id)
-        agents = self.discovery.discover_agents(query)
-
-        if not agents:
-            logger.error(f"Agent {receiver_id} not found")
+        encrypted_message = self.messaging.encrypt_for_session(message)
+        if not encrypted_message:
             return None
 
-        receiver = agents[0]
-        target_url = f"{receiver.endpoints[0]}/encrypted"
+        target_url = self._resolve_endpoint(receiver_id, "encrypted")
+        if not target_url:
+            return None
 
         try:
             response = await self.transport.send_encrypted_message(
                 encrypted_message, target_url, self.auth_token
             )
+            if response is None:
+                return None
+
             logger.info(f"Encrypted message sent to {receiver_id}")
-            return encrypted_message.to_dict().get("message_id")
+            return message.message_id
 
         except Exception as e:
             logger.error(f"Failed to send encrypted message: {e}")
             return None
 
+    async def _ensure_session(self, receiver_id: str) -> bool:
+        """Run the session handshake with a receiver unless a session already exists."""
+
+        if self.messaging.get_session_key(self.agent_id, receiver_id):
+            return True
+
+        # Concurrent senders share a single handshake
+        pending = self._session_handshakes.get(receiver_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        pending = asyncio.get_running_loop().create_future()
+        self._session_handshakes[receiver_id] = pending
+        established = False
+
+        try:
+            offer = self.messaging.offer_session(self.agent_id, receiver_id)
+            response = await self.send_request(receiver_id, "session_handshake", offer.to_dict())
+            if response and response.payload.get("answer"):
+                answer = SessionHandshake.from_dict(response.payload["answer"])
+                established = self.messaging.complete_session(answer)
+            return established
+
+        except Exception as e:
+            logger.error(f"Session handshake with {receiver_id} failed: {e}")
+            return False
+
+        finally:
+            if not established:
+                self.messaging.abandon_session(self.agent_id, receiver_id)
+            self._session_handshakes.pop(receiver_id, None)
+            pending.set_result(established)
+
+    async def _handle_incoming_encrypted(self, encrypted_message: EncryptedMessage,
+                                         auth_token: str) -> Dict[str, Any]:
+        """Decrypt a message received on a session and dispatch it."""
+
+        message = self.messaging.decrypt_from_session(encrypted_message)
+        if message is None:
+            logger.warning(f"Could not decrypt message from {encrypted_message.sender_id}")
+            return {"status": "rejected"}
+
+        # The AEAD tag (and any RSA signature) already authenticated it
+        return await self._handle_incoming_message(message, auth_token, verified=True)
+
     async def receive_messages(self) -> List[Message]:
         """Receive pending messages for this agent."""
 
@@ -256,12 +449,19 @@ class A2AAgent:
             self.messaging.router.unregister_handler(message_type, self.agent_id)
 
     async def discover_agents(self, capabilities: List[str] = None,
-                             max_results: int = 50) -> List[AgentRecord]:
-        """Discover agents with specific capabilities."""
+                             max_results: int = 50,
+                             fields: List[str] = None) -> List[AgentView]:
+        """
+        Discover agents with specific capabilities.
+
+        Pass fields (e.g. ["endpoints", "capabilities"]) to get views
+        limited to those record fields.
+        """
 
         query = ServiceQuery(
             capabilities=capabilities,
-            max_results=max_results
+            max_results=max_results,
+            fields=fields
         )
 
         return self.discovery.discover_agents(query)
@@ -280,44 +480,133 @@ class A2AAgent:
         if self.identity:
             self.identity.capabilities = capabilities
 
-        # Update discovery record
-        record = self.discovery.get_agent_record(self.agent_id)
-        if record:
-            record.capabilities = capabilities
-            self.discovery.register_agent(record)
+        # Update discovery record (only the changed field is sent)
+        self.discovery.update_agent(self.agent_id, {"capabilities": capabilities})
 
     def heartbeat(self):
-        """Send heartbeat to discovery service."""
+        """Send heartbeat to discovery service, with the agent's current load."""
+
+        self.discovery.heartbeat(self.agent_id, self.current_load())
 
-        self.discovery.heartbeat(self.agent_id)
+    def current_load(self) -> AgentLoad:
+        """Handlers running, messages waiting in the inbox and average handler latency."""
+
+        return self.load.snapshot(self.messaging.inbox.size(self.agent_id))
 
     async def wait_for_message(self, message_type: str = None,
-                              timeout: float = 30.0) -> Optional[Message]:
-        """Wait for a specific type of message."""
+                              timeout: float = 30.0, ack: bool = True) -> Optional[Message]:
+        """
+        Wait for a specific type of message. With ack=False the message is
+        replayed from a durable queue after a restart until ack_message()
+        is called for it.
+        """
+
+        await self._drain_message_queue()
+        message = await self.messaging.inbox.get(self.agent_id, message_type, timeout)
+        if message is not None and ack:
+            self.messaging.ack(message)
+        return message
+
+    def ack_message(self, message: Message) -> bool:
+        """Acknowledge a received message once it has been handled."""
+        return self.messaging.ack(message)
 
-        start_time = asyncio.get_event_loop().time()
+    async def messages(self, message_type: str = None) -> AsyncIterator[Message]:
+        """
+        Iterate over incoming messages as they arrive.
 
-        while (asyncio.get_event_loop().time() - start_time) < timeout:
-            messages = await self.receive_messages()
+        Only messages without a registered handler reach the inbox. The
+        iterator ends when the agent is stopped. Each message is acknowledged
+        when the loop body handling it completes; if the body raises, it is
+        replayed from a durable queue after a restart.
+        """
 
-            for message in messages:
-                if message_type is None or message.message_type == message_type:
-                    return message
+        if not self.running:
+            return
 
-            await asyncio.sleep(0.1)  # Small delay to prevent busy waiting
+        await self._drain_message_queue()
+        async for message in self.messaging.inbox.iterate(self.agent_id, message_type):
+            yield message
+            self.messaging.ack(message)
 
-        return None
+    async def _drain_message_queue(self):
+        """Move verified messages from the messaging queue into the inbox."""
+
+        if not self.running or not self.auth_token:
+            return
+
+        for message in await self.messaging.receive_message_async(self.agent_id, self.auth_token):
+            if not self.messaging.inbox.deliver(message):
+                logger.warning(f"Inbox full, dropping message {message.message_id}")
+                self.messaging.ack(message)
+
+    async def _handle_incoming_message(self, message: Message, auth_token: str,
+                                       verified: bool = False) -> Dict[str, Any]:
+        """
+        Dispatch a message received by the transport layer.
+
+        Responses to outstanding requests resolve their waiting futures;
+        anything else goes to the registered handler, whose return value
+        (a Message or a response payload) is returned to the sender in the
+        reply to its request. Messages a handler addresses elsewhere are
+        sent separately. Unless verified, a message must carry a valid
+        session MAC or RSA signature.
+        """
+
+        if self.require_peer_auth:
+            is_valid, peer_id = self.auth_manager.validate_authentication(auth_token, ["a2a:messaging"])
+            if not is_valid or peer_id != message.sender_id:
+                logger.warning(f"Rejected message {message.message_id}: sender not authenticated")
+                return {"status": "unauthorized"}
+
+        if not verified and not await self.messaging.verify_message_async(message):
+            logger.warning(f"Invalid signature for message {message.message_id}")
+            return {"status": "rejected"}
+
+        if self.transport.resolve_response(message):
+            return {"status": "received"}
+
+        handler = self.message_handlers.get(message.message_type)
+        if not handler:
+            # Unhandled messages wait in the inbox for wait_for_message/messages(),
+            # recorded in the (durable) queue until the consumer acks them
+            if not self.messaging.deliver_verified(message):
+                logger.warning(f"Inbox full, dropping message {message.message_id}")
+            return {"status": "received"}
+
+        started = self.load.start()
+        try:
+            result = await handler(message, auth_token)
+        finally:
+            self.load.finish(started)
+
+        if result is not None:
+            response = result if isinstance(result, Message) else message.create_response(result)
+            if response.receiver_id == message.sender_id and response.correlation_id == message.message_id:
+                # In the reply, so it cannot be shed by the caller's credit window; a
+                # handshake here would hold the reply up, so no new session is set up
+                await self._authenticate(response, establish=False)
+                return {"status": "processed", "response": response.to_dict()}
+
+            if self.running and self.auth_token and not await self._deliver(response):
+                logger.warning(f"Dropped response {response.message_id} from handler for "
+                               f"{message.message_type}")
+
+        return {"status": "processed"}
 
     def _register_default_handlers(self):
         """Register default message handlers."""
 
-        async def handle_ping(message: Message, auth_token: AuthToken):
+        async def handle_ping(message: Message, auth_token: str):
             """Handle ping messages."""
-            response = message.create_response({"status": "pong"})
-            # In a real implementation, send response back
             logger.debug(f"Received ping from {message.sender_id}")
+            return {"status": "pong"}
+
+        async def handle_capability_request(message: Message, auth_token: str):
+            """Handle capability requests."""
+            return {"capabilities": self.capabilities}
 
-        async def handle_discovery_request(message: Message, auth_token: AuthToken):
+        async def handle_discovery_request(message: Message, auth_token: str):
             """Handle discovery requests."""
             query_data = message.payload.get("query", {})
             query = ServiceQuery(**query_data)
@@ -327,10 +616,16 @@ class A2AAgent:
                 "agents": [agent.to_dict() for agent in agents]
             }
 
-            response = message.create_response(response_payload)
-            # Send response back
             logger.debug(f"Discovery request from {message.sender_id}")
+            return response_payload
+
+        async def handle_session_handshake(message: Message, auth_token: str):
+            """Answer a session offer from another agent."""
+            answer = self.messaging.accept_session(SessionHandshake.from_dict(message.payload))
+            return {"answer": answer.to_dict() if answer else None}
 
         # Register handlers
         self.register_message_handler("ping", handle_ping)
-        self.register_message_handler("discovery_request", handle_discovery_request)
\ No newline at end of file
+        self.register_message_handler("capability_request", handle_capability_request)
+        self.register_message_handler("discovery_request", handle_discovery_request)
+        self.register_message_handler("session_handshake", handle_session_handshake)
\ No newline at end of file
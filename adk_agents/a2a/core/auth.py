@@ -9,17 +9,21 @@ import jwt
 import time
 import hashlib
 import secrets
+import logging
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any, Tuple, List
+from typing import Dict, Optional, Any, Tuple, List, Callable
 from dataclasses import dataclass
 from cryptography import x509
-from cryptography.hazmat.primitives import hashes, hmac
+from cryptography.hazmat.primitives import hashes, hmac, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
 from cryptography.hazmat.backends import default_backend
 from cryptography.exceptions import InvalidSignature
 
 from .identity import AgentIdentity, IdentityManager
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class AuthToken:
@@ -75,6 +79,14 @@ class JWTAuthenticator:
             metadata=metadata or {}
         )
 
+    def decode(self, token: str) -> Optional[Dict[str, Any]]:
+        """Verify a JWT token and return its claims, or None if it is invalid or expired."""
+
+        try:
+            return jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except jwt.InvalidTokenError:
+            return None
+
     def validate_token(self, token: str) -> Optional[AuthToken]:
         """Validate a JWT token and return AuthToken if valid."""
 
@@ -110,15 +122,237 @@ class JWTAuthenticator:
         )
 
 
+class EdDSATokenAuthenticator:
+    """
+    Issues and verifies Ed25519-signed (EdDSA) JWTs.
+
+    The token header's key id names the issuing agent and its key
+    ("agent_id#fingerprint"), so any agent can verify a token with the
+    issuer's public key, looked up through key_resolver (typically the
+    issuer's discovery record) and cached for key_cache_ttl seconds.
+
+    Tokens are self-issued: an agent can only sign tokens for itself, and
+    a token whose subject is not its issuer is rejected.
+    """
+
+    algorithm = "EdDSA"
+
+    def __init__(self, key_resolver: Callable[[str, str], Optional[str]] = None,
+                 key_cache_ttl: float = 300.0, negative_cache_ttl: float = 5.0):
+        self.key_resolver = key_resolver
+        self.key_cache_ttl = key_cache_ttl
+        self.negative_cache_ttl = negative_cache_ttl
+        self.issuer_id: Optional[str] = None
+        self.key_id: Optional[str] = None
+        self._private_key: Optional[Ed25519PrivateKey] = None
+        self._keys: Dict[str, Tuple[Optional[Ed25519PublicKey], float]] = {}  # kid -> (key, expiry)
+        self._pinned: Dict[str, Ed25519PublicKey] = {}
+
+    @staticmethod
+    def encode_public_key(public_key: Ed25519PublicKey) -> str:
+        return public_key.public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw
+        ).hex()
+
+    def set_signing_key(self, issuer_id: str, private_key: Ed25519PrivateKey = None) -> Tuple[str, str]:
+        """Start issuing tokens as issuer_id; returns (key id, hex public key) to publish."""
+
+        self._private_key = private_key or Ed25519PrivateKey.generate()
+        public_key = self._private_key.public_key()
+        public_hex = self.encode_public_key(public_key)
+
+        self.issuer_id = issuer_id
+        self.key_id = f"{issuer_id}#{hashlib.sha256(bytes.fromhex(public_hex)).hexdigest()[:16]}"
+        self._pinned[self.key_id] = public_key
+        return self.key_id, public_hex
+
+    @property
+    def published_keys(self) -> Dict[str, str]:
+        """Key ids and public keys to put in this agent's discovery record."""
+
+        if not self._private_key:
+            return {}
+        return {self.key_id: self.encode_public_key(self._private_key.public_key())}
+
+    def add_trusted_key(self, key_id: str, public_key: str):
+        """Trust a public key without going through the resolver."""
+        self._pinned[key_id] = Ed25519PublicKey.from_public_bytes(bytes.fromhex(public_key))
+
+    def create_token(self, agent_id: str, permissions: List[str],
+                    expires_in: int = 3600, metadata: Dict[str, Any] = None) -> AuthToken:
+        """Create an EdDSA token signed with this issuer's key (for the issuer itself only)."""
+
+        if not self._private_key:
+            raise RuntimeError("No signing key set")
+        if agent_id != self.issuer_id:
+            raise ValueError(f"Issuer {self.issuer_id} cannot create tokens for {agent_id}")
+
+        now = int(time.time())
+        payload = {
+            "iss": self.issuer_id,
+            "sub": agent_id,
+            "iat": now,
+            "exp": now + expires_in,
+            "permissions": permissions,
+            "metadata": metadata or {}
+        }
+
+        token = jwt.encode(payload, self._private_key, algorithm=self.algorithm,
+                           headers={"kid": self.key_id})
+
+        return AuthToken(
+            token=token,
+            token_type="JWT",
+            expires_at=datetime.utcfromtimestamp(now + expires_in),
+            agent_id=agent_id,
+            permissions=permissions,
+            metadata=metadata or {}
+        )
+
+    def decode(self, token: str, header: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Verify an EdDSA token and return its claims, or None if it is invalid or expired."""
+
+        try:
+            header = header or jwt.get_unverified_header(token)
+            key_id = header.get("kid", "")
+            public_key = self._public_key(key_id)
+            if public_key is None:
+                return None
+
+            claims = jwt.decode(token, public_key, algorithms=[self.algorithm])
+            # The key only vouches for its own issuer, and only about itself
+            issuer_id = key_id.split("#", 1)[0]
+            if claims.get("iss") != issuer_id or claims.get("sub") != issuer_id:
+                return None
+            return claims
+
+        except jwt.InvalidTokenError:
+            return None
+
+    def forget_key(self, key_id: str):
+        """Drop a cached key, e.g. after the issuer rotated it."""
+        self._keys.pop(key_id, None)
+
+    def _public_key(self, key_id: str) -> Optional[Ed25519PublicKey]:
+        """Resolve a key id to a public key, caching hits and misses."""
+
+        pinned = self._pinned.get(key_id)
+        if pinned is not None:
+            return pinned
+
+        now = time.monotonic()
+        cached = self._keys.get(key_id)
+        if cached is not None and now < cached[1]:
+            return cached[0]
+
+        public_key = None
+        issuer_id = key_id.split("#", 1)[0]
+        if issuer_id and self.key_resolver:
+            try:
+                encoded = self.key_resolver(issuer_id, key_id)
+                if encoded:
+                    public_key = Ed25519PublicKey.from_public_bytes(bytes.fromhex(encoded))
+            except Exception as e:
+                logger.warning(f"Could not resolve token key {key_id}: {e}")
+
+        ttl = self.key_cache_ttl if public_key is not None else self.negative_cache_ttl
+        self._keys[key_id] = (public_key, now + ttl)
+        return public_key
+
+
 class MutualTLSAuthenticator:
-    """Handles mutual TLS authentication for agents."""
+    """
+    Handles mutual TLS authentication for agents.
+
+    Certificates that pass validation are remembered by fingerprint (the
+    SHA-256 of their DER encoding), so a peer reconnecting with the same
+    certificate maps straight to its agent_id. An entry lasts until the
+    certificate expires or cache_ttl passes, whichever comes first.
+    """
 
-    def __init__(self, identity_manager: IdentityManager):
+    def __init__(self, identity_manager: IdentityManager, cache_ttl: float = 300.0,
+                 max_cached: int = 10000):
         self.identity_manager = identity_manager
+        self.cache_ttl = cache_ttl
+        self.max_cached = max_cached
+        self._verified: Dict[bytes, Tuple[str, float]] = {}  # fingerprint -> (agent_id, expires)
+        self.hits = 0
+        self.misses = 0
 
     def authenticate_client_cert(self, client_cert: x509.Certificate) -> Optional[str]:
         """Authenticate an agent using its client certificate."""
 
+        fingerprint = client_cert.fingerprint(hashes.SHA256())
+        agent_id = self._cached(fingerprint)
+        if agent_id is not None:
+            return agent_id
+
+        agent_id = self._validate(client_cert)
+        if agent_id is not None:
+            self._remember(fingerprint, agent_id, client_cert)
+        return agent_id
+
+    def authenticate_peer_certificate(self, cert_der: bytes) -> Optional[str]:
+        """
+        Authenticate an agent from the DER certificate presented on a TLS
+        connection (SSLObject.getpeercert(binary_form=True)); cached peers
+        are recognised without parsing the certificate.
+        """
+
+        agent_id = self._cached(hashlib.sha256(cert_der).digest())
+        if agent_id is not None:
+            return agent_id
+
+        try:
+            client_cert = x509.load_der_x509_certificate(cert_der, default_backend())
+        except ValueError:
+            return None
+        return self.authenticate_client_cert(client_cert)
+
+    def forget_agent(self, agent_id: str):
+        """Drop cached certificates for an agent, e.g. after its identity is rotated."""
+
+        for fingerprint in [f for f, (cached_id, _) in self._verified.items() if cached_id == agent_id]:
+            del self._verified[fingerprint]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._verified),
+            "max_cached": self.max_cached,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _cached(self, fingerprint: bytes) -> Optional[str]:
+        entry = self._verified.get(fingerprint)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        agent_id, expires = entry
+        if time.time() >= expires:
+            del self._verified[fingerprint]
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return agent_id
+
+    def _remember(self, fingerprint: bytes, agent_id: str, client_cert: x509.Certificate):
+        if self.max_cached <= 0:
+            return
+
+        if len(self._verified) >= self.max_cached:
+            # Drop the oldest entry (dicts keep insertion order)
+            del self._verified[next(iter(self._verified))]
+
+        not_after = client_cert.not_valid_after_utc.timestamp()
+        self._verified[fingerprint] = (agent_id, min(time.time() + self.cache_ttl, not_after))
+
+    def _validate(self, client_cert: x509.Certificate) -> Optional[str]:
+        """Full validation: subject, validity period and match with the stored certificate."""
+
         # Extract agent ID from certificate subject
         subject = client_cert.subject
         common_name = subject.get_attributes_for_oid(x509.NameOID.COMMON_NAME)
@@ -147,14 +381,21 @@ class MutualTLSAuthenticator:
         if not stored_cert:
             return None
 
-        # Compare certificate details (simplified check)
+        # Compare certificate details (simplified check); works for RSA and Ed25519 keys
         if (client_cert.subject == stored_cert.subject and
-            client_cert.public_key().public_numbers() == stored_cert.public_key().public_numbers()):
+            _public_key_der(client_cert) == _public_key_der(stored_cert)):
             return agent_id
 
         return None
 
 
+def _public_key_der(cert: x509.Certificate) -> bytes:
+    return cert.public_key().public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+
 class OAuth2Authenticator:
     """Handles OAuth2-based authentication for agents."""
 
@@ -195,7 +436,7 @@ class OAuth2Authenticator:
                 )
 
         except Exception as e:
-            print(f"OAuth2 token request failed: {e}")
+            logger.error(f"OAuth2 token request failed: {e}")
 
         return None
 
@@ -206,14 +447,131 @@ class OAuth2Authenticator:
         return self.tokens.get(token)
 
 
+class _ValidatedToken:
+    """Claims of a token that passed validation."""
+
+    __slots__ = ("agent_id", "permissions", "issued_at", "expires_at")
+
+    def __init__(self, agent_id: str, permissions: frozenset, issued_at: float, expires_at: float):
+        self.agent_id = agent_id
+        self.permissions = permissions
+        self.issued_at = issued_at
+        self.expires_at = expires_at
+
+
+class TokenValidationCache:
+    """
+    Validated tokens keyed by the SHA-256 digest of the token.
+
+    Entries are dropped once their exp passes. Revoked tokens are remembered
+    until they would have expired anyway, and revoking an agent rejects
+    every token issued to it up to that moment.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: Dict[bytes, _ValidatedToken] = {}
+        self._revoked: Dict[bytes, float] = {}  # token digest -> exp
+        self._revoked_agents: Dict[str, float] = {}  # agent_id -> revocation time
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token: str) -> Optional[_ValidatedToken]:
+        """Return the cached claims for a token that is still valid."""
+
+        key = self.digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if time.time() >= entry.expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def put(self, token: str, claims: Dict[str, Any]) -> Optional[_ValidatedToken]:
+        """Cache the verified claims of a token; None if the token has been revoked."""
+
+        key = self.digest(token)
+        if key in self._revoked:
+            return None
+
+        entry = _ValidatedToken(
+            agent_id=claims["sub"],
+            permissions=frozenset(claims.get("permissions", ())),
+            issued_at=claims.get("iat", 0),
+            expires_at=claims["exp"]
+        )
+        revoked_at = self._revoked_agents.get(entry.agent_id)
+        if revoked_at is not None and entry.issued_at <= revoked_at:
+            return None
+
+        if self.max_entries > 0:
+            if len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[key] = entry
+        return entry
+
+    def revoke(self, token: str, expires_at: float = None):
+        """Reject a token from now on, whether or not it is cached."""
+
+        key = self.digest(token)
+        entry = self._entries.pop(key, None)
+        if expires_at is None:
+            expires_at = entry.expires_at if entry else time.time() + 86400
+        self._revoked[key] = expires_at
+        self._prune_revoked()
+
+    def revoke_agent(self, agent_id: str):
+        """Reject every token issued to an agent up to now."""
+
+        self._revoked_agents[agent_id] = time.time()
+        for key in [key for key, entry in self._entries.items() if entry.agent_id == agent_id]:
+            del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _evict(self):
+        """Make room: drop expired entries, or the oldest one if none have expired."""
+
+        now = time.time()
+        expired = [key for key, entry in self._entries.items() if now >= entry.expires_at]
+        for key in expired:
+            del self._entries[key]
+        if not expired and self._entries:
+            del self._entries[next(iter(self._entries))]
+
+    def _prune_revoked(self):
+        now = time.time()
+        for key in [key for key, expires_at in self._revoked.items() if now >= expires_at]:
+            del self._revoked[key]
+
+
 class AuthenticationManager:
     """Central authentication manager for A2A protocol."""
 
-    def __init__(self, identity_manager: IdentityManager):
+    def __init__(self, identity_manager: IdentityManager, token_cache_size: int = 10000,
+                 key_resolver: Callable[[str, str], Optional[str]] = None):
         self.identity_manager = identity_manager
         self.jwt_auth = JWTAuthenticator()
+        self.eddsa_auth = EdDSATokenAuthenticator(key_resolver)
         self.mtls_auth = MutualTLSAuthenticator(identity_manager)
         self.active_tokens: Dict[str, AuthToken] = {}
+        self.token_cache = TokenValidationCache(token_cache_size)
 
     def authenticate_agent(self, agent_id: str, auth_method: str = "jwt",
                           **kwargs) -> Optional[AuthToken]:
@@ -228,6 +586,15 @@ class AuthenticationManager:
             expires_in = kwargs.get("expires_in", 3600)
             return self.jwt_auth.create_token(agent_id, permissions, expires_in)
 
+        elif auth_method == "eddsa":
+            if not self.eddsa_auth.key_id:
+                self.eddsa_auth.set_signing_key(agent_id)
+            elif self.eddsa_auth.issuer_id != agent_id:
+                return None  # tokens are self-issued
+            permissions = kwargs.get("permissions", ["a2a:messaging"])
+            expires_in = kwargs.get("expires_in", 3600)
+            return self.eddsa_auth.create_token(agent_id, permissions, expires_in)
+
         elif auth_method == "oauth2":
             # Would need OAuth2 config
             return None
@@ -235,7 +602,11 @@ class AuthenticationManager:
         elif auth_method == "mtls":
             client_cert = kwargs.get("client_cert")
             if client_cert:
-                authenticated_agent = self.mtls_auth.authenticate_client_cert(client_cert)
+                # A DER-encoded certificate straight from the TLS connection, or a parsed one
+                if isinstance(client_cert, bytes):
+                    authenticated_agent = self.mtls_auth.authenticate_peer_certificate(client_cert)
+                else:
+                    authenticated_agent = self.mtls_auth.authenticate_client_cert(client_cert)
                 if authenticated_agent == agent_id:
                     permissions = kwargs.get("permissions", ["a2a:messaging"])
                     expires_in = kwargs.get("expires_in", 3600)
@@ -246,14 +617,19 @@ class AuthenticationManager:
     def validate_authentication(self, token: str, required_permissions: List[str] = None) -> Tuple[bool, Optional[str]]:
         """Validate authentication token and check permissions."""
 
-        # Try JWT validation first
-        auth_token = self.jwt_auth.validate_token(token)
-        if auth_token and not auth_token.is_expired():
+        # Try JWT validation first; a cached token skips decoding and signature checks
+        validated = self.token_cache.get(token)
+        if validated is None:
+            claims = self._decode(token)
+            if claims is not None:
+                validated = self.token_cache.put(token, claims)
+
+        if validated is not None:
             if required_permissions:
                 for perm in required_permissions:
-                    if not auth_token.has_permission(perm):
+                    if perm not in validated.permissions:
                         return False, f"Missing permission: {perm}"
-            return True, auth_token.agent_id
+            return True, validated.agent_id
 
         # Try OAuth2 validation
         auth_token = self.mtls_auth  # This is wrong - need to fix
@@ -261,6 +637,32 @@ class AuthenticationManager:
 
         return False, None
 
+    def _decode(self, token: str) -> Optional[Dict[str, Any]]:
+        """Verify a token with the authenticator matching its algorithm."""
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError:
+            return None
+
+        if header.get("alg") == EdDSATokenAuthenticator.algorithm:
+            return self.eddsa_auth.decode(token, header)
+        return self.jwt_auth.decode(token)
+
+    def revoke_token(self, token: str):
+        """Revoke a token before it expires."""
+
+        try:
+            # Only needed to know how long the revocation must be remembered
+            expires_at = jwt.decode(token, options={"verify_signature": False}).get("exp")
+        except jwt.InvalidTokenError:
+            expires_at = None
+        self.token_cache.revoke(token, expires_at)
+
+    def revoke_agent_tokens(self, agent_id: str):
+        """Revoke every token issued to an agent so far."""
+        self.token_cache.revoke_agent(agent_id)
+
     def authorize_action(self, agent_id: str, action: str, resource: str = None) -> bool:
         """Authorize an agent to perform a specific action."""
 
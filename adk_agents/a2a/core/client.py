@@ -7,11 +7,11 @@ and managing agent communications.
 
 import asyncio
 import logging
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, AsyncIterator
 from datetime import datetime
 
 from .agent import A2AAgent
-from .discovery import ServiceQuery, AgentRecord
+from .discovery import ServiceQuery, AgentRecord, AgentView
 from .transport import TransportConfig
 from .messaging import Message
 
@@ -96,14 +96,24 @@ class A2AClient:
 
         return await self.agent.receive_messages()
 
+    async def messages(self, message_type: str = None) -> AsyncIterator[Message]:
+        """Iterate over incoming messages as they arrive."""
+
+        if not self.connected or not self.agent:
+            return
+
+        async for message in self.agent.messages(message_type):
+            yield message
+
     async def discover_agents(self, capabilities: List[str] = None,
-                             max_results: int = 50) -> List[AgentRecord]:
-        """Discover agents with specific capabilities."""
+                             max_results: int = 50,
+                             fields: List[str] = None) -> List[AgentView]:
+        """Discover agents with specific capabilities, optionally projected to fields."""
 
         if not self.connected or not self.agent:
             return []
 
-        return await self.agent.discover_agents(capabilities, max_results)
+        return await self.agent.discover_agents(capabilities, max_results, fields)
 
     def get_agent_info(self, agent_id: str) -> Optional[AgentRecord]:
         """Get information about a specific agent."""
@@ -122,47 +132,54 @@ class A2AClient:
 
         self.agent.register_message_handler(message_type, handler)
 
-    async def ping_agent(self, agent_id: str) -> bool:
+    async def ping_agent(self, agent_id: str, timeout: float = 10.0) -> bool:
         """Send a ping message to an agent."""
 
-        message_id = await self.send_message(
+        if not self.connected or not self.agent:
+            logger.error("Client not connected")
+            return False
+
+        response = await self.agent.send_request(
             receiver_id=agent_id,
             message_type="ping",
-            payload={"timestamp": datetime.utcnow().isoformat()}
+            payload={"timestamp": datetime.utcnow().isoformat()},
+            timeout=timeout
         )
 
-        if not message_id:
-            return False
-
-        # Wait for pong response
-        response = await self.agent.wait_for_message("response", timeout=10.0)
-
-        if response and response.correlation_id == message_id:
-            payload = response.payload
-            return payload.get("status") == "pong"
+        if response:
+            return response.payload.get("status") == "pong"
 
         return False
 
-    async def request_agent_capabilities(self, agent_id: str) -> Optional[List[str]]:
+    async def request_agent_capabilities(self, agent_id: str,
+                                         timeout: float = 10.0) -> Optional[List[str]]:
         """Request the capabilities of another agent."""
 
-        message_id = await self.send_message(
+        if not self.connected or not self.agent:
+            logger.error("Client not connected")
+            return None
+
+        response = await self.agent.send_request(
             receiver_id=agent_id,
             message_type="capability_request",
-            payload={}
+            payload={},
+            timeout=timeout
         )
 
-        if not message_id:
-            return None
+        if response:
+            return response.payload.get("capabilities")
 
-        # Wait for response
-        response = await self.agent.wait_for_message("response", timeout=10.0)
+        return None
 
-        if response and response.correlation_id == message_id:
-            payload = response.payload
-            return payload.get("capabilities")
+    async def send_request(self, receiver_id: str, message_type: str,
+                          payload: Dict[str, Any], timeout: float = None) -> Optional[Message]:
+        """Send a request to another agent and wait for its response."""
 
-        return None
+        if not self.connected or not self.agent:
+            logger.error("Client not connected")
+            return None
+
+        return await self.agent.send_request(receiver_id, message_type, payload, timeout)
 
     async def broadcast_message(self, message_type: str, payload: Dict[str, Any],
                                capabilities: List[str] = None) -> List[str]:
@@ -217,7 +234,7 @@ class A2AClient:
 
             # Check transport
             try:
-                # Simple transport check
+                health["transport_metrics"] = self.agent.transport.get_metrics()
                 health["transport_healthy"] = True
             except Exception as e:
                 health["transport_healthy"] = False
@@ -225,9 +242,12 @@ class A2AClient:
 
             # Check messaging
             try:
-                queue_size = self.agent.messaging.queue.size()
+                queue_stats = self.agent.messaging.queue.get_stats()
                 health["messaging_healthy"] = True
-                health["queue_size"] = queue_size
+                health["queue_size"] = queue_stats["size"]
+                health["queue_stats"] = queue_stats
+                health["session_stats"] = self.agent.messaging.get_session_stats()
+                health["verification_metrics"] = self.agent.messaging.verifier.get_metrics()
             except Exception as e:
                 health["messaging_healthy"] = False
                 health["messaging_error"] = str(e)
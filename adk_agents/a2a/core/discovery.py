@@ -6,14 +6,22 @@ with other agents in the A2A network.
 """
 
 import asyncio
-import json
+import copy
+import sys
 import time
+import heapq
 import hashlib
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any, List, Set
-from dataclasses import dataclass, asdict
+from types import MappingProxyType
+from typing import (Dict, Optional, Any, List, Set, Iterable, FrozenSet, Mapping, Tuple,
+                    Callable, AsyncIterator)
+from dataclasses import dataclass, asdict, field, fields, replace
 import logging
 
+from .registry_log import RegistryLog
+from .gossip import GossipNode, GossipConfig
+from .load_balancing import AgentLoad, AgentSelector
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,10 +34,11 @@ class AgentRecord:
     capabilities: List[str]
     endpoints: List[str]  # List of endpoint URLs
     metadata: Dict[str, Any]
-    registered_at: datetime
-    last_seen: datetime
+    registered_at: Optional[datetime] = None
+    last_seen: Optional[datetime] = None
     status: str = "active"  # "active", "inactive", "suspended"
     ttl: int = 300  # Time to live in seconds
+    token_keys: Dict[str, str] = field(default_factory=dict)  # key id -> hex Ed25519 public key
 
     def __post_init__(self):
         if not isinstance(self.registered_at, datetime):
@@ -49,9 +58,9 @@ class AgentRecord:
         """Create from dictionary."""
         return cls(**data)
 
-    def is_expired(self) -> bool:
+    def is_expired(self, now: datetime = None) -> bool:
         """Check if the record has expired."""
-        return (datetime.utcnow() - self.last_seen).total_seconds() > self.ttl
+        return ((now or datetime.utcnow()) - self.last_seen).total_seconds() > self.ttl
 
     def has_capability(self, capability: str) -> bool:
         """Check if agent has a specific capability."""
@@ -62,6 +71,113 @@ class AgentRecord:
         self.last_seen = datetime.utcnow()
 
 
+RECORD_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(AgentRecord))
+UPDATABLE_FIELDS: Tuple[str, ...] = ("capabilities", "endpoints", "metadata", "status", "ttl",
+                                     "token_keys")
+
+
+class AgentView:
+    """
+    Read-only view of a registry record, as returned by discovery queries.
+
+    A view references the live AgentRecord instead of copying it, so it
+    always shows the record's current state and a query allocates only one
+    small object per result. Lists come back as tuples and dicts as
+    read-only mappings. Fields left out of the query's projection raise
+    AttributeError, and metadata reads as empty unless it was requested.
+    """
+
+    __slots__ = ("_record", "_fields", "_include_metadata")
+
+    def __init__(self, record: AgentRecord, fields: Optional[FrozenSet[str]] = None,
+                 include_metadata: bool = True):
+        object.__setattr__(self, "_record", record)
+        object.__setattr__(self, "_fields", fields)
+        object.__setattr__(self, "_include_metadata", include_metadata)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AgentView is read-only")
+
+    def __repr__(self) -> str:
+        return f"AgentView({self._record.agent_id!r}, fields={sorted(self.fields)})"
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Names of the fields this view exposes."""
+        if self._fields is None:
+            return RECORD_FIELDS
+        return tuple(name for name in RECORD_FIELDS if name in self._fields)
+
+    def _get(self, name: str):
+        if self._fields is not None and name not in self._fields:
+            raise AttributeError(f"Field '{name}' is not in this view's projection")
+        return getattr(self._record, name)
+
+    @property
+    def agent_id(self) -> str:
+        return self._record.agent_id  # always included
+
+    @property
+    def agent_did(self) -> str:
+        return self._get("agent_did")
+
+    @property
+    def capabilities(self) -> Tuple[str, ...]:
+        return tuple(self._get("capabilities"))
+
+    @property
+    def endpoints(self) -> Tuple[str, ...]:
+        return tuple(self._get("endpoints"))
+
+    @property
+    def metadata(self) -> Mapping[str, Any]:
+        metadata = self._get("metadata")
+        return MappingProxyType(metadata if self._include_metadata else {})
+
+    @property
+    def registered_at(self) -> datetime:
+        return self._get("registered_at")
+
+    @property
+    def last_seen(self) -> datetime:
+        return self._get("last_seen")
+
+    @property
+    def status(self) -> str:
+        return self._get("status")
+
+    @property
+    def ttl(self) -> int:
+        return self._get("ttl")
+
+    @property
+    def token_keys(self) -> Mapping[str, str]:
+        return MappingProxyType(self._get("token_keys"))
+
+    def has_capability(self, capability: str) -> bool:
+        """Check if agent has a specific capability."""
+        return capability in self._get("capabilities")
+
+    def is_expired(self, now: datetime = None) -> bool:
+        """Check if the record has expired."""
+        return self._record.is_expired(now)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the projected fields (a copy, safe to modify)."""
+
+        data = {}
+        for name in self.fields:
+            value = getattr(self._record, name)
+            if name == "metadata" and not self._include_metadata:
+                value = {}
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, (list, dict)):
+                value = value.copy()
+            data[name] = value
+        return data
+
+
 @dataclass
 class ServiceQuery:
     """Query for discovering agents."""
@@ -71,18 +187,84 @@ class ServiceQuery:
     status: Optional[str] = "active"
     max_results: int = 50
     include_metadata: bool = False
+    fields: Optional[List[str]] = None  # Projection, e.g. ["endpoints", "capabilities"]; None for all
 
 
-class DiscoveryService:
-    """Central service registry for A2A agent discovery."""
+@dataclass
+class RegistryChange:
+    """A registry change pushed to watchers."""
+
+    revision: int
+    op: str  # "put" (registered or updated), "delete", or "resync" (changes were dropped)
+    agent_id: Optional[str] = None
+    record: Optional[AgentView] = None  # current record, for "put"
+
 
-    def __init__(self, registry_file: str = "agent_registry.json"):
+class DiscoveryService:
+    """
+    Central service registry for A2A agent discovery.
+
+    Queries are answered from indexes rather than by scanning the registry:
+    an agent_id query is a dict lookup, and capability and status filters
+    walk the smallest matching index set while probing the others. Expiry
+    is checked only for the records a query returns.
+
+    Changes are persisted as entries in an append-only log (see
+    RegistryLog). Inside an event loop they are batched for flush_interval
+    seconds and written on an executor thread; every compact_after entries
+    the log is folded into a fresh snapshot of the registry file.
+
+    Each agent expires at a monotonic deadline (last_seen + ttl when it is
+    registered or loaded). Deadlines sit in a min-heap that the cleanup task
+    sleeps on, so agents are removed when they expire rather than on a
+    periodic scan. A heartbeat only moves the agent's deadline; the heap
+    entry it leaves behind is re-armed when it comes due.
+
+    Registrations, status changes and removals are pushed to watchers as
+    RegistryChange deltas (add_watcher, or the watch() stream), so clients
+    can cache lookups instead of querying per message.
+
+    Re-registering an agent, or update_agent(), changes and logs only the
+    fields that differ. heartbeat_many() and apply_updates() take a batch
+    for many agents at once (see HeartbeatAggregator).
+
+    Heartbeats may carry the agent's load; select_agent() uses the latest
+    reports to pick among matching agents (see AgentSelector). Load is
+    kept in memory only.
+    """
+
+    def __init__(self, registry_file: str = "agent_registry.json",
+                 flush_interval: float = 0.2, compact_after: int = 10000):
         self.registry_file = registry_file
+        self.flush_interval = flush_interval
+        self.compact_after = compact_after
         self.agents: Dict[str, AgentRecord] = {}
         self.capability_index: Dict[str, Set[str]] = {}  # capability -> set of agent_ids
+        self.agent_capabilities: Dict[str, FrozenSet[str]] = {}  # agent_id -> indexed capabilities
+        self.status_index: Dict[str, Set[str]] = {}  # status -> set of agent_ids
+        self.agent_load: Dict[str, AgentLoad] = {}  # agent_id -> last reported load
         self.running = False
         self.cleanup_task: Optional[asyncio.Task] = None
 
+        # Expiry: agent_id -> monotonic deadline, and a heap of (deadline, agent_id)
+        # entries that may lag behind it (moved by heartbeats, or agent removed)
+        self._expires_at: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._expiry_wakeup: Optional[asyncio.Event] = None
+        self._next_wakeup = float("inf")
+        self.expired_count = 0
+
+        # Watchers notified of every registry change
+        self.revision = 0
+        self._watchers: List[Callable[[RegistryChange], None]] = []
+
+        # Registry persistence: changes not yet written, and the write in flight
+        self.log = RegistryLog(registry_file)
+        self._pending: List[Dict[str, Any]] = []
+        self._generation = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_job: Optional[asyncio.Future] = None
+
         # Load existing registry
         self._load_registry()
 
@@ -105,50 +287,80 @@ class DiscoveryService:
         """Register an agent with the discovery service."""
 
         agent_id = agent_record.agent_id
-
-        # Update existing or add new
-        if agent_id in self.agents:
-            # Update existing record
-            existing = self.agents[agent_id]
-            existing.endpoints = agent_record.endpoints
-            existing.capabilities = agent_record.capabilities
-            existing.metadata = agent_record.metadata
-            existing.last_seen = datetime.utcnow()
-            existing.status = agent_record.status
-            existing.ttl = agent_record.ttl
-        else:
-            # Add new record
-            agent_record.registered_at = datetime.utcnow()
-            self.agents[agent_id] = agent_record
-
-        # Update capability index
+        existing = self.agents.get(agent_id)
+
+        if existing is not None:
+            # Update existing record: only the fields that changed are applied and logged
+            changes = {name: getattr(agent_record, name) for name in UPDATABLE_FIELDS}
+            entry = self._apply_update(existing, changes, force=agent_record is existing)
+            if entry is not None:
+                self._record_change(entry)
+            logger.info(f"Registered agent: {agent_id}")
+            return True
+
+        # Add new record
+        agent_record.registered_at = datetime.utcnow()
+        self.agents[agent_id] = agent_record
+        self._update_status_index(agent_id, None, agent_record.status)
+
+        # Update capability index and expiry
         self._update_capability_index(agent_id, agent_record.capabilities)
+        self._arm_expiry(agent_record)
 
-        # Save to disk
-        self._save_registry()
+        # Persist the change
+        self._record_change({"op": "put", "agent": agent_record.to_dict()})
 
         logger.info(f"Registered agent: {agent_id}")
         return True
 
+    def update_agent(self, agent_id: str, changes: Dict[str, Any]) -> bool:
+        """
+        Delta registration: set only the given fields (any of
+        UPDATABLE_FIELDS) of a registered agent. Counts as a heartbeat.
+        """
+
+        return not self.apply_updates({agent_id: changes})
+
+    def apply_updates(self, updates: Mapping[str, Dict[str, Any]]) -> List[str]:
+        """
+        Apply delta registrations for many agents (agent_id -> changed
+        fields) as one batch of log entries. Returns the IDs of agents that
+        are not registered.
+        """
+
+        for changes in updates.values():
+            unknown = set(changes) - set(UPDATABLE_FIELDS)
+            if unknown:
+                raise ValueError(f"Fields cannot be updated: {sorted(unknown)}")
+
+        missing, entries = [], []
+        for agent_id, changes in updates.items():
+            agent = self.agents.get(agent_id)
+            if agent is None:
+                missing.append(agent_id)
+                continue
+            entry = self._apply_update(agent, changes)
+            if entry is not None:
+                entries.append(entry)
+
+        self._record_changes(entries)
+        return missing
+
     def unregister_agent(self, agent_id: str) -> bool:
         """Unregister an agent from the discovery service."""
 
         if agent_id not in self.agents:
             return False
 
-        # Remove from capability index
-        capabilities = self.agents[agent_id].capabilities
-        for capability in capabilities:
-            if capability in self.capability_index:
-                self.capability_index[capability].discard(agent_id)
-                if not self.capability_index[capability]:
-                    del self.capability_index[capability]
-
-        # Remove agent
+        # Remove from indexes and the registry
+        self._update_capability_index(agent_id, ())
+        self._update_status_index(agent_id, self.agents[agent_id].status, None)
+        self._expires_at.pop(agent_id, None)
+        self.agent_load.pop(agent_id, None)
         del self.agents[agent_id]
 
-        # Save to disk
-        self._save_registry()
+        # Persist the change
+        self._record_change({"op": "delete", "agent_id": agent_id})
 
         logger.info(f"Unregistered agent: {agent_id}")
         return True
@@ -159,72 +371,118 @@ class DiscoveryService:
         if agent_id not in self.agents:
             return False
 
-        self.agents[agent_id].status = status
-        self.agents[agent_id].last_seen = datetime.utcnow()
+        agent = self.agents[agent_id]
+        self._update_status_index(agent_id, agent.status, status)
+        agent.status = status
+        agent.last_seen = datetime.utcnow()
+        self._set_deadline(agent_id, time.monotonic() + agent.ttl)
 
-        self._save_registry()
+        self._record_change({
+            "op": "status", "agent_id": agent_id,
+            "status": status, "last_seen": agent.last_seen.isoformat()
+        })
         return True
 
-    def heartbeat(self, agent_id: str) -> bool:
-        """Update agent's last seen timestamp."""
+    def heartbeat(self, agent_id: str, load: Optional[AgentLoad] = None) -> bool:
+        """Update agent's last seen timestamp, and its load if reported."""
 
-        if agent_id not in self.agents:
+        agent = self.agents.get(agent_id)
+        if agent is None:
             return False
 
-        self.agents[agent_id].update_last_seen()
+        agent.update_last_seen()
+        if load is not None:
+            self.agent_load[agent_id] = load
+        self._set_deadline(agent_id, time.monotonic() + agent.ttl)
         return True
 
-    def discover_agents(self, query: ServiceQuery) -> List[AgentRecord]:
-        """Discover agents matching the query criteria."""
+    def heartbeat_many(self, loads: Mapping[str, Optional[AgentLoad]]) -> List[str]:
+        """
+        Heartbeat many agents at once (agent_id -> load, or None). Returns
+        the IDs of agents that are not registered.
+        """
 
-        candidates = list(self.agents.values())
+        last_seen = datetime.utcnow()
+        now = time.monotonic()
+        missing = []
+        for agent_id, load in loads.items():
+            agent = self.agents.get(agent_id)
+            if agent is None:
+                missing.append(agent_id)
+                continue
 
-        # Filter by agent_id
-        if query.agent_id:
-            candidates = [agent for agent in candidates if agent.agent_id == query.agent_id]
+            agent.last_seen = last_seen
+            if load is not None:
+                self.agent_load[agent_id] = load
+            self._set_deadline(agent_id, now + agent.ttl)
+        return missing
 
-        # Filter by status
-        if query.status:
-            candidates = [agent for agent in candidates if agent.status == query.status]
+    def discover_agents(self, query: ServiceQuery) -> List[AgentView]:
+        """
+        Discover agents matching the query criteria.
 
-        # Filter by capabilities
-        if query.capabilities:
-            filtered = []
-            for agent in candidates:
-                if all(agent.has_capability(cap) for cap in query.capabilities):
-                    filtered.append(agent)
-            candidates = filtered
+        Results are read-only views of the registry records, limited to
+        query.fields when given; the registry itself is never modified.
+        """
 
-        # Remove expired agents
-        candidates = [agent for agent in candidates if not agent.is_expired()]
+        now = time.monotonic()
+        results = []
+        if query.max_results <= 0:
+            return results
 
-        # Limit results
-        candidates = candidates[:query.max_results]
+        projection = None
+        if query.fields is not None:
+            unknown = set(query.fields) - set(RECORD_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown record fields: {sorted(unknown)}")
+            projection = frozenset(query.fields) | {"agent_id"}
 
-        # Remove metadata if not requested
-        if not query.include_metadata:
-            for agent in candidates:
-                agent.metadata = {}
+        for agent_id in self._plan_query(query):
+            agent = self.agents.get(agent_id)
+            if agent is None or self._is_expired(agent_id, now):
+                continue
+            results.append(AgentView(agent, projection, query.include_metadata))
+            if len(results) >= query.max_results:
+                break
 
-        return candidates
+        return results
 
     def get_agent_record(self, agent_id: str) -> Optional[AgentRecord]:
         """Get a specific agent's record."""
 
         agent = self.agents.get(agent_id)
-        if agent and not agent.is_expired():
+        if agent and not self._is_expired(agent_id):
             return agent
         return None
 
+    def get_agent_load(self, agent_id: str) -> Optional[AgentLoad]:
+        """Load from the agent's last heartbeat, if it reported any."""
+
+        return self.agent_load.get(agent_id)
+
+    def select_agent(self, query: ServiceQuery, strategy: str = "power_of_two",
+                     key: str = None) -> Optional[AgentView]:
+        """
+        Pick one agent matching the query by reported load.
+
+        This selector keeps no record of earlier picks; callers assigning
+        many tasks between heartbeats should hold their own AgentSelector
+        and acquire/release per task.
+        """
+
+        query = replace(query, max_results=sys.maxsize)
+        return AgentSelector(self.get_agent_load, strategy).select(self.discover_agents(query), key)
+
     def get_agents_by_capability(self, capability: str) -> List[AgentRecord]:
         """Get all agents with a specific capability."""
 
         agent_ids = self.capability_index.get(capability, set())
         agents = []
 
+        now = time.monotonic()
         for agent_id in agent_ids:
             agent = self.agents.get(agent_id)
-            if agent and not agent.is_expired() and agent.status == "active":
+            if agent and not self._is_expired(agent_id, now) and agent.status == "active":
                 agents.append(agent)
 
         return agents
@@ -237,178 +495,475 @@ class DiscoveryService:
     def get_registry_stats(self) -> Dict[str, Any]:
         """Get statistics about the agent registry."""
 
+        now = time.monotonic()
         total_agents = len(self.agents)
-        active_agents = len([a for a in self.agents.values() if a.status == "active" and not a.is_expired()])
         capabilities = len(self.capability_index)
 
         # Count agents by status
         status_counts = {}
-        for agent in self.agents.values():
-            if not agent.is_expired():
+        for agent_id, agent in self.agents.items():
+            if not self._is_expired(agent_id, now):
                 status_counts[agent.status] = status_counts.get(agent.status, 0) + 1
+        active_agents = status_counts.get("active", 0)
 
         return {
             "total_agents": total_agents,
             "active_agents": active_agents,
             "total_capabilities": capabilities,
-            "status_counts": status_counts
+            "status_counts": status_counts,
+            "expired_agents": self.expired_count,
+            "load_reports": len(self.agent_load),
+            "persistence": {**self.log.get_stats(), "pending_changes": len(self._pending)}
         }
 
-    def _update_capability_index(self, agent_id: str, capabilities: List[str]):
-        """Update the capability index for an agent."""
+    async def flush(self):
+        """Write all pending registry changes to disk."""
 
-        # Remove old capabilities
-        for cap_set in self.capability_index.values():
-            cap_set.discard(agent_id)
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
 
-        # Add new capabilities
-        for capability in capabilities:
-            if capability not in self.capability_index:
-                self.capability_index[capability] = set()
-            self.capability_index[capability].add(agent_id)
+        while self._pending or self._flush_job:
+            if self._flush_job:
+                await asyncio.shield(self._flush_job)
+            else:
+                self._start_flush()
 
-        # Clean up empty capability sets
-        empty_caps = [cap for cap, agents in self.capability_index.items() if not agents]
-        for cap in empty_caps:
-            del self.capability_index[cap]
+    def _plan_query(self, query: ServiceQuery) -> Iterable[str]:
+        """
+        Yield IDs of agents matching the query's agent_id, status and
+        capabilities, cheapest index first (expiry is left to the caller).
+        """
+
+        if query.agent_id:
+            agent = self.agents.get(query.agent_id)
+            if (agent is not None and (not query.status or agent.status == query.status) and
+                    all(agent.has_capability(cap) for cap in query.capabilities or ())):
+                yield query.agent_id
+            return
+
+        index_sets = [self.capability_index.get(cap, ()) for cap in query.capabilities or ()]
+        if query.status:
+            index_sets.append(self.status_index.get(query.status, ()))
+
+        if not index_sets:
+            yield from self.agents
+            return
+
+        # Walk the smallest set and probe the rest, smallest first
+        index_sets.sort(key=len)
+        smallest, others = index_sets[0], index_sets[1:]
+        for agent_id in smallest:
+            if all(agent_id in other for other in others):
+                yield agent_id
+
+    def _update_status_index(self, agent_id: str, old_status: Optional[str], new_status: Optional[str]):
+        """Move an agent between status index sets."""
+
+        if old_status == new_status:
+            return
+
+        if old_status is not None:
+            agent_ids = self.status_index.get(old_status)
+            if agent_ids is not None:
+                agent_ids.discard(agent_id)
+                if not agent_ids:
+                    del self.status_index[old_status]
+
+        if new_status is not None:
+            self.status_index.setdefault(new_status, set()).add(agent_id)
+
+    def _update_capability_index(self, agent_id: str, capabilities: Iterable[str]):
+        """
+        Update the capability index for an agent, touching only the sets it
+        joins or leaves. The previous capabilities come from agent_capabilities
+        rather than the record, whose list callers may have changed in place.
+        """
+
+        old = self.agent_capabilities.get(agent_id, frozenset())
+        new = frozenset(capabilities)
+        if new == old:
+            return
+
+        for capability in old - new:
+            agent_ids = self.capability_index.get(capability)
+            if agent_ids is not None:
+                agent_ids.discard(agent_id)
+                if not agent_ids:
+                    del self.capability_index[capability]
+
+        for capability in new - old:
+            self.capability_index.setdefault(capability, set()).add(agent_id)
+
+        if new:
+            self.agent_capabilities[agent_id] = new
+        else:
+            self.agent_capabilities.pop(agent_id, None)
+
+    def _apply_update(self, agent: AgentRecord, changes: Dict[str, Any],
+                      force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Set changed fields on a record, keeping indexes and expiry current.
+        Returns the log entry for the fields that differed (all of them if
+        force, e.g. the caller modified the record in place), or None.
+        """
+
+        agent_id = agent.agent_id
+        changed = {name: value for name, value in changes.items()
+                   if force or getattr(agent, name) != value}
+
+        if "status" in changed:
+            self._update_status_index(agent_id, agent.status, changed["status"])
+        if "capabilities" in changed:
+            self._update_capability_index(agent_id, changed["capabilities"])
+        for name, value in changed.items():
+            setattr(agent, name, value)
+
+        agent.update_last_seen()
+        self._set_deadline(agent_id, time.monotonic() + agent.ttl)
+
+        if not changed:
+            return None
+        return {"op": "patch", "agent_id": agent_id, "changes": copy.deepcopy(changed),
+                "last_seen": agent.last_seen.isoformat()}
+
+    def _is_expired(self, agent_id: str, now: Optional[float] = None) -> bool:
+        deadline = self._expires_at.get(agent_id)
+        return deadline is not None and deadline <= (now if now is not None else time.monotonic())
+
+    def _arm_expiry(self, agent: AgentRecord):
+        """Set an agent's deadline from its last_seen and ttl."""
+
+        age = (datetime.utcnow() - agent.last_seen).total_seconds()
+        self._set_deadline(agent.agent_id, time.monotonic() + agent.ttl - age)
+
+    def _set_deadline(self, agent_id: str, deadline: float):
+        previous = self._expires_at.get(agent_id)
+        self._expires_at[agent_id] = deadline
+
+        # A later deadline is picked up when the existing heap entry comes due
+        if previous is not None and deadline >= previous:
+            return
+
+        heapq.heappush(self._expiry_heap, (deadline, agent_id))
+        if len(self._expiry_heap) > 2 * len(self._expires_at) + 1024:
+            # Drop entries left behind by removed agents and shortened deadlines
+            self._expiry_heap = [(d, a) for a, d in self._expires_at.items()]
+            heapq.heapify(self._expiry_heap)
+
+        if deadline < self._next_wakeup and self._expiry_wakeup is not None:
+            self._expiry_wakeup.set()
+
+    def _expire_due(self, now: float) -> List[str]:
+        """Remove agents whose deadline has passed; O(log n) per due heap entry."""
+
+        expired = []
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, agent_id = heapq.heappop(heap)
+            deadline = self._expires_at.get(agent_id)
+            if deadline is None:
+                continue  # already removed
+            if deadline > now:
+                heapq.heappush(heap, (deadline, agent_id))  # heartbeat moved it
+                continue
+
+            logger.info(f"Removing expired agent: {agent_id}")
+            self.unregister_agent(agent_id)
+            self.expired_count += 1
+            expired.append(agent_id)
+
+        return expired
 
     async def _cleanup_expired_agents(self):
-        """Periodically clean up expired agent records."""
+        """Remove agents as their deadlines pass."""
 
-        while self.running:
-            try:
-                await asyncio.sleep(60)  # Clean up every minute
+        self._expiry_wakeup = asyncio.Event()
+        try:
+            while self.running:
+                try:
+                    now = time.monotonic()
+                    self._expire_due(now)
+
+                    # Sleep until the earliest deadline, or until an earlier one is set
+                    self._next_wakeup = self._expiry_heap[0][0] if self._expiry_heap else float("inf")
+                    self._expiry_wakeup.clear()
+                    timeout = None if not self._expiry_heap else max(0.0, self._next_wakeup - now)
+                    try:
+                        await asyncio.wait_for(self._expiry_wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    logger.error(f"Error in cleanup task: {e}")
+        finally:
+            self._expiry_wakeup = None
+            self._next_wakeup = float("inf")
 
-                expired_agents = []
-                for agent_id, agent in self.agents.items():
-                    if agent.is_expired():
-                        expired_agents.append(agent_id)
+    def add_watcher(self, callback: Callable[[RegistryChange], None]):
+        """Call callback synchronously with every registry change."""
 
-                for agent_id in expired_agents:
-                    logger.info(f"Removing expired agent: {agent_id}")
-                    self.unregister_agent(agent_id)
+        if callback not in self._watchers:
+            self._watchers.append(callback)
 
-            except asyncio.CancelledError:
-                break
+    def remove_watcher(self, callback: Callable[[RegistryChange], None]):
+        """Stop calling a watcher."""
+
+        if callback in self._watchers:
+            self._watchers.remove(callback)
+
+    async def watch(self, max_pending: int = 1024) -> AsyncIterator[RegistryChange]:
+        """
+        Stream registry changes as they happen.
+
+        If the consumer falls more than max_pending changes behind, the
+        backlog is dropped and a single "resync" change is yielded; the
+        consumer should then re-query what it holds.
+        """
+
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def enqueue(change: RegistryChange):
+            if queue.qsize() >= max_pending:
+                while not queue.empty():
+                    queue.get_nowait()
+                change = RegistryChange(change.revision, "resync")
+            queue.put_nowait(change)
+
+        self.add_watcher(enqueue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.remove_watcher(enqueue)
+
+    def _notify(self, op: str, agent_id: str):
+        self.revision += 1
+        if not self._watchers:
+            return
+
+        record = self.agents.get(agent_id) if op == "put" else None
+        change = RegistryChange(self.revision, op, agent_id,
+                                AgentView(record) if record is not None else None)
+        for callback in list(self._watchers):
+            try:
+                callback(change)
             except Exception as e:
-                logger.error(f"Error in cleanup task: {e}")
+                logger.error(f"Error in registry watcher: {e}")
 
-    def _load_registry(self):
-        """Load agent registry from disk."""
+    def _record_change(self, entry: Dict[str, Any]):
+        """Persist a change (queued for the registry log) and notify watchers."""
+
+        self._record_changes([entry])
+
+    def _record_changes(self, entries: List[Dict[str, Any]]):
+        if not entries:
+            return
+
+        for entry in entries:
+            agent_id = entry["agent"]["agent_id"] if entry["op"] == "put" else entry["agent_id"]
+            self._notify("delete" if entry["op"] == "delete" else "put", agent_id)
+
+        self._pending.extend(entries)
 
         try:
-            with open(self.registry_file, 'r') as f:
-                data = json.load(f)
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            entries, self._pending = self._pending, []
+            self._write_changes(entries, self._generation, None)
+            return
+
+        if self._flush_handle is None and self._flush_job is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self._start_flush)
+
+    def _start_flush(self):
+        """Hand pending changes to an executor thread; one write is in flight at a time."""
+
+        self._flush_handle = None
+        if not self._pending or self._flush_job is not None:
+            return
+
+        entries, self._pending = self._pending, []
+        records = None
+        if self.log.entries + len(entries) >= self.compact_after:
+            # The snapshot reflects every change taken so far. Records are copied
+            # here, as the loop keeps updating them while the thread writes
+            self._generation += 1
+            records = [agent.to_dict() for agent in self.agents.values()]
+
+        loop = asyncio.get_running_loop()
+        self._flush_job = loop.run_in_executor(
+            None, self._write_changes, entries, self._generation, records
+        )
+        self._flush_job.add_done_callback(self._flush_done)
+
+    def _flush_done(self, job: asyncio.Future):
+        self._flush_job = None
+        if not job.cancelled() and job.exception() is not None:
+            logger.error(f"Error saving registry: {job.exception()}")
+
+        if self._pending and self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.flush_interval, self._start_flush
+            )
+
+    def _write_changes(self, entries: List[Dict[str, Any]], generation: int,
+                       records: Optional[List[Dict[str, Any]]]):
+        """Append changes to the log, or compact into a snapshot of record dicts."""
 
-            for agent_data in data.get('agents', []):
-                try:
-                    agent = AgentRecord.from_dict(agent_data)
-                    if not agent.is_expired():
-                        self.agents[agent.agent_id] = agent
-                        self._update_capability_index(agent.agent_id, agent.capabilities)
-                except Exception as e:
-                    logger.error(f"Error loading agent record: {e}")
+        try:
+            if records is not None:
+                self.log.compact(records, generation)
+            else:
+                self.log.append(entries, generation)
+        except Exception as e:
+            logger.error(f"Error saving registry: {e}")
 
-            logger.info(f"Loaded {len(self.agents)} agents from registry")
+    def _load_registry(self):
+        """Load agent registry from disk, replaying the change log over the snapshot."""
 
-        except FileNotFoundError:
-            logger.info("No existing registry file found, starting fresh")
+        try:
+            state = self.log.load()
         except Exception as e:
             logger.error(f"Error loading registry: {e}")
+            return
 
-    def _save_registry(self):
-        """Save agent registry to disk."""
+        if not state:
+            logger.info("No existing registry file found, starting fresh")
+            return
 
-        try:
-            data = {
-                'agents': [agent.to_dict() for agent in self.agents.values()],
-                'last_updated': datetime.utcnow().isoformat()
-            }
+        now = datetime.utcnow()
+        for agent_data in state.values():
+            try:
+                agent = AgentRecord.from_dict(agent_data)
+                if not agent.is_expired(now):
+                    self.agents[agent.agent_id] = agent
+                    self._update_status_index(agent.agent_id, None, agent.status)
+                    self._update_capability_index(agent.agent_id, agent.capabilities)
+                    self._arm_expiry(agent)
+            except Exception as e:
+                logger.error(f"Error loading agent record: {e}")
 
-            with open(self.registry_file, 'w') as f:
-                json.dump(data, f, indent=2)
+        logger.info(f"Loaded {len(self.agents)} agents from registry "
+                    f"({self.log.entries} log entries replayed)")
 
-        except Exception as e:
-            logger.error(f"Error saving registry: {e}")
+    def _save_registry(self):
+        """Write a full snapshot of the registry now (e.g. on shutdown)."""
 
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        # The snapshot covers every pending change and supersedes any write in flight
+        self._pending = []
+        self._generation += 1
+        self._write_changes([], self._generation, [agent.to_dict() for agent in self.agents.values()])
 
-class PeerDiscoveryService:
-    """Peer-to-peer agent discovery for decentralized networks."""
 
-    def __init__(self, local_agent_id: str, known_peers: List[str] = None):
+class PeerDiscoveryService:
+    """
+    Peer-to-peer agent discovery for decentralized networks.
+
+    Each service runs a GossipNode (SWIM membership over UDP). Agents
+    published here are gossiped to every node, and records gossiped by
+    other nodes are merged into discovered_agents, which query_peers
+    answers from; an agent disappears everywhere when its node leaves or
+    is declared dead. No node holds a central registry file.
+    """
+
+    def __init__(self, local_agent_id: str, known_peers: List[str] = None,
+                 config: GossipConfig = None):
         self.local_agent_id = local_agent_id
         self.known_peers = set(known_peers or [])
         self.discovered_agents: Dict[str, AgentRecord] = {}
         self.broadcast_addresses: List[str] = []
         self.running = False
-        self.discovery_task: Optional[asyncio.Task] = None
+        self.node = GossipNode(local_agent_id, config, on_agent_change=self._on_agent_change)
+
+    @property
+    def address(self) -> Optional[str]:
+        """host:port this node gossips on, once started."""
+        if self.node.address is None:
+            return None
+        return f"{self.node.address[0]}:{self.node.address[1]}"
 
     def add_broadcast_address(self, address: str):
-        """Add a broadcast address for peer discovery."""
+        """Add a host:port contacted when joining, like a known peer."""
         if address not in self.broadcast_addresses:
             self.broadcast_addresses.append(address)
 
     def add_known_peer(self, peer_address: str):
-        """Add a known peer for bootstrapping."""
+        """Add a known peer (host:port) for bootstrapping."""
         self.known_peers.add(peer_address)
 
-    async def start_discovery(self):
-        """Start peer discovery process."""
+    async def start_discovery(self) -> bool:
+        """Start gossiping and join through the known peers; False if none answered."""
+
+        await self.node.start()
         self.running = True
-        self.discovery_task = asyncio.create_task(self._discovery_loop())
         logger.info("Peer discovery started")
 
+        seeds = [self._parse_address(peer) for peer in
+                 sorted(self.known_peers) + self.broadcast_addresses]
+        if not seeds:
+            return True
+        return await self.node.join(seeds)
+
     async def stop_discovery(self):
-        """Stop peer discovery process."""
+        """Leave the gossip group."""
         self.running = False
-        if self.discovery_task:
-            self.discovery_task.cancel()
+        await self.node.stop()
 
-    async def broadcast_presence(self):
-        """Broadcast local agent presence to network."""
+    def publish_agent(self, record: AgentRecord):
+        """Announce an agent hosted on this node (again, after a change)."""
+        self.node.publish(record.to_dict())
 
-        presence_message = {
-            "type": "agent_presence",
-            "agent_id": self.local_agent_id,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+    def withdraw_agent(self, agent_id: str):
+        """Remove an agent hosted on this node from every peer."""
+        self.node.withdraw(agent_id)
 
-        # In a real implementation, this would use UDP broadcast
-        # For now, we'll simulate by logging
-        logger.debug(f"Broadcasting presence: {presence_message}")
+    async def broadcast_presence(self):
+        """Push full state to a random peer now, instead of waiting for the next sync."""
+
+        self.node.push_pull()
 
     async def query_peers(self, query: ServiceQuery) -> List[AgentRecord]:
-        """Query known peers for agents matching criteria."""
+        """Agents gossiped by peers (and this node) matching the query."""
 
-        results = []
+        if query.agent_id:
+            agent = self.discovered_agents.get(query.agent_id)
+            candidates = [agent] if agent else []
+        else:
+            candidates = self.discovered_agents.values()
 
-        # Query known peers (simplified - would make actual network calls)
-        for peer in self.known_peers:
-            try:
-                # In a real implementation:
-                # agents = await self._query_peer(peer, query)
-                # results.extend(agents)
-                pass
-            except Exception as e:
-                logger.error(f"Error querying peer {peer}: {e}")
+        results = []
+        for agent in candidates:
+            if query.status and agent.status != query.status:
+                continue
+            if query.capabilities and not all(agent.has_capability(cap) for cap in query.capabilities):
+                continue
+            results.append(agent)
+            if len(results) >= query.max_results:
+                break
 
         return results
 
-    async def _discovery_loop(self):
-        """Main discovery loop."""
-
-        while self.running:
-            try:
-                # Broadcast presence
-                await self.broadcast_presence()
-
-                # Query known peers for updates
-                # (Implementation would go here)
+    def get_stats(self) -> Dict[str, Any]:
+        """Gossip membership, bandwidth and propagation metrics."""
+        return {**self.node.get_stats(), "discovered_agents": len(self.discovered_agents)}
 
-                await asyncio.sleep(30)  # Discover every 30 seconds
+    def _on_agent_change(self, agent_id: str, record: Optional[Dict[str, Any]]):
+        if record is None:
+            self.discovered_agents.pop(agent_id, None)
+            return
+        try:
+            self.discovered_agents[agent_id] = AgentRecord.from_dict(dict(record))
+        except Exception as e:
+            logger.error(f"Error merging gossiped agent record {agent_id}: {e}")
 
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in discovery loop: {e}")
-                await asyncio.sleep(5)
\ No newline at end of file
+    @staticmethod
+    def _parse_address(address: str) -> Tuple[str, int]:
+        host, _, port = address.rpartition(":")
+        return host.strip("[]"), int(port)
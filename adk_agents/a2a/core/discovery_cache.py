@@ -0,0 +1,166 @@
+"""
+Client-side Discovery Cache for A2A Protocol
+
+Resolving a receiver's endpoint, or the agents offering a capability, on
+every message costs a registry query each time. DiscoveryCache answers
+these lookups locally. It watches the discovery service for registration
+and removal deltas and applies them to what it holds, and re-queries any
+entry older than its TTL as a fallback for changes it did not see.
+
+Only active agents are cached, matching the default ServiceQuery.
+"""
+
+import sys
+import time
+import logging
+from typing import Dict, Optional, Any, List, Set, Tuple, FrozenSet
+
+from .discovery import DiscoveryService, AgentView, ServiceQuery, RegistryChange
+
+logger = logging.getLogger(__name__)
+
+CACHED_FIELDS = ["endpoints", "capabilities", "status"]
+
+
+class DiscoveryCache:
+    """Cache of agent_id -> record and capability -> agents, kept fresh by registry deltas."""
+
+    def __init__(self, discovery: DiscoveryService, ttl: float = 30.0):
+        self.discovery = discovery
+        self.ttl = ttl
+
+        self._agents: Dict[str, Tuple[AgentView, float]] = {}  # agent_id -> (view, fetched at)
+        self._agent_capabilities: Dict[str, FrozenSet[str]] = {}  # agent_id -> capabilities as cached
+        self._capabilities: Dict[str, Tuple[Set[str], float]] = {}  # capability -> (agent_ids, fetched at)
+
+        self.hits = 0
+        self.misses = 0
+        self.deltas = 0
+
+        discovery.add_watcher(self._on_change)
+
+    def resolve(self, agent_id: str) -> Optional[AgentView]:
+        """View of an active agent's record (at least endpoints, capabilities, status), or None."""
+
+        now = time.monotonic()
+        entry = self._agents.get(agent_id)
+        if entry is not None and now - entry[1] < self.ttl:
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        views = self.discovery.discover_agents(
+            ServiceQuery(agent_id=agent_id, fields=CACHED_FIELDS)
+        )
+        if not views:
+            self._forget(agent_id)
+            return None
+
+        self._store(views[0], now)
+        return views[0]
+
+    def find(self, capabilities: List[str], max_results: int = 50) -> List[AgentView]:
+        """Active agents that have all the given capabilities."""
+
+        if not capabilities:
+            # Unfiltered queries are not cached
+            return self.discovery.discover_agents(
+                ServiceQuery(max_results=max_results, fields=CACHED_FIELDS)
+            )
+
+        sets = sorted((self._capability_members(cap) for cap in set(capabilities)), key=len)
+        smallest, others = sets[0], sets[1:]
+
+        results = []
+        for agent_id in smallest:
+            if all(agent_id in other for other in others):
+                results.append(self._agents[agent_id][0])
+                if len(results) >= max_results:
+                    break
+        return results
+
+    def invalidate(self, agent_id: Optional[str] = None):
+        """Drop one agent, or everything, so the next lookup re-queries."""
+
+        if agent_id is None:
+            self._agents.clear()
+            self._agent_capabilities.clear()
+            self._capabilities.clear()
+        else:
+            self._forget(agent_id)
+
+    def close(self):
+        """Stop watching the discovery service."""
+
+        self.discovery.remove_watcher(self._on_change)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "cached_agents": len(self._agents),
+            "cached_capabilities": len(self._capabilities),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "deltas": self.deltas,
+        }
+
+    def _capability_members(self, capability: str) -> Set[str]:
+        now = time.monotonic()
+        entry = self._capabilities.get(capability)
+        if entry is not None and now - entry[1] < self.ttl:
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        views = self.discovery.discover_agents(
+            ServiceQuery(capabilities=[capability], max_results=sys.maxsize, fields=CACHED_FIELDS)
+        )
+        members = set()
+        self._capabilities[capability] = (members, now)
+        for view in views:
+            self._store(view, now)
+        return members
+
+    def _store(self, view: AgentView, now: float):
+        """Cache an active agent and update the cached capability sets it belongs to."""
+
+        agent_id = view.agent_id
+        capabilities = frozenset(view.capabilities)
+        previous = self._agent_capabilities.get(agent_id, frozenset())
+
+        for capability in previous - capabilities:
+            entry = self._capabilities.get(capability)
+            if entry is not None:
+                entry[0].discard(agent_id)
+        for capability in capabilities:
+            entry = self._capabilities.get(capability)
+            if entry is not None:
+                entry[0].add(agent_id)
+
+        self._agents[agent_id] = (view, now)
+        self._agent_capabilities[agent_id] = capabilities
+
+    def _forget(self, agent_id: str):
+        self._agents.pop(agent_id, None)
+        for capability in self._agent_capabilities.pop(agent_id, ()):
+            entry = self._capabilities.get(capability)
+            if entry is not None:
+                entry[0].discard(agent_id)
+
+    def _on_change(self, change: RegistryChange):
+        self.deltas += 1
+
+        if change.op == "resync":
+            self.invalidate()
+            return
+
+        agent_id = change.agent_id
+        record = change.record
+        if change.op == "delete" or record is None or record.status != "active":
+            self._forget(agent_id)
+            return
+
+        # Cache the agent if it was looked up before or joins a cached capability
+        if agent_id in self._agents or any(cap in self._capabilities for cap in record.capabilities):
+            self._store(record, time.monotonic())
@@ -0,0 +1,685 @@
+"""
+Sharded, Replicated Discovery Registry for A2A Protocol
+
+Runs the discovery registry as a cluster of standalone servers instead of a
+DiscoveryService inside each agent. Agent records are sharded by consistent
+hashing of agent_id over the cluster nodes and stored on the
+replication_factor nodes that follow the key on the ring. A write is
+coordinated by the first reachable replica, applied there and forwarded to
+the other replicas, and succeeds once a majority of the replicas have it,
+so any two successful writes to a record share a replica. With the default
+three replicas a write survives, and still succeeds with, one replica down.
+Replicas that missed a registration are repaired by the agent's next
+heartbeat.
+
+Heartbeats and delta registrations for many agents (e.g. from a host's
+HeartbeatAggregator) travel as one batch per node: the client sends each
+node the agents it coordinates, and the node forwards one batch per peer
+replica.
+
+DiscoveryClusterClient routes agent_id operations to the key's replicas
+(falling back along the ring when a node is down) and fans capability
+queries out to just enough nodes to cover every shard.
+
+Start a node with:
+
+    python -m adk_agents.a2a.core.discovery_cluster --listen 127.0.0.1:8701 \\
+        --nodes http://127.0.0.1:8701,http://127.0.0.1:8702,http://127.0.0.1:8703
+"""
+
+import os
+import sys
+import signal
+import socket
+import asyncio
+import argparse
+import bisect
+import hashlib
+import logging
+import subprocess
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Any, List, Mapping, Set
+
+import aiohttp
+
+from .discovery import DiscoveryService, AgentRecord, ServiceQuery
+from .load_balancing import AgentLoad
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClusterConfig:
+    """Discovery cluster layout, shared by servers and clients."""
+
+    nodes: List[str]  # Base URLs of every node, e.g. "http://127.0.0.1:8701"
+    replication_factor: int = 3  # Nodes holding each agent record
+    write_quorum: Optional[int] = None  # Replicas that must apply a write; a majority if unset
+    virtual_nodes: int = 64  # Ring positions per node
+    request_timeout: float = 2.0  # Seconds per request between nodes or from clients
+
+    @property
+    def replicas(self) -> int:
+        return max(1, min(self.replication_factor, len(self.nodes)))
+
+    @property
+    def quorum(self) -> int:
+        return self.write_quorum or self.replicas // 2 + 1
+
+
+class HashRing:
+    """Consistent hash ring mapping keys to an ordered list of distinct nodes."""
+
+    def __init__(self, nodes: List[str], virtual_nodes: int = 64):
+        self.nodes = list(nodes)
+        points = sorted((self._hash(f"{node}#{i}"), node)
+                        for node in self.nodes for i in range(virtual_nodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def replicas(self, key: str, count: int) -> List[str]:
+        """The first count distinct nodes clockwise from the key."""
+
+        if not self._hashes:
+            return []
+        count = min(count, len(self.nodes))
+        index = bisect.bisect(self._hashes, self._hash(key))
+        result: List[str] = []
+        for offset in range(len(self._owners)):
+            node = self._owners[(index + offset) % len(self._owners)]
+            if node not in result:
+                result.append(node)
+                if len(result) == count:
+                    break
+        return result
+
+
+class DiscoveryServer:
+    """One node of a discovery cluster, serving its shards over HTTP."""
+
+    def __init__(self, node_url: str, config: ClusterConfig, registry_file: Optional[str] = None):
+        if node_url not in config.nodes:
+            raise ValueError(f"{node_url} is not one of the cluster nodes")
+
+        self.node_url = node_url
+        self.config = config
+        self.ring = HashRing(config.nodes, config.virtual_nodes)
+        self.discovery = DiscoveryService(
+            registry_file or f"agent_registry-{node_url.rsplit(':', 1)[-1]}.json"
+        )
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.runner = None
+        self.stats = {"writes": 0, "forwarded_writes": 0, "forward_failures": 0,
+                      "repairs": 0, "queries": 0}
+
+    async def start(self, host: str, port: int):
+        """Start serving on host:port."""
+
+        from aiohttp import web
+
+        self.session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.config.request_timeout)
+        )
+        self.discovery.start()
+
+        app = web.Application()
+        app.router.add_post("/discovery/register", self._handle_register)
+        app.router.add_post("/discovery/unregister", self._handle_unregister)
+        app.router.add_post("/discovery/heartbeat", self._handle_heartbeat)
+        app.router.add_post("/discovery/status", self._handle_status)
+        app.router.add_post("/discovery/batch", self._handle_batch)
+        app.router.add_post("/discovery/query", self._handle_query)
+        app.router.add_get("/discovery/stats", self._handle_stats)
+
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host, port).start()
+        logger.info(f"Discovery node {self.node_url} serving on {host}:{port}")
+
+    async def stop(self):
+        self.discovery.stop()
+        if self.session:
+            await self.session.close()
+        if self.runner:
+            await self.runner.cleanup()
+
+    # Handlers
+
+    async def _handle_register(self, request):
+        data = await request.json()
+        record = AgentRecord.from_dict(dict(data["agent"]))
+        return await self._write(record.agent_id, "register", data,
+                                 lambda: self.discovery.register_agent(record))
+
+    async def _handle_unregister(self, request):
+        data = await request.json()
+        return await self._write(data["agent_id"], "unregister", data,
+                                 lambda: self.discovery.unregister_agent(data["agent_id"]))
+
+    async def _handle_status(self, request):
+        data = await request.json()
+        return await self._write(
+            data["agent_id"], "status", data,
+            lambda: self.discovery.update_agent_status(data["agent_id"], data["status"])
+        )
+
+    async def _handle_heartbeat(self, request):
+        data = await request.json()
+        load = AgentLoad.from_dict(data["load"]) if data.get("load") else None
+        return await self._write(data["agent_id"], "heartbeat", data,
+                                 lambda: self.discovery.heartbeat(data["agent_id"], load))
+
+    async def _handle_batch(self, request):
+        """Heartbeats or delta registrations for many agents: {"operation", "items": {agent_id: ...}}."""
+
+        from aiohttp import web
+
+        data = await request.json()
+        try:
+            return web.json_response(await self._write_batch(data))
+        except (ValueError, KeyError, TypeError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+    async def _handle_query(self, request):
+        from aiohttp import web
+
+        self.stats["queries"] += 1
+        try:
+            query = _parse_query(await request.json())
+        except (ValueError, TypeError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+        views = self.discovery.discover_agents(query)
+        return web.json_response({"agents": [view.to_dict() for view in views]})
+
+    async def _handle_stats(self, request):
+        from aiohttp import web
+
+        return web.json_response({
+            "node": self.node_url,
+            **self.stats,
+            "registry": self.discovery.get_registry_stats(),
+        })
+
+    # Replication
+
+    async def _write(self, agent_id: str, operation: str, data: Dict[str, Any], apply):
+        """Apply a write here if this node is a replica, and coordinate the others unless forwarded."""
+
+        from aiohttp import web
+
+        replicas = self.ring.replicas(agent_id, self.config.replicas)
+        local = self.node_url in replicas
+        applied = bool(apply()) if local else False
+
+        if data.get("forwarded"):
+            self.stats["forwarded_writes"] += 1
+            return web.json_response({"ok": applied})
+
+        self.stats["writes"] += 1
+        others = [node for node in replicas if node != self.node_url]
+        results = await asyncio.gather(
+            *(self._forward(node, operation, data) for node in others)
+        )
+
+        # A heartbeat for a record one side lacks (it missed the registration) repairs that side
+        if operation == "heartbeat":
+            if applied:
+                results = [await self._push_record(node, agent_id) if ok is False else ok
+                           for node, ok in zip(others, results)]
+            elif local and any(results):
+                source = others[results.index(True)]
+                applied = await self._pull_record(source, agent_id)
+
+        acks = int(local) + sum(ok is not None for ok in results)
+        found = applied or any(results)
+        return web.json_response({"ok": found and acks >= self.config.quorum, "acks": acks})
+
+    async def _write_batch(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Batch version of _write: apply the agents this node replicates, then
+        (unless forwarded) send each peer replica one batch of its agents.
+        """
+
+        operation, items = data["operation"], data["items"]
+        replicas = {agent_id: self.ring.replicas(agent_id, self.config.replicas)
+                    for agent_id in items}
+        local = {agent_id: items[agent_id] for agent_id, nodes in replicas.items()
+                 if self.node_url in nodes}
+
+        if operation == "heartbeat":
+            missing = self.discovery.heartbeat_many({
+                agent_id: AgentLoad.from_dict(load) if load else None
+                for agent_id, load in local.items()
+            })
+        elif operation == "update":
+            missing = self.discovery.apply_updates(local)
+        else:
+            raise ValueError(f"Unknown batch operation '{operation}'")
+        applied = set(local) - set(missing)
+
+        if data.get("forwarded"):
+            self.stats["forwarded_writes"] += len(items)
+            return {"missing": [agent_id for agent_id in items if agent_id not in applied]}
+
+        self.stats["writes"] += len(items)
+        batches: Dict[str, Dict[str, Any]] = {}
+        for agent_id, nodes in replicas.items():
+            for node in nodes:
+                if node != self.node_url:
+                    batches.setdefault(node, {})[agent_id] = items[agent_id]
+        results = await asyncio.gather(*(
+            self._forward(node, "batch", {"operation": operation, "items": batch}, "missing")
+            for node, batch in batches.items()
+        ))
+
+        acks = {agent_id: int(agent_id in local) for agent_id in items}
+        holders: Dict[str, str] = {}  # agent_id -> a peer that has the record
+        lacking: List[tuple] = []  # (node, agent_id) for peers without the record
+        for (node, batch), peer_missing in zip(batches.items(), results):
+            if peer_missing is None:
+                continue
+            peer_missing = set(peer_missing)
+            for agent_id in batch:
+                acks[agent_id] += 1
+                if agent_id in peer_missing:
+                    lacking.append((node, agent_id))
+                else:
+                    holders.setdefault(agent_id, node)
+
+        # As with single heartbeats, whichever side lacks a record is repaired
+        for node, agent_id in lacking:
+            if agent_id in applied:
+                await self._push_record(node, agent_id)
+        for agent_id in set(local) - applied:
+            if agent_id in holders and await self._pull_record(holders[agent_id], agent_id):
+                applied.add(agent_id)
+
+        failed = [agent_id for agent_id in items
+                  if not ((agent_id in applied or agent_id in holders) and
+                          acks[agent_id] >= self.config.quorum)]
+        return {"failed": failed}
+
+    async def _forward(self, node: str, operation: str, data: Dict[str, Any],
+                       result: str = "ok") -> Optional[Any]:
+        """Send a write to another replica and return its result; None if it could not be reached."""
+
+        try:
+            async with self.session.post(f"{node}/discovery/{operation}",
+                                         json={**data, "forwarded": True}) as response:
+                if response.status != 200:
+                    raise aiohttp.ClientError(f"HTTP {response.status}")
+                return (await response.json())[result]
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.stats["forward_failures"] += 1
+            logger.warning(f"Could not replicate {operation} to {node}: {e}")
+            return None
+
+    async def _push_record(self, node: str, agent_id: str) -> bool:
+        """Send the full record to a replica that does not have it."""
+
+        record = self.discovery.get_agent_record(agent_id)
+        if record is None:
+            return False
+        self.stats["repairs"] += 1
+        return bool(await self._forward(node, "register", {"agent": record.to_dict()}))
+
+    async def _pull_record(self, node: str, agent_id: str) -> bool:
+        """Fetch a record this node lacks from another replica and store it."""
+
+        query = {**asdict(ServiceQuery(agent_id=agent_id, status=None, include_metadata=True)),
+                 "fields": None}
+        try:
+            async with self.session.post(f"{node}/discovery/query", json=query) as response:
+                agents = (await response.json())["agents"]
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError) as e:
+            logger.warning(f"Could not fetch {agent_id} from {node}: {e}")
+            return False
+        if not agents:
+            return False
+
+        self.stats["repairs"] += 1
+        self.discovery.register_agent(AgentRecord.from_dict(agents[0]))
+        return True
+
+
+class DiscoveryClusterClient:
+    """Client for a discovery cluster: routes by agent_id, fans out capability queries."""
+
+    def __init__(self, config: ClusterConfig):
+        self.config = config
+        self.ring = HashRing(config.nodes, config.virtual_nodes)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.failed_nodes: Dict[str, int] = {}  # node -> consecutive failures
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def register_agent(self, record: AgentRecord) -> bool:
+        return await self._write(record.agent_id, "register", {"agent": record.to_dict()})
+
+    async def unregister_agent(self, agent_id: str) -> bool:
+        return await self._write(agent_id, "unregister", {"agent_id": agent_id})
+
+    async def update_agent_status(self, agent_id: str, status: str) -> bool:
+        return await self._write(agent_id, "status", {"agent_id": agent_id, "status": status})
+
+    async def heartbeat(self, agent_id: str, load: Optional[AgentLoad] = None) -> bool:
+        data = {"agent_id": agent_id}
+        if load is not None:
+            data["load"] = load.to_dict()
+        return await self._write(agent_id, "heartbeat", data)
+
+    async def heartbeat_many(self, loads: Mapping[str, Optional[AgentLoad]]) -> List[str]:
+        """Heartbeat many agents with one request per node; returns the IDs that failed."""
+
+        return await self._write_batch("heartbeat", {
+            agent_id: load.to_dict() if load is not None else None
+            for agent_id, load in loads.items()
+        })
+
+    async def update_agent(self, agent_id: str, changes: Dict[str, Any]) -> bool:
+        """Delta registration: send only the changed fields of a registered agent."""
+
+        return not await self.apply_updates({agent_id: changes})
+
+    async def apply_updates(self, updates: Mapping[str, Dict[str, Any]]) -> List[str]:
+        """Delta registrations for many agents, one request per node; returns the IDs that failed."""
+
+        return await self._write_batch("update", dict(updates))
+
+    async def get_agent_record(self, agent_id: str) -> Optional[AgentRecord]:
+        agents = await self.discover_agents(ServiceQuery(agent_id=agent_id, status=None,
+                                                         include_metadata=True))
+        return agents[0] if agents else None
+
+    async def discover_agents(self, query: ServiceQuery) -> List[AgentRecord]:
+        """
+        Agents matching the query. An agent_id query asks the key's
+        replicas in turn; other queries go to enough nodes to cover every
+        shard, and the results are merged. Full records are returned
+        (query.fields is not applied).
+        """
+
+        payload = {**asdict(query), "fields": None}
+
+        if query.agent_id:
+            for node in self._ordered(self.ring.replicas(query.agent_id, self.config.replicas)):
+                agents = await self._query(node, payload)
+                if agents:
+                    return agents
+            return []
+
+        # Every record lives on `replicas` nodes, so any N - R + 1 nodes see all of them
+        nodes = self._ordered(self.config.nodes)
+        needed = len(nodes) - self.config.replicas + 1
+        asked, answered = nodes[:needed], []
+        remaining = nodes[needed:]
+
+        merged: Dict[str, AgentRecord] = {}
+        while asked:
+            results = await asyncio.gather(*(self._query(node, payload) for node in asked))
+            failures = 0
+            for agents in results:
+                if agents is None:
+                    failures += 1
+                    continue
+                answered.append(agents)
+                for agent in agents:
+                    current = merged.get(agent.agent_id)
+                    if current is None or agent.last_seen > current.last_seen:
+                        merged[agent.agent_id] = agent
+            asked, remaining = remaining[:failures], remaining[failures:]
+
+        if len(answered) < needed:
+            logger.warning("Discovery query answered by too few nodes; results may be incomplete")
+
+        return list(merged.values())[:query.max_results]
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Stats from every reachable node."""
+
+        async def fetch(node):
+            try:
+                async with self._session().get(f"{node}/discovery/stats") as response:
+                    return await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                return {"node": node, "error": str(e)}
+
+        return {"nodes": await asyncio.gather(*(fetch(node) for node in self.config.nodes))}
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.config.request_timeout)
+            )
+        return self.session
+
+    def _ordered(self, nodes: List[str]) -> List[str]:
+        """Nodes that have been answering first, keeping ring order otherwise."""
+        return sorted(nodes, key=lambda node: self.failed_nodes.get(node, 0) > 0)
+
+    async def _write(self, agent_id: str, operation: str, data: Dict[str, Any]) -> bool:
+        for node in self._ordered(self.ring.replicas(agent_id, self.config.replicas)):
+            try:
+                async with self._session().post(f"{node}/discovery/{operation}",
+                                                json=data) as response:
+                    if response.status != 200:
+                        raise aiohttp.ClientError(f"HTTP {response.status}")
+                    result = await response.json()
+                self.failed_nodes.pop(node, None)
+                return result["ok"]
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.failed_nodes[node] = self.failed_nodes.get(node, 0) + 1
+                logger.warning(f"Discovery node {node} failed {operation}: {e}")
+
+        logger.error(f"No replica reachable for {operation} of {agent_id}")
+        return False
+
+    async def _write_batch(self, operation: str, items: Dict[str, Any]) -> List[str]:
+        """
+        Send each agent's item to its first reachable replica, grouped into
+        one request per node. Agents whose node fails move on to their next
+        replica; returns the agents that were not written.
+        """
+
+        failed: List[str] = []
+        tried: Dict[str, Set[str]] = {}  # agent_id -> nodes that failed it
+        pending = items
+        while pending:
+            batches: Dict[str, Dict[str, Any]] = {}
+            for agent_id, item in pending.items():
+                nodes = [node for node in self._ordered(self.ring.replicas(agent_id, self.config.replicas))
+                         if node not in tried.get(agent_id, ())]
+                if nodes:
+                    batches.setdefault(nodes[0], {})[agent_id] = item
+                else:
+                    failed.append(agent_id)
+
+            results = await asyncio.gather(*(self._post_batch(node, operation, batch)
+                                             for node, batch in batches.items()))
+            pending = {}
+            for (node, batch), result in zip(batches.items(), results):
+                if result is not None:
+                    failed.extend(result)
+                    continue
+                for agent_id, item in batch.items():
+                    tried.setdefault(agent_id, set()).add(node)
+                    pending[agent_id] = item
+
+        if failed:
+            logger.warning(f"Discovery {operation} failed for {len(failed)} of {len(items)} agents")
+        return failed
+
+    async def _post_batch(self, node: str, operation: str,
+                          batch: Dict[str, Any]) -> Optional[List[str]]:
+        try:
+            async with self._session().post(f"{node}/discovery/batch",
+                                            json={"operation": operation, "items": batch}) as response:
+                if response.status != 200:
+                    raise aiohttp.ClientError(f"HTTP {response.status}")
+                result = await response.json()
+            self.failed_nodes.pop(node, None)
+            return result["failed"]
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.failed_nodes[node] = self.failed_nodes.get(node, 0) + 1
+            logger.warning(f"Discovery node {node} failed {operation} batch: {e}")
+            return None
+
+    async def _query(self, node: str, payload: Dict[str, Any]) -> Optional[List[AgentRecord]]:
+        try:
+            async with self._session().post(f"{node}/discovery/query", json=payload) as response:
+                if response.status != 200:
+                    raise aiohttp.ClientError(f"HTTP {response.status}")
+                data = await response.json()
+            self.failed_nodes.pop(node, None)
+            return [AgentRecord.from_dict(agent) for agent in data["agents"]]
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.failed_nodes[node] = self.failed_nodes.get(node, 0) + 1
+            logger.warning(f"Discovery node {node} failed query: {e}")
+            return None
+
+
+class LocalCluster:
+    """A discovery cluster of local server processes, for tests and benchmarks."""
+
+    def __init__(self, nodes: int = 3, replication_factor: int = 3, registry_dir: str = ".",
+                 host: str = "127.0.0.1", log_level: str = "WARNING"):
+        self.host = host
+        self.registry_dir = registry_dir
+        self.log_level = log_level
+        ports = [_free_port(host) for _ in range(nodes)]
+        self.config = ClusterConfig([f"http://{host}:{port}" for port in ports],
+                                    replication_factor=replication_factor)
+        self.processes: Dict[str, subprocess.Popen] = {}
+
+    async def start(self, timeout: float = 15.0) -> ClusterConfig:
+        """Start every node not already running and wait until all of them answer."""
+
+        for node in self.config.nodes:
+            if node not in self.processes:
+                self.start_node(node)
+
+        client = DiscoveryClusterClient(self.config)
+        try:
+            deadline = asyncio.get_running_loop().time() + timeout
+            while True:
+                stats = await client.get_stats()
+                if not any("error" in node for node in stats["nodes"]):
+                    return self.config
+                if asyncio.get_running_loop().time() > deadline:
+                    await self.stop()
+                    raise RuntimeError("Discovery cluster did not start")
+                await asyncio.sleep(0.1)
+        finally:
+            await client.close()
+
+    def start_node(self, node: str):
+        port = node.rsplit(":", 1)[-1]
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in sys.path if p)}
+        self.processes[node] = subprocess.Popen(
+            [sys.executable, "-m", __name__,
+             "--listen", f"{self.host}:{port}",
+             "--nodes", ",".join(self.config.nodes),
+             "--replicas", str(self.config.replication_factor),
+             "--registry-file", os.path.join(self.registry_dir, f"agent_registry-{port}.json"),
+             "--log-level", self.log_level],
+            env=env
+        )
+
+    def stop_node(self, node: str):
+        """Kill one node (as a crash would)."""
+
+        process = self.processes.pop(node, None)
+        if process is not None:
+            process.kill()
+            process.wait()
+
+    async def stop(self):
+        for node in list(self.processes):
+            process = self.processes.pop(node)
+            process.terminate()
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, process.wait, 5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def _parse_query(data: Any) -> ServiceQuery:
+    """Build a ServiceQuery from a request body, checking each field's type (ValueError if invalid)."""
+
+    if not isinstance(data, dict):
+        raise ValueError("Query must be a JSON object")
+    unknown = set(data) - {"capabilities", "agent_id", "status", "max_results",
+                           "include_metadata", "fields"}
+    if unknown:
+        raise ValueError(f"Unknown query fields: {', '.join(sorted(unknown))}")
+
+    capabilities = data.get("capabilities")
+    if capabilities is not None and (not isinstance(capabilities, list)
+                                     or not all(isinstance(c, str) for c in capabilities)):
+        raise ValueError("capabilities must be a list of strings")
+    for name in ("agent_id", "status"):
+        if data.get(name) is not None and not isinstance(data[name], str):
+            raise ValueError(f"{name} must be a string")
+    max_results = data.get("max_results", 50)
+    if isinstance(max_results, bool) or not isinstance(max_results, int) or max_results < 1:
+        raise ValueError("max_results must be a positive integer")
+    if not isinstance(data.get("include_metadata", False), bool):
+        raise ValueError("include_metadata must be a boolean")
+
+    # fields is accepted but ignored: nodes return full records
+    return ServiceQuery(
+        capabilities=capabilities,
+        agent_id=data.get("agent_id"),
+        status=data.get("status", "active"),
+        max_results=max_results,
+        include_metadata=data.get("include_metadata", False),
+    )
+
+
+def _free_port(host: str) -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one node of an A2A discovery cluster")
+    parser.add_argument("--listen", required=True, help="host:port to serve on")
+    parser.add_argument("--nodes", required=True,
+                        help="Comma-separated base URLs of every node, including this one")
+    parser.add_argument("--url", help="This node's base URL (default: http://<listen>)")
+    parser.add_argument("--replicas", type=int, default=3, help="Replication factor (default: 3)")
+    parser.add_argument("--registry-file", help="Registry snapshot path for this node")
+    parser.add_argument("--log-level", default="INFO", help="Logging level (default: INFO)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper())
+    host, _, port = args.listen.rpartition(":")
+    config = ClusterConfig(args.nodes.split(","), replication_factor=args.replicas)
+    server = DiscoveryServer(args.url or f"http://{args.listen}", config, args.registry_file)
+
+    async def serve():
+        stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stopped.set)
+
+        await server.start(host, int(port))
+        try:
+            await stopped.wait()
+        finally:
+            await server.stop()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
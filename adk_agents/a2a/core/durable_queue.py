@@ -0,0 +1,552 @@
+"""
+Durable Message Queue for A2A Protocol
+
+Disk-backed message queue that survives agent restarts. Messages are appended
+to a segmented log with an offset index, fsyncs are batched (group commit),
+and acknowledged offsets are persisted so that replay on startup resumes
+delivery where consumers left off.
+"""
+
+import os
+import json
+import time
+import heapq
+import zlib
+import struct
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, List, Set, Iterator, Tuple
+
+from .messaging import Message, MessageQueue
+
+logger = logging.getLogger(__name__)
+
+RECORD_HEADER = struct.Struct(">QII")  # offset, payload length, crc32
+INDEX_ENTRY = struct.Struct(">QQ")  # offset, position in the log file
+OFFSETS_FILE = "offsets.json"
+
+
+@dataclass
+class DurableQueueConfig:
+    """Configuration for the durable message queue."""
+
+    storage_path: str = "./a2a_queue"
+    max_size: int = 100000
+    segment_bytes: int = 64 * 1024 * 1024
+    fsync_batch: int = 256  # Records written before a group commit is forced
+    fsync_interval: float = 0.05  # Longest a record waits for its fsync
+    retention_seconds: Optional[float] = 7 * 24 * 3600  # None keeps segments until acknowledged
+
+
+class LogSegment:
+    """One append-only log file and its offset index."""
+
+    def __init__(self, directory: str, base_offset: int):
+        self.base_offset = base_offset
+        self.log_path = os.path.join(directory, f"{base_offset:020d}.log")
+        self.index_path = os.path.join(directory, f"{base_offset:020d}.index")
+        self.last_offset = base_offset - 1
+        self.size = 0
+        self._log = None
+        self._index = None
+
+    def open_for_append(self):
+        """Open the segment files for appending."""
+
+        self._log = open(self.log_path, "ab")
+        self._index = open(self.index_path, "ab")
+        self.size = self._log.tell()
+
+    def append(self, offset: int, payload: bytes):
+        """Append a record; durable only after the next flush."""
+
+        position = self.size
+        self._log.write(RECORD_HEADER.pack(offset, len(payload), zlib.crc32(payload)))
+        self._log.write(payload)
+        self._index.write(INDEX_ENTRY.pack(offset, position))
+        self.size += RECORD_HEADER.size + len(payload)
+        self.last_offset = offset
+
+    def flush(self):
+        """Push buffered writes to the OS (without fsync)."""
+
+        if self._log:
+            self._log.flush()
+            self._index.flush()
+
+    def fileno(self) -> Optional[int]:
+        """File descriptor of the log file, if open."""
+        return self._log.fileno() if self._log else None
+
+    def close(self):
+        """Flush and close the segment files."""
+
+        if self._log:
+            self.flush()
+            os.fsync(self._log.fileno())
+            self._log.close()
+            self._index.close()
+            self._log = None
+            self._index = None
+
+    def load_index(self) -> bool:
+        """Read the offset range from the index; False if it must be rebuilt."""
+
+        try:
+            index_size = os.path.getsize(self.index_path)
+            self.size = os.path.getsize(self.log_path)
+        except OSError:
+            return False
+
+        entries = index_size // INDEX_ENTRY.size
+        if entries == 0:
+            return self.size == 0
+
+        with open(self.index_path, "rb") as f:
+            f.seek((entries - 1) * INDEX_ENTRY.size)
+            offset, position = INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))
+
+        if position >= self.size:
+            return False
+
+        self.last_offset = offset
+        return True
+
+    def scan(self) -> Iterator[Tuple[int, int, bytes]]:
+        """Yield (offset, position, payload), stopping at a torn or corrupt record."""
+
+        with open(self.log_path, "rb") as f:
+            position = 0
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    return
+                offset, length, crc = RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    return
+                yield offset, position, payload
+                position += RECORD_HEADER.size + length
+
+    def recover(self):
+        """Truncate a torn tail and rebuild the index from the log."""
+
+        entries = []
+        valid_bytes = 0
+        for offset, position, payload in self.scan():
+            entries.append(INDEX_ENTRY.pack(offset, position))
+            valid_bytes = position + RECORD_HEADER.size + len(payload)
+            self.last_offset = offset
+
+        if os.path.getsize(self.log_path) != valid_bytes:
+            logger.warning(f"Truncating torn tail of {self.log_path} at {valid_bytes} bytes")
+            with open(self.log_path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+        with open(self.index_path, "wb") as f:
+            f.write(b"".join(entries))
+
+        self.size = valid_bytes
+
+    def delete(self):
+        """Remove the segment from disk."""
+
+        self.close()
+        for path in (self.log_path, self.index_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class DurableMessageQueue(MessageQueue):
+    """
+    MessageQueue whose contents are persisted to an append-only segment log.
+
+    Pending messages are also held in memory, so reads cost the same as the
+    in-memory queue. A message stays on disk until it is acknowledged with
+    ack() or commit(); unacknowledged messages are replayed on startup.
+
+    If more messages are pending on disk than fit in memory, replay stops at
+    the first one that does not fit (the backlog) and resumes as the queue
+    drains. Until then new messages are only appended to the log, so
+    delivery stays in log order.
+    """
+
+    durable = True
+
+    def __init__(self, config: DurableQueueConfig = None):
+        self.config = config or DurableQueueConfig()
+        super().__init__(self.config.max_size)
+
+        self.storage_path = self.config.storage_path
+        self.segments: List[LogSegment] = []
+        self.next_offset = 0
+        self.low_watermark = -1  # Every offset <= this is acknowledged
+
+        self._acked: Set[int] = set()  # Acknowledged offsets above the watermark
+        self._order: List[int] = []  # Min-heap of unacknowledged offsets
+        self._offsets: Dict[str, int] = {}  # message_id -> offset, until acknowledged
+        self._delivered: Dict[str, Set[str]] = {}  # receiver -> delivered, unacknowledged IDs
+        self._backlog: Optional[int] = None  # First offset not yet replayed into memory
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._offsets_dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_wakeup: Optional[asyncio.Event] = None
+
+        os.makedirs(self.storage_path, exist_ok=True)
+        self._open()
+
+    @property
+    def active_segment(self) -> LogSegment:
+        """The segment currently receiving appends."""
+        return self.segments[-1]
+
+    def enqueue(self, message: Message) -> bool:
+        """Append a message to the log and queue it for delivery."""
+
+        if self.size() >= self.max_size:
+            self.rejected += 1
+            return False
+
+        offset = self._append(message)
+        if self._backlog is None:
+            super().enqueue(message)
+            self._track(message, offset)
+        # else: queued behind the backlog, replayed from the log in order
+        return True
+
+    def record_delivered(self, message: Message, verified: bool = True) -> bool:
+        """
+        Append a message that is handed straight to its consumer; it is
+        replayed on startup until acknowledged. verified marks it as already
+        authenticated, so a replay does not need the original session keys.
+        """
+
+        offset = self._append(message, verified)
+        self._track(message, offset)
+        self._delivered.setdefault(message.receiver_id, set()).add(message.message_id)
+        return True
+
+    def dequeue(self) -> Optional[Message]:
+        """Remove and return the next message; it stays on disk until acknowledged."""
+
+        message = super().dequeue()
+        if message:
+            self._delivered.setdefault(message.receiver_id, set()).add(message.message_id)
+            self._resume_replay()
+        return message
+
+    def get_messages_for_agent(self, agent_id: str) -> List[Message]:
+        """Get all messages for an agent; they stay on disk until acknowledged."""
+
+        messages = super().get_messages_for_agent(agent_id)
+        if messages:
+            self._delivered.setdefault(agent_id, set()).update(m.message_id for m in messages)
+            self._resume_replay()
+        return messages
+
+    def clear_expired(self) -> List[Message]:
+        """Remove expired messages and acknowledge them."""
+
+        expired = super().clear_expired()
+        for message in expired:
+            self.ack(message)
+        return expired
+
+    def ack(self, message: Message) -> bool:
+        """Acknowledge a single message so it is not replayed."""
+
+        offset = self._offsets.pop(message.message_id, None)
+        if offset is None:
+            return False
+
+        delivered = self._delivered.get(message.receiver_id)
+        if delivered is not None:
+            delivered.discard(message.message_id)
+            if not delivered:
+                del self._delivered[message.receiver_id]
+
+        self._acked.add(offset)
+        self._pop_acknowledged()
+        self._offsets_dirty = True
+        return True
+
+    def commit(self, agent_id: str):
+        """Acknowledge every message delivered to an agent so far."""
+
+        for message_id in self._delivered.pop(agent_id, ()):
+            offset = self._offsets.pop(message_id, None)
+            if offset is not None:
+                self._acked.add(offset)
+
+        self._pop_acknowledged()
+        self._offsets_dirty = True
+
+    def flush(self):
+        """Group commit: fsync buffered records and persist acknowledged offsets."""
+
+        self.active_segment.flush()
+        if self._unsynced:
+            os.fsync(self.active_segment.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        if self._offsets_dirty:
+            self._save_offsets()
+
+    def start(self):
+        """Start the background task that bounds how long records wait for fsync."""
+
+        if not self._flush_task:
+            self._flush_wakeup = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def close(self):
+        """Stop background flushing and close all segment files."""
+
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+            self._flush_wakeup = None
+
+        self.flush()
+        for segment in self.segments:
+            segment.close()
+
+    def _append(self, message: Message, verified: bool = False) -> int:
+        """Write a record to the active segment and schedule its fsync."""
+
+        if self.active_segment.size >= self.config.segment_bytes:
+            self._roll_segment()
+
+        record = message.to_dict()
+        if verified:
+            record["verified"] = True
+
+        offset = self.next_offset
+        payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+        self.active_segment.append(offset, payload)
+        self.next_offset += 1
+
+        self._unsynced += 1
+        if self._unsynced >= self.config.fsync_batch:
+            if self._flush_wakeup is not None:
+                # Group commit now, but fsync on the flush task, off the event loop
+                self._flush_wakeup.set()
+            else:
+                self.flush()
+        elif self._flush_task is None and time.monotonic() - self._last_sync >= self.config.fsync_interval:
+            self.flush()
+
+        return offset
+
+    def _track(self, message: Message, offset: int):
+        """Record an unacknowledged message's offset."""
+
+        self._offsets[message.message_id] = offset
+        heapq.heappush(self._order, offset)
+
+    def _pop_acknowledged(self):
+        while self._order and self._order[0] in self._acked:
+            heapq.heappop(self._order)
+
+    def _current_watermark(self) -> int:
+        """Highest offset below which every record is acknowledged."""
+
+        watermark = (self._order[0] - 1) if self._order else (self.next_offset - 1)
+        if self._backlog is not None:
+            watermark = min(watermark, self._backlog - 1)
+        return watermark
+
+    def _open(self):
+        """Load segments and offsets, then replay unacknowledged messages."""
+
+        self._load_offsets()
+
+        base_offsets = sorted(
+            int(name[:-4]) for name in os.listdir(self.storage_path)
+            if name.endswith(".log") and name[:-4].isdigit()
+        )
+
+        for i, base_offset in enumerate(base_offsets):
+            segment = LogSegment(self.storage_path, base_offset)
+            # The last segment may have a torn tail; older ones only need their index
+            if i == len(base_offsets) - 1 or not segment.load_index():
+                segment.recover()
+            self.segments.append(segment)
+
+        if self.segments:
+            self.next_offset = max(self.segments[-1].last_offset + 1, self.low_watermark + 1)
+        else:
+            self.next_offset = self.low_watermark + 1
+
+        replayed = self._replay()
+
+        if self.segments and self.segments[-1].size < self.config.segment_bytes:
+            self.segments[-1].open_for_append()
+            self._apply_retention()
+        else:
+            self._roll_segment()
+
+        if replayed:
+            logger.info(f"Replayed {replayed} unacknowledged messages from {self.storage_path}")
+
+    def _replay(self) -> int:
+        """
+        Queue every unacknowledged, unexpired record from the log, starting
+        at the backlog if there is one. Stops (and keeps a backlog) when the
+        queue is full.
+        """
+
+        start = self._backlog if self._backlog is not None else self.low_watermark + 1
+        self._backlog = None
+        if self.segments:
+            self.active_segment.flush()
+
+        replayed = 0
+        for segment in self.segments:
+            if segment.last_offset < start:
+                continue
+
+            for offset, _, payload in segment.scan():
+                if offset < start or offset in self._acked:
+                    continue
+
+                record = json.loads(payload)
+                verified = record.pop("verified", False)
+                message = Message.from_dict(record)
+                if message.message_id in self._offsets:
+                    continue  # Recorded while the backlog was pending and already tracked
+                if message.is_expired():
+                    self._acked.add(offset)
+                    self._offsets_dirty = True
+                    continue
+
+                if not super().enqueue(message):
+                    logger.warning(f"Queue full during replay; offsets from {offset} stay on disk")
+                    self._backlog = offset
+                    return replayed
+
+                self._track(message, offset)
+                if verified:
+                    self.verified.add(message.message_id)
+                replayed += 1
+
+        return replayed
+
+    def _resume_replay(self):
+        """Continue a pending replay once the queue has drained to half full."""
+
+        if self._backlog is not None and self.size() <= self.max_size // 2:
+            replayed = self._replay()
+            logger.debug(f"Replayed {replayed} more messages from the backlog")
+
+    def _roll_segment(self):
+        """Close the active segment, start a new one and apply retention."""
+
+        if self.segments:
+            self.flush()
+            self.active_segment.close()
+
+        segment = LogSegment(self.storage_path, self.next_offset)
+        segment.open_for_append()
+        self.segments.append(segment)
+
+        self._apply_retention()
+
+    def _apply_retention(self):
+        """Delete closed segments that are fully acknowledged or past retention."""
+
+        watermark = self._current_watermark()
+        cutoff = None
+        if self.config.retention_seconds is not None:
+            cutoff = time.time() - self.config.retention_seconds
+
+        kept = []
+        for segment in self.segments[:-1]:
+            expired = cutoff is not None and os.path.getmtime(segment.log_path) < cutoff
+            if segment.last_offset <= watermark or expired:
+                logger.debug(f"Deleting segment {segment.log_path}")
+                segment.delete()
+            else:
+                kept.append(segment)
+
+        kept.append(self.segments[-1])
+        self.segments = kept
+
+    def _load_offsets(self):
+        """Load the acknowledged-offset state."""
+
+        try:
+            with open(os.path.join(self.storage_path, OFFSETS_FILE), "r") as f:
+                data = json.load(f)
+            self.low_watermark = data.get("low_watermark", -1)
+            self._acked = set(data.get("acked", []))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error loading queue offsets: {e}")
+
+    def _save_offsets(self):
+        """Atomically persist the acknowledged-offset state."""
+        self._write_offsets(self._snapshot_offsets())
+
+    def _snapshot_offsets(self) -> Dict[str, object]:
+        """Advance the watermark and capture the state to persist."""
+
+        self.low_watermark = self._current_watermark()
+        self._acked = {offset for offset in self._acked if offset > self.low_watermark}
+        self._offsets_dirty = False
+
+        return {"low_watermark": self.low_watermark, "acked": sorted(self._acked)}
+
+    def _write_offsets(self, data: Dict[str, object]):
+        """Write offset state via a temporary file and atomic rename."""
+
+        path = os.path.join(self.storage_path, OFFSETS_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    async def _flush_loop(self):
+        """Periodically group-commit records, running fsync off the event loop."""
+
+        loop = asyncio.get_running_loop()
+
+        wakeup = self._flush_wakeup
+
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self.config.fsync_interval)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+
+                if self._unsynced:
+                    self.active_segment.flush()
+                    pending, self._unsynced = self._unsynced, 0
+                    # Our own descriptor, so a segment roll cannot close it mid-fsync
+                    fd = os.dup(self.active_segment.fileno())
+                    try:
+                        await loop.run_in_executor(None, os.fsync, fd)
+                    except Exception:
+                        self._unsynced += pending
+                        raise
+                    finally:
+                        os.close(fd)
+                    self._last_sync = time.monotonic()
+
+                if self._offsets_dirty:
+                    await loop.run_in_executor(None, self._write_offsets, self._snapshot_offsets())
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in queue flush task: {e}")
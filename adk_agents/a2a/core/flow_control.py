@@ -0,0 +1,221 @@
+"""
+Flow Control for A2A Protocol
+
+Credit-based flow control between agents. Receivers grant each sender a
+window of in-flight messages and advertise it on every response; senders
+queue or shed messages once their window towards a receiver is used up.
+Control messages (heartbeats, cancellations) bypass both sides.
+
+Receivers key credit on the authenticated peer, never on a sender ID the
+peer claims, and only let authenticated peers bypass their window.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Optional, Any, Deque, Iterable
+
+logger = logging.getLogger(__name__)
+
+CREDIT_WINDOW_HEADER = "A2A-Credit-Window"
+DEFAULT_CONTROL_MESSAGE_TYPES = ("heartbeat", "task_cancellation")
+UNAUTHENTICATED_PEER = ""  # One shared window for every peer that did not authenticate
+
+
+class CreditManager:
+    """Receiver side: tracks in-flight messages per sender against their window."""
+
+    def __init__(self, credit_window: int = 64, max_inflight: int = 1024,
+                 control_message_types: Iterable[str] = DEFAULT_CONTROL_MESSAGE_TYPES):
+        self.credit_window = credit_window
+        self.max_inflight = max_inflight
+        self.control_message_types = frozenset(control_message_types)
+        self.windows: Dict[str, int] = {}  # sender -> window override
+        self.inflight: Dict[str, int] = {}
+        self.total_inflight = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    def is_control(self, message_type: Optional[str]) -> bool:
+        """Check whether a message type bypasses flow control."""
+        return message_type in self.control_message_types
+
+    def set_window(self, sender_id: str, window: int):
+        """Grant a specific sender a different window."""
+        self.windows[sender_id] = max(1, window)
+
+    def window_for(self, sender_id: str) -> int:
+        """Window to advertise to a sender, shrunk as the receiver fills up."""
+
+        window = self.windows.get(sender_id, self.credit_window)
+        own = self.inflight.get(sender_id, 0)
+        spare = self.max_inflight - self.total_inflight
+        return max(1, min(window, own + spare))
+
+    def try_acquire(self, sender_id: str, message_type: str = None) -> bool:
+        """
+        Take a credit for an incoming message; False if the sender is over
+        its window. sender_id must be the authenticated peer.
+        """
+
+        if self._bypasses(sender_id, message_type):
+            return True
+
+        own = self.inflight.get(sender_id, 0)
+        if own >= self.window_for(sender_id) or self.total_inflight >= self.max_inflight:
+            self.rejected += 1
+            return False
+
+        self.inflight[sender_id] = own + 1
+        self.total_inflight += 1
+        self.accepted += 1
+        return True
+
+    def release(self, sender_id: str, message_type: str = None):
+        """Return the credit once an incoming message has been processed."""
+
+        if self._bypasses(sender_id, message_type):
+            return
+
+        own = self.inflight.get(sender_id, 0)
+        if own <= 1:
+            self.inflight.pop(sender_id, None)
+        else:
+            self.inflight[sender_id] = own - 1
+        self.total_inflight = max(0, self.total_inflight - 1)
+
+    def _bypasses(self, sender_id: str, message_type: Optional[str]) -> bool:
+        return sender_id != UNAUTHENTICATED_PEER and self.is_control(message_type)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Receiver-side flow control metrics."""
+
+        return {
+            "total_inflight": self.total_inflight,
+            "inflight_by_sender": dict(self.inflight),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+        }
+
+
+class _TargetWindow:
+    """Sender-side credit state for one receiver."""
+
+    __slots__ = ("window", "outstanding", "waiters")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.outstanding = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+
+class SendWindow:
+    """
+    Sender side: limits in-flight messages per receiver to the advertised window.
+
+    With the "queue" policy a send waits (up to a bounded depth) for a credit
+    to come back; with "shed" it is dropped immediately.
+    """
+
+    def __init__(self, initial_window: int = 64, max_queued: int = 1000,
+                 policy: str = "queue",
+                 control_message_types: Iterable[str] = DEFAULT_CONTROL_MESSAGE_TYPES):
+        if policy not in ("queue", "shed"):
+            raise ValueError(f"Unknown overflow policy: {policy}")
+
+        self.initial_window = initial_window
+        self.max_queued = max_queued
+        self.policy = policy
+        self.control_message_types = frozenset(control_message_types)
+        self.targets: Dict[str, _TargetWindow] = {}
+        self.stalls = 0
+        self.shed = 0
+        self.throttled = 0
+
+    def is_control(self, message_type: Optional[str]) -> bool:
+        """Check whether a message type bypasses flow control."""
+        return message_type in self.control_message_types
+
+    async def acquire(self, target: str, message_type: str = None,
+                      timeout: float = None) -> bool:
+        """Wait for a credit towards a target; False if the message was shed."""
+
+        if self.is_control(message_type):
+            return True
+
+        state = self._state(target)
+        if state.outstanding < state.window and not state.waiters:
+            state.outstanding += 1
+            return True
+
+        if self.policy == "shed" or len(state.waiters) >= self.max_queued:
+            self.shed += 1
+            return False
+
+        self.stalls += 1
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+
+        try:
+            # The releasing side hands its credit straight to the waiter
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the sender was cancelled; hand the credit on
+                state.outstanding -= 1
+                self._grant(state)
+            raise
+        finally:
+            if waiter in state.waiters:
+                state.waiters.remove(waiter)
+
+    def release(self, target: str, message_type: str = None):
+        """Return a credit after the receiver has answered."""
+
+        if self.is_control(message_type):
+            return
+
+        state = self._state(target)
+        state.outstanding = max(0, state.outstanding - 1)
+        self._grant(state)
+
+    def update_window(self, target: str, window: int):
+        """Apply a window advertised by the receiver."""
+
+        state = self._state(target)
+        state.window = max(1, window)
+        self._grant(state)
+
+    def record_throttled(self, target: str):
+        """Count a message the receiver rejected for lack of credit."""
+        self.throttled += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Sender-side flow control metrics."""
+
+        return {
+            "queued": sum(len(state.waiters) for state in self.targets.values()),
+            "outstanding": {target: state.outstanding for target, state in self.targets.items()},
+            "windows": {target: state.window for target, state in self.targets.items()},
+            "stalls": self.stalls,
+            "shed": self.shed,
+            "throttled": self.throttled,
+        }
+
+    def _state(self, target: str) -> _TargetWindow:
+        state = self.targets.get(target)
+        if state is None:
+            state = self.targets[target] = _TargetWindow(self.initial_window)
+        return state
+
+    def _grant(self, state: _TargetWindow):
+        """Hand free credits to queued senders in FIFO order."""
+
+        while state.waiters and state.outstanding < state.window:
+            waiter = state.waiters.popleft()
+            if not waiter.done():
+                state.outstanding += 1
+                waiter.set_result(True)
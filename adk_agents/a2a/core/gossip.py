@@ -0,0 +1,564 @@
+"""
+Gossip Membership for A2A Peer Discovery
+
+A SWIM-style membership protocol over UDP. Every protocol period a node
+pings one member (in shuffled round-robin order); if no ack arrives within
+probe_timeout, it asks a few other members to ping it on its behalf
+(ping-req). A member that answers neither is marked suspect, and declared
+dead if it does not refute the suspicion (by gossiping a higher
+incarnation) within the suspicion timeout.
+
+Membership changes and the agent records each node publishes travel as
+updates piggybacked on probe traffic, each retransmitted a logarithmic
+number of times. A joining node exchanges full state with a seed, and
+nodes periodically push-pull full state with a random member to repair
+anything gossip missed. Agent records are ordered by a Lamport version and
+owner, and are dropped everywhere when their owning node dies.
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Any, List, Tuple, Callable, Set
+
+logger = logging.getLogger(__name__)
+
+ALIVE = "alive"
+SUSPECT = "suspect"
+DEAD = "dead"
+
+Address = Tuple[str, int]
+
+
+@dataclass
+class GossipConfig:
+    """Configuration for a gossip node."""
+
+    bind_host: str = "127.0.0.1"
+    bind_port: int = 0  # 0 picks a free port
+    advertise_host: Optional[str] = None  # Host other nodes reach this one at; bind_host if unset
+    protocol_period: float = 1.0  # Seconds between probes
+    probe_timeout: float = 0.3  # Wait for a direct ack before probing indirectly
+    indirect_probes: int = 3  # Members asked to ping an unresponsive member
+    suspicion_mult: int = 4  # Suspicion timeout in protocol periods, scaled by log10(members)
+    retransmit_mult: int = 4  # Piggyback each update this many times, scaled by log10(members)
+    sync_interval: float = 30.0  # Full-state push-pull with a random member; 0 disables
+    dead_member_timeout: float = 60.0  # Forget dead members and deleted agents after this long
+    max_datagram: int = 1400  # Bytes per UDP datagram
+
+
+@dataclass
+class Member:
+    """A node in the gossip group."""
+
+    node_id: str
+    address: Address
+    state: str = ALIVE
+    incarnation: int = 0
+    changed_at: float = 0.0  # Monotonic time of the last state change
+
+
+class _GossipProtocol(asyncio.DatagramProtocol):
+    def __init__(self, node: "GossipNode"):
+        self.node = node
+
+    def datagram_received(self, data: bytes, addr: Address):
+        self.node._on_datagram(data, addr)
+
+    def error_received(self, exc: Exception):
+        logger.debug(f"Gossip socket error: {exc}")
+
+
+class GossipNode:
+    """
+    One member of a SWIM gossip group.
+
+    Local agent records are published with publish() and withdraw(); the
+    merged table of every node's records is kept in `agents`, and
+    on_agent_change(agent_id, record or None) is called whenever an entry
+    is added, replaced or removed.
+    """
+
+    def __init__(self, node_id: str, config: GossipConfig = None,
+                 on_agent_change: Callable[[str, Optional[Dict[str, Any]]], None] = None):
+        self.node_id = node_id
+        self.config = config or GossipConfig()
+        self.on_agent_change = on_agent_change
+        self.address: Optional[Address] = None
+        self.incarnation = 0
+        self.members: Dict[str, Member] = {}
+
+        # Merged agent records and their (version, owner) order
+        self.agents: Dict[str, Tuple[str, int, Dict[str, Any]]] = {}  # agent_id -> (owner, version, record)
+        self._owned: Dict[str, Set[str]] = {}  # owner node_id -> agent_ids
+        self._tombstones: Dict[str, Tuple[int, str, float]] = {}  # agent_id -> (version, owner, monotonic time)
+        self._local_agents: Dict[str, Dict[str, Any]] = {}
+        self._clock = 0  # Lamport clock for agent versions
+
+        # Updates waiting to be piggybacked: key -> [encoded update, times sent]
+        self._broadcasts: Dict[Tuple[str, str], List] = {}
+
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._running = False
+        self._loop_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._seq = 0
+        self._acks: Dict[int, asyncio.Future] = {}
+        self._probe_order: List[str] = []
+        self._probe_index = 0
+        self._joined: Optional[asyncio.Event] = None
+
+        self.stats: Dict[str, Any] = {
+            "messages_sent": 0, "messages_received": 0,
+            "bytes_sent": 0, "bytes_received": 0,
+            "probes": 0, "indirect_probes": 0, "suspicions": 0,
+            "refutations": 0, "failures": 0, "syncs": 0, "malformed": 0,
+            "agent_updates": 0, "propagation_delay_total": 0.0, "propagation_delay_max": 0.0,
+        }
+
+    async def start(self):
+        """Bind the UDP socket and start the protocol loop."""
+
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _GossipProtocol(self),
+            local_addr=(self.config.bind_host, self.config.bind_port)
+        )
+        port = self._transport.get_extra_info("sockname")[1]
+        self.address = (self.config.advertise_host or self.config.bind_host, port)
+        self.members[self.node_id] = Member(self.node_id, self.address, ALIVE,
+                                            self.incarnation, time.monotonic())
+        self._joined = asyncio.Event()
+        self._running = True
+        self._loop_task = asyncio.create_task(self._protocol_loop())
+        logger.info(f"Gossip node {self.node_id} listening on {self.address[0]}:{self.address[1]}")
+
+    async def join(self, seeds: List[Address], timeout: float = 2.0) -> bool:
+        """Exchange state with seed nodes; True once another member is known."""
+
+        seeds = [tuple(seed) for seed in seeds if tuple(seed) != self.address]
+        if not seeds:
+            return False
+
+        attempts = 3
+        for _ in range(attempts):
+            for seed in seeds:
+                self._send_state(seed, reply=True)
+            try:
+                await asyncio.wait_for(self._joined.wait(), timeout / attempts)
+                return True
+            except asyncio.TimeoutError:
+                continue
+
+        logger.warning(f"Gossip node {self.node_id} could not reach any seed")
+        return False
+
+    async def stop(self, leave: bool = True):
+        """Close the socket, first announcing the departure unless leave is False."""
+
+        self._running = False
+        if self._loop_task:
+            self._loop_task.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+
+        if self._transport is not None:
+            if leave:
+                # Tell a few members directly, so the departure spreads without a suspicion timeout
+                update = self._encode_member(self.node_id, self.address, DEAD, self.incarnation)
+                for member in self._sample_members(self.config.indirect_probes):
+                    self._send("gossip", member.address, updates=[update])
+            self._transport.close()
+            self._transport = None
+
+    def publish(self, record: Dict[str, Any]):
+        """Publish (or update) a record for an agent hosted on this node."""
+
+        self._local_agents[record["agent_id"]] = record
+        self._clock += 1
+        self._apply_agent(record["agent_id"], self.node_id, self._clock, time.time(), record)
+
+    def withdraw(self, agent_id: str):
+        """Remove an agent hosted on this node."""
+
+        if self._local_agents.pop(agent_id, None) is None:
+            return
+        self._clock += 1
+        self._apply_agent(agent_id, self.node_id, self._clock, time.time(), None)
+
+    def push_pull(self) -> bool:
+        """Exchange full state with a random member now; False if there is none."""
+
+        for member in self._sample_members(1):
+            self._send_state(member.address, reply=True)
+            return True
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        states = {ALIVE: 0, SUSPECT: 0, DEAD: 0}
+        for member in self.members.values():
+            states[member.state] += 1
+
+        applied = stats.pop("propagation_delay_total")
+        stats.update({
+            "node_id": self.node_id,
+            "address": self.address,
+            "incarnation": self.incarnation,
+            "members": states,
+            "agents": len(self.agents),
+            "pending_broadcasts": len(self._broadcasts),
+            "propagation_delay_avg": applied / stats["agent_updates"] if stats["agent_updates"] else 0.0,
+        })
+        return stats
+
+    # Protocol loop
+
+    async def _protocol_loop(self):
+        loop = asyncio.get_running_loop()
+        last_sync = loop.time()
+
+        while self._running:
+            started = loop.time()
+            try:
+                member = self._next_probe_target()
+                if member is not None:
+                    await self._probe(member)
+
+                self._expire_suspects()
+                self._prune()
+
+                if self.config.sync_interval and loop.time() - last_sync >= self.config.sync_interval:
+                    last_sync = loop.time()
+                    self.push_pull()
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in gossip protocol loop: {e}")
+
+            await asyncio.sleep(max(0.0, self.config.protocol_period - (loop.time() - started)))
+
+    async def _probe(self, member: Member):
+        """Ping a member directly, then through others; suspect it if nobody gets an ack."""
+
+        self.stats["probes"] += 1
+        seq = self._next_seq()
+        ack = asyncio.get_running_loop().create_future()
+        self._acks[seq] = ack
+
+        try:
+            self._send("ping", member.address, seq)
+            if await self._wait_ack(ack, self.config.probe_timeout):
+                return
+
+            self.stats["indirect_probes"] += 1
+            for helper in self._sample_members(self.config.indirect_probes, exclude=member.node_id):
+                self._send("ping-req", helper.address, seq,
+                           {"t": member.node_id, "ta": list(member.address)})
+
+            remaining = max(self.config.protocol_period - self.config.probe_timeout,
+                            self.config.probe_timeout)
+            if await self._wait_ack(ack, remaining):
+                return
+        finally:
+            self._acks.pop(seq, None)
+
+        if member.state == ALIVE and self.members.get(member.node_id) is member:
+            self.stats["suspicions"] += 1
+            logger.info(f"Suspecting gossip member {member.node_id}")
+            self._apply_member(member.node_id, member.address, SUSPECT, member.incarnation)
+
+    async def _relay_probe(self, seq: int, target: Address, requester: Address):
+        """Answer a ping-req: ping the target and forward its ack."""
+
+        own_seq = self._next_seq()
+        ack = asyncio.get_running_loop().create_future()
+        self._acks[own_seq] = ack
+        try:
+            self._send("ping", target, own_seq)
+            if await self._wait_ack(ack, self.config.probe_timeout):
+                self._send("ack", requester, seq)
+        finally:
+            self._acks.pop(own_seq, None)
+
+    @staticmethod
+    async def _wait_ack(ack: asyncio.Future, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(asyncio.shield(ack), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _next_probe_target(self) -> Optional[Member]:
+        while True:
+            if self._probe_index >= len(self._probe_order):
+                self._probe_order = [node_id for node_id, member in self.members.items()
+                                     if node_id != self.node_id and member.state != DEAD]
+                random.shuffle(self._probe_order)
+                self._probe_index = 0
+                if not self._probe_order:
+                    return None
+
+            member = self.members.get(self._probe_order[self._probe_index])
+            self._probe_index += 1
+            if member is not None and member.state != DEAD:
+                return member
+
+    def _expire_suspects(self):
+        now = time.monotonic()
+        timeout = (self.config.suspicion_mult * self._log_scale() * self.config.protocol_period)
+        for member in list(self.members.values()):
+            if member.state == SUSPECT and now - member.changed_at >= timeout:
+                logger.info(f"Gossip member {member.node_id} declared dead")
+                self._apply_member(member.node_id, member.address, DEAD, member.incarnation)
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.config.dead_member_timeout
+        for node_id in [node_id for node_id, member in self.members.items()
+                        if member.state == DEAD and member.changed_at < cutoff]:
+            del self.members[node_id]
+        for agent_id in [agent_id for agent_id, tombstone in self._tombstones.items()
+                         if tombstone[2] < cutoff]:
+            del self._tombstones[agent_id]
+
+    # Updates
+
+    def _apply_member(self, node_id: str, address: Address, state: str, incarnation: int):
+        if node_id == self.node_id:
+            if state != ALIVE and incarnation >= self.incarnation:
+                # Refute: we are alive, with a newer incarnation than the rumour
+                self.incarnation = incarnation + 1
+                self.stats["refutations"] += 1
+                me = self.members[self.node_id]
+                me.incarnation = self.incarnation
+                self._queue_update(("m", node_id), self._encode_member(
+                    node_id, self.address, ALIVE, self.incarnation))
+                if state == DEAD:
+                    # Other nodes dropped our agents; announce them again
+                    for record in list(self._local_agents.values()):
+                        self.publish(record)
+            return
+
+        now = time.monotonic()
+        member = self.members.get(node_id)
+        if member is None:
+            if state == DEAD:
+                return
+            member = self.members[node_id] = Member(node_id, address, state, incarnation, now)
+            # Probe the newcomer at a random point in the current round
+            position = random.randint(min(self._probe_index, len(self._probe_order)), len(self._probe_order))
+            self._probe_order.insert(position, node_id)
+            if self._joined is not None:
+                self._joined.set()
+        elif self._supersedes(member, state, incarnation):
+            previous = member.state
+            member.address = address
+            member.incarnation = incarnation
+            if state != previous:
+                member.state = state
+                member.changed_at = now
+            if state == DEAD and previous != DEAD:
+                self.stats["failures"] += 1
+                self._drop_agents_of(node_id)
+        else:
+            return
+
+        self._queue_update(("m", node_id), self._encode_member(node_id, address, state, incarnation))
+
+    @staticmethod
+    def _supersedes(member: Member, state: str, incarnation: int) -> bool:
+        if member.state == DEAD:
+            return state == ALIVE and incarnation > member.incarnation
+        if state == ALIVE:
+            return incarnation > member.incarnation
+        if state == SUSPECT:
+            return (incarnation > member.incarnation or
+                    (incarnation == member.incarnation and member.state == ALIVE))
+        return incarnation >= member.incarnation  # DEAD
+
+    def _apply_agent(self, agent_id: str, owner: str, version: int, ts: float,
+                     record: Optional[Dict[str, Any]]):
+        """Merge an agent update; ts is its publish time, or 0 when relayed by a state sync."""
+
+        order = (version, owner)
+        current = self.agents.get(agent_id)
+        if current is not None and (current[1], current[0]) >= order:
+            return
+        tombstone = self._tombstones.get(agent_id)
+        if tombstone is not None and tombstone[:2] >= order:
+            return
+        owner_member = self.members.get(owner)
+        if owner != self.node_id and owner_member is not None and owner_member.state == DEAD:
+            return
+
+        self._clock = max(self._clock, version)
+        if current is not None:
+            self._owned.get(current[0], set()).discard(agent_id)
+
+        if record is None:
+            self.agents.pop(agent_id, None)
+            self._tombstones[agent_id] = (version, owner, time.monotonic())
+        else:
+            self._tombstones.pop(agent_id, None)
+            self.agents[agent_id] = (owner, version, record)
+            self._owned.setdefault(owner, set()).add(agent_id)
+
+        if owner != self.node_id:
+            self.stats["agent_updates"] += 1
+            if ts > 0:
+                delay = max(0.0, time.time() - ts)
+                self.stats["propagation_delay_total"] += delay
+                self.stats["propagation_delay_max"] = max(self.stats["propagation_delay_max"], delay)
+
+        self._queue_update(("a", agent_id), self._encode_agent(agent_id, owner, version, ts, record))
+        self._agent_changed(agent_id, record)
+
+    def _drop_agents_of(self, node_id: str):
+        """Remove a dead node's agents locally (every node does this itself)."""
+
+        now = time.monotonic()
+        for agent_id in self._owned.pop(node_id, set()):
+            owner, version, _ = self.agents.pop(agent_id)
+            self._tombstones[agent_id] = (version, owner, now)
+            self._agent_changed(agent_id, None)
+
+    def _agent_changed(self, agent_id: str, record: Optional[Dict[str, Any]]):
+        if self.on_agent_change:
+            try:
+                self.on_agent_change(agent_id, record)
+            except Exception as e:
+                logger.error(f"Error in gossip agent callback: {e}")
+
+    def _apply_update(self, update: List[Any]):
+        if update[0] == "m":
+            _, node_id, host, port, state, incarnation = update
+            self._apply_member(node_id, (host, port), state, incarnation)
+        elif update[0] == "a":
+            _, agent_id, owner, version, ts, record = update
+            self._apply_agent(agent_id, owner, version, ts, record)
+
+    @staticmethod
+    def _encode_member(node_id: str, address: Address, state: str, incarnation: int) -> str:
+        return json.dumps(["m", node_id, address[0], address[1], state, incarnation],
+                          separators=(",", ":"))
+
+    @staticmethod
+    def _encode_agent(agent_id: str, owner: str, version: int, ts: float,
+                      record: Optional[Dict[str, Any]]) -> str:
+        return json.dumps(["a", agent_id, owner, version, ts, record], separators=(",", ":"))
+
+    def _queue_update(self, key: Tuple[str, str], encoded: str):
+        # A newer update about the same member or agent replaces the queued one
+        self._broadcasts[key] = [encoded, 0]
+
+    def _piggyback(self, budget: int) -> List[str]:
+        """Take the least-sent queued updates that fit in budget bytes."""
+
+        if not self._broadcasts:
+            return []
+
+        limit = self.config.retransmit_mult * self._log_scale()
+        chosen = []
+        for key, entry in sorted(self._broadcasts.items(), key=lambda item: item[1][1]):
+            size = len(entry[0]) + 1
+            if size > budget:
+                continue
+            chosen.append(entry[0])
+            budget -= size
+            entry[1] += 1
+            if entry[1] >= limit:
+                del self._broadcasts[key]
+        return chosen
+
+    def _log_scale(self) -> int:
+        return max(1, math.ceil(math.log10(len(self.members) + 1)))
+
+    # Wire
+
+    def _send(self, kind: str, address: Address, seq: Optional[int] = None,
+              extra: Dict[str, Any] = None, updates: Optional[List[str]] = None):
+        """Send a message; without explicit updates, queued updates are piggybacked."""
+
+        if self._transport is None:
+            return
+
+        message = {"k": kind, "f": self.node_id}
+        if seq is not None:
+            message["s"] = seq
+        if extra:
+            message.update(extra)
+        head = json.dumps(message, separators=(",", ":"))
+        if updates is None:
+            updates = self._piggyback(self.config.max_datagram - len(head) - 8)
+
+        data = (head[:-1] + ',"u":[' + ",".join(updates) + "]}").encode()
+        self._transport.sendto(data, address)
+        self.stats["messages_sent"] += 1
+        self.stats["bytes_sent"] += len(data)
+
+    def _send_state(self, address: Address, reply: bool):
+        """Send every member and agent record (push); with reply, ask for the peer's (pull)."""
+
+        self.stats["syncs"] += 1
+        updates = [self._encode_member(m.node_id, m.address, m.state, m.incarnation)
+                   for m in self.members.values()]
+        updates.extend(self._encode_agent(agent_id, owner, version, 0.0, record)
+                       for agent_id, (owner, version, record) in self.agents.items())
+        updates.extend(self._encode_agent(agent_id, owner, version, 0.0, None)
+                       for agent_id, (version, owner, _) in self._tombstones.items())
+
+        budget = self.config.max_datagram - 64
+        chunk: List[str] = []
+        size = 0
+        first = True
+        for encoded in updates:
+            if chunk and size + len(encoded) + 1 > budget:
+                self._send("sync", address, extra={"r": reply and first}, updates=chunk)
+                chunk, size, first = [], 0, False
+            chunk.append(encoded)
+            size += len(encoded) + 1
+        self._send("sync", address, extra={"r": reply and first}, updates=chunk)
+
+    def _on_datagram(self, data: bytes, addr: Address):
+        self.stats["messages_received"] += 1
+        self.stats["bytes_received"] += len(data)
+
+        try:
+            message = json.loads(data)
+            kind = message["k"]
+            for update in message.get("u", ()):
+                self._apply_update(update)
+        except (ValueError, KeyError, TypeError) as e:
+            self.stats["malformed"] += 1
+            logger.debug(f"Malformed gossip message from {addr}: {e}")
+            return
+
+        if kind == "ping":
+            self._send("ack", addr, message["s"])
+        elif kind == "ack":
+            ack = self._acks.get(message["s"])
+            if ack is not None and not ack.done():
+                ack.set_result(True)
+        elif kind == "ping-req":
+            self._spawn(self._relay_probe(message["s"], tuple(message["ta"]), addr))
+        elif kind == "sync" and message.get("r"):
+            self._send_state(addr, reply=False)
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _sample_members(self, count: int, exclude: Optional[str] = None) -> List[Member]:
+        candidates = [member for node_id, member in self.members.items()
+                      if node_id not in (self.node_id, exclude) and member.state == ALIVE]
+        return random.sample(candidates, min(count, len(candidates)))
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
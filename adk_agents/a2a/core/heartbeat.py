@@ -0,0 +1,150 @@
+"""
+Host-level Heartbeats for A2A Discovery
+
+With many agents on one host, a heartbeat per agent per interval and a full
+re-registration per change make discovery traffic grow with the agent
+count. HeartbeatAggregator batches both: every interval it sends the queued
+delta registrations (only the changed fields, merged per agent) and one
+heartbeat carrying every local agent's load.
+
+It works with a DiscoveryService shared by the host's agents or with a
+DiscoveryClusterClient, which turns each batch into one request per node.
+"""
+
+import asyncio
+import inspect
+import logging
+from typing import Dict, Optional, Any, List, Callable
+
+from .discovery import UPDATABLE_FIELDS
+from .load_balancing import AgentLoad
+
+logger = logging.getLogger(__name__)
+
+
+class HeartbeatAggregator:
+    """Sends one batched heartbeat and one batch of registration deltas per interval for a host's agents."""
+
+    def __init__(self, discovery, interval: float = 10.0):
+        """
+        Args:
+            discovery: DiscoveryService or DiscoveryClusterClient (anything with
+                heartbeat_many() and apply_updates(), plain or async)
+            interval: Seconds between batches; keep it well under the agents' ttl
+        """
+        self.discovery = discovery
+        self.interval = interval
+
+        self._agents: Dict[str, Optional[Callable[[], AgentLoad]]] = {}  # agent_id -> load source
+        self._updates: Dict[str, Dict[str, Any]] = {}  # agent_id -> fields changed since last batch
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        self.stats = {"batches": 0, "heartbeats": 0, "updates": 0, "missing": 0, "failures": 0}
+
+    def add_agent(self, agent_id: str, load: Callable[[], AgentLoad] = None):
+        """
+        Include an agent in the batched heartbeat. load is called for each
+        batch to report the agent's load (e.g. A2AAgent.current_load).
+        """
+        self._agents[agent_id] = load
+
+    def remove_agent(self, agent_id: str):
+        self._agents.pop(agent_id, None)
+        self._updates.pop(agent_id, None)
+
+    def update_agent(self, agent_id: str, changes: Dict[str, Any]):
+        """Queue a delta registration; it is merged with earlier queued changes and sent with the next batch."""
+
+        unknown = set(changes) - set(UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Fields cannot be updated: {sorted(unknown)}")
+        self._updates.setdefault(agent_id, {}).update(changes)
+
+    def start(self):
+        """Start sending batches every interval."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop, sending whatever is queued first."""
+
+        if self._task is not None:
+            # Let a batch in flight finish; the task is cancelled while it sleeps
+            async with self._lock:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> List[str]:
+        """
+        Send queued updates and a heartbeat for every agent now. Returns the
+        agents the registry did not accept (e.g. expired; they need to
+        register again).
+        """
+
+        async with self._lock:
+            rejected = []
+            updates, self._updates = self._updates, {}
+            if updates:
+                missing = None
+                try:
+                    missing = await self._call(self.discovery.apply_updates, updates)
+                finally:
+                    if missing is None:
+                        # Failed or cancelled: keep them for the next batch
+                        self._requeue(updates)
+                if missing is not None:
+                    self.stats["updates"] += len(updates)
+                    rejected.extend(missing)
+
+            loads = {}
+            for agent_id, load in list(self._agents.items()):
+                try:
+                    loads[agent_id] = load() if load is not None else None
+                except Exception as e:
+                    logger.error(f"Error reading load of agent {agent_id}: {e}")
+                    loads[agent_id] = None
+            if loads:
+                missing = await self._call(self.discovery.heartbeat_many, loads)
+                if missing is not None:
+                    self.stats["heartbeats"] += len(loads)
+                    rejected = list(dict.fromkeys(rejected + missing))
+
+            self.stats["batches"] += 1
+            if rejected:
+                self.stats["missing"] += len(rejected)
+                logger.warning(f"Discovery did not accept heartbeats for {len(rejected)} agents: "
+                               f"{rejected[:5]}")
+            return rejected
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "agents": len(self._agents), "queued_updates": len(self._updates)}
+
+    def _requeue(self, updates: Dict[str, Dict[str, Any]]):
+        """Keep unsent updates for the next batch, under any changes queued meanwhile."""
+
+        for agent_id, changes in updates.items():
+            self._updates[agent_id] = {**changes, **self._updates.get(agent_id, {})}
+
+    async def _call(self, method, batch) -> Optional[List[str]]:
+        """Call a discovery batch method, plain or async; None if it raised."""
+
+        try:
+            result = method(batch)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.error(f"Error sending batch to discovery: {e}")
+            return None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
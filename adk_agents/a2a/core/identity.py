@@ -5,18 +5,134 @@ Handles cryptographic identity, keys, certificates, and DID (Decentralized Ident
 for secure agent authentication and authorization.
 """
 
+import os
+import time
 import uuid
 import json
+import asyncio
 import hashlib
+import threading
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Tuple, Union, Deque
 from dataclasses import dataclass, asdict
 from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import rsa, padding, ed25519
 from cryptography.hazmat.backends import default_backend
 from cryptography import x509
 from cryptography.x509.oid import NameOID
 
+from .keystore import IdentityStore, STORE_FILE
+
+
+PrivateKey = Union[rsa.RSAPrivateKey, ed25519.Ed25519PrivateKey]
+KEY_TYPES = ("rsa", "ed25519")
+
+
+def generate_private_key(key_type: str = "rsa") -> PrivateKey:
+    """Generate an identity key pair of the given type."""
+
+    if key_type == "rsa":
+        return rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=2048,
+            backend=default_backend()
+        )
+    if key_type == "ed25519":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Unknown key type: {key_type}")
+
+
+class KeyPool:
+    """
+    Keeps up to `size` identity key pairs generated ahead of time.
+
+    A background thread refills the pool, so creating an identity only pays
+    for key generation when the pool has run dry.
+    """
+
+    def __init__(self, size: int = 8, key_type: str = "rsa"):
+        if key_type not in KEY_TYPES:
+            raise ValueError(f"Unknown key type: {key_type}")
+
+        self.size = size
+        self.key_type = key_type
+        self._ready: Deque[PrivateKey] = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.hits = 0
+        self.misses = 0
+
+    def start(self):
+        """Start refilling the pool in the background."""
+
+        if self._thread:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._refill, name="a2a-key-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the refill thread; keys already generated stay available."""
+
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def take(self) -> PrivateKey:
+        """Take a ready key pair, generating one inline if the pool is empty."""
+
+        with self._condition:
+            if self._ready:
+                self.hits += 1
+                key = self._ready.popleft()
+                self._condition.notify()
+                return key
+            self.misses += 1
+
+        return generate_private_key(self.key_type)
+
+    def wait_until_full(self, timeout: float = None) -> bool:
+        """Block until the pool holds `size` keys (useful before a burst of agents)."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while len(self._ready) < self.size:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "key_type": self.key_type,
+            "ready": len(self._ready),
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _refill(self):
+        while True:
+            with self._condition:
+                while self._running and len(self._ready) >= self.size:
+                    self._condition.wait()
+                if not self._running:
+                    return
+
+            key = generate_private_key(self.key_type)
+
+            with self._condition:
+                self._ready.append(key)
+                self._condition.notify_all()
+
 
 @dataclass
 class AgentIdentity:
@@ -29,24 +145,42 @@ class AgentIdentity:
     metadata: Dict[str, Any]
     created_at: datetime
     expires_at: Optional[datetime] = None
+    key_type: str = "rsa"  # "rsa" or "ed25519"
 
     def __post_init__(self):
         if not self.agent_id:
             self.agent_id = str(uuid.uuid4())
         if not self.did:
             self.did = f"did:a2a:{self.agent_id}"
+        # Parsed public key, cached against the PEM it was loaded from
+        self._loaded_public_key: Optional[Tuple[str, Any]] = None
+
+    def load_public_key(self):
+        """Get the parsed public key, parsing the PEM only once."""
+
+        cached = self._loaded_public_key
+        if cached is not None and cached[0] == self.public_key:
+            return cached[1]
+
+        public_key = serialization.load_pem_public_key(
+            self.public_key.encode('utf-8'),
+            backend=default_backend()
+        )
+        self._loaded_public_key = (self.public_key, public_key)
+        return public_key
 
     @classmethod
     def create(cls, capabilities: List[str], metadata: Dict[str, Any] = None,
-               validity_days: int = 365) -> 'AgentIdentity':
+               validity_days: int = 365, agent_id: str = "", key_type: str = "rsa",
+               private_key: PrivateKey = None) -> 'AgentIdentity':
         """Create a new agent identity with cryptographic keys."""
 
-        # Generate RSA key pair
-        private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048,
-            backend=default_backend()
-        )
+        agent_id = agent_id or str(uuid.uuid4())
+
+        # Generate the key pair unless one was supplied (e.g. from a KeyPool)
+        if private_key is None:
+            private_key = generate_private_key(key_type)
+        key_type = "ed25519" if isinstance(private_key, ed25519.Ed25519PrivateKey) else "rsa"
 
         # Extract public key
         public_key = private_key.public_key()
@@ -61,7 +195,8 @@ class AgentIdentity:
             x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, "CA"),
             x509.NameAttribute(NameOID.LOCALITY_NAME, "San Francisco"),
             x509.NameAttribute(NameOID.ORGANIZATION_NAME, "Felicia's Finance"),
-            x509.NameAttribute(NameOID.COMMON_NAME, f"agent-{str(uuid.uuid4())[:8]}"),
+            # MutualTLSAuthenticator maps the certificate back to the agent by this name
+            x509.NameAttribute(NameOID.COMMON_NAME, f"agent-{agent_id}"),
         ])
 
         cert = x509.CertificateBuilder().subject_name(
@@ -82,18 +217,20 @@ class AgentIdentity:
                 x509.DNSName("agent.felicia.finance"),
             ]),
             critical=False,
-        ).sign(private_key, hashes.SHA256(), default_backend())
+        ).sign(private_key, hashes.SHA256() if key_type == "rsa" else None, default_backend())
 
         # Create identity
         identity = cls(
-            agent_id="",
+            agent_id=agent_id,
             did="",
             public_key=public_key_pem,
             capabilities=capabilities,
             metadata=metadata or {},
             created_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(days=validity_days)
+            expires_at=datetime.utcnow() + timedelta(days=validity_days),
+            key_type=key_type
         )
+        identity._loaded_public_key = (public_key_pem, public_key)
 
         return identity, private_key, cert
 
@@ -125,8 +262,11 @@ class AgentIdentity:
         """Check if agent has a specific capability."""
         return capability in self.capabilities
 
-    def sign_data(self, private_key: rsa.RSAPrivateKey, data: bytes) -> str:
+    def sign_data(self, private_key: PrivateKey, data: bytes) -> str:
         """Sign data with the agent's private key."""
+        if isinstance(private_key, ed25519.Ed25519PrivateKey):
+            return private_key.sign(data).hex()
+
         signature = private_key.sign(
             data,
             padding.PSS(
@@ -140,10 +280,11 @@ class AgentIdentity:
     def verify_signature(self, data: bytes, signature: str) -> bool:
         """Verify data signature against the agent's public key."""
         try:
-            public_key = serialization.load_pem_public_key(
-                self.public_key.encode('utf-8'),
-                backend=default_backend()
-            )
+            public_key = self.load_public_key()
+
+            if isinstance(public_key, ed25519.Ed25519PublicKey):
+                public_key.verify(bytes.fromhex(signature), data)
+                return True
 
             public_key.verify(
                 bytes.fromhex(signature),
@@ -160,91 +301,180 @@ class AgentIdentity:
 
 
 class IdentityManager:
-    """Manages agent identities and cryptographic operations."""
-
-    def __init__(self, storage_path: str = "./identities"):
+    """
+    Manages agent identities and cryptographic operations.
+
+    Identities are persisted in a single IdentityStore file under
+    storage_path. Private keys and certificates are kept encoded when an
+    identity is loaded and parsed on first use. Identities saved by older
+    versions as separate JSON/PEM files are migrated into the store on
+    startup unless migrate_legacy is False.
+    """
+
+    def __init__(self, storage_path: str = "./identities", negative_cache_ttl: float = 30.0,
+                 key_pool: KeyPool = None, migrate_legacy: bool = True):
         self.storage_path = storage_path
+        self.negative_cache_ttl = negative_cache_ttl
+        self.key_pool = key_pool
         self.identities: Dict[str, AgentIdentity] = {}
-        self.private_keys: Dict[str, rsa.RSAPrivateKey] = {}
+        self.private_keys: Dict[str, PrivateKey] = {}
         self.certificates: Dict[str, x509.Certificate] = {}
+        self._encoded: Dict[str, Tuple[bytes, bytes]] = {}  # agent_id -> undecoded key and cert PEM
+        self._decode_lock = threading.Lock()
+        self._missing: Dict[str, float] = {}  # agent_id -> monotonic time the miss expires
 
         # Create storage directory if it doesn't exist
-        import os
         os.makedirs(storage_path, exist_ok=True)
+        self.store = IdentityStore(os.path.join(storage_path, STORE_FILE))
+
+        if migrate_legacy:
+            self.migrate_legacy_identities()
 
     def create_identity(self, capabilities: List[str], metadata: Dict[str, Any] = None,
-                       validity_days: int = 365) -> AgentIdentity:
-        """Create and store a new agent identity."""
+                       validity_days: int = 365, agent_id: str = "",
+                       key_type: str = None) -> AgentIdentity:
+        """
+        Create and store a new agent identity.
+
+        The key pair comes from the key pool when one is configured for the
+        requested key type (by default, the pool's type or RSA).
+        """
+
+        pool = self.key_pool
+        key_type = key_type or (pool.key_type if pool else "rsa")
+        private_key = pool.take() if pool and pool.key_type == key_type else None
 
         identity, private_key, cert = AgentIdentity.create(
             capabilities=capabilities,
             metadata=metadata,
-            validity_days=validity_days
+            validity_days=validity_days,
+            agent_id=agent_id,
+            key_type=key_type,
+            private_key=private_key
         )
 
         # Store identity and keys
-        self.identities[identity.agent_id] = identity
-        self.private_keys[identity.agent_id] = private_key
-        self.certificates[identity.agent_id] = cert
+        self._store(identity, private_key, cert)
 
         # Save to disk
         self._save_identity(identity, private_key, cert)
 
         return identity
 
+    async def create_identity_async(self, capabilities: List[str], metadata: Dict[str, Any] = None,
+                                    validity_days: int = 365, agent_id: str = "",
+                                    key_type: str = None) -> AgentIdentity:
+        """Create an identity on a worker thread, keeping key generation off the event loop."""
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: self.create_identity(capabilities, metadata, validity_days, agent_id, key_type)
+        )
+
+    async def get_identity_async(self, agent_id: str) -> Optional[AgentIdentity]:
+        """Get an identity, loading it from storage on a worker thread if needed."""
+
+        if agent_id in self.identities:
+            return self.identities[agent_id]
+        return await asyncio.get_running_loop().run_in_executor(None, self.load_identity, agent_id)
+
     def load_identity(self, agent_id: str) -> Optional[AgentIdentity]:
         """Load an identity from storage."""
-        identity_file = f"{self.storage_path}/{agent_id}_identity.json"
-        key_file = f"{self.storage_path}/{agent_id}_private.pem"
-        cert_file = f"{self.storage_path}/{agent_id}_cert.pem"
 
-        try:
-            # Load identity
-            with open(identity_file, 'r') as f:
-                identity_data = json.load(f)
-            identity = AgentIdentity.from_dict(identity_data)
-
-            # Load private key
-            with open(key_file, 'rb') as f:
-                private_key = serialization.load_pem_private_key(
-                    f.read(),
-                    password=None,
-                    backend=default_backend()
-                )
-
-            # Load certificate
-            with open(cert_file, 'rb') as f:
-                cert = x509.load_pem_x509_certificate(f.read(), default_backend())
-
-            # Store in memory
-            self.identities[agent_id] = identity
-            self.private_keys[agent_id] = private_key
-            self.certificates[agent_id] = cert
-
-            return identity
-
-        except FileNotFoundError:
+        if self._known_missing(agent_id):
+            return None
+
+        record = self.store.get(agent_id)
+        if record is None:
+            self._missing[agent_id] = time.monotonic() + self.negative_cache_ttl
             return None
+
+        try:
+            identity = AgentIdentity.from_dict(json.loads(record[0]))
         except Exception as e:
             print(f"Error loading identity {agent_id}: {e}")
             return None
 
+        # Store in memory; key material is decoded on first use
+        self._store_encoded(identity, record[1], record[2])
+        return identity
+
+    def preload_identities(self) -> int:
+        """Load every stored identity into memory; returns how many were loaded."""
+
+        loaded = 0
+        for agent_id in self.store.agent_ids():
+            if agent_id not in self.identities and self.load_identity(agent_id):
+                loaded += 1
+        return loaded
+
+    def migrate_legacy_identities(self, remove_files: bool = True) -> int:
+        """
+        Move identities saved as per-agent JSON/PEM files into the store.
+
+        All identities are written in one batch; the old files are removed
+        only after the batch is durable. Returns how many were migrated.
+        """
+
+        suffix = "_identity.json"
+        agent_ids = [
+            entry.name[:-len(suffix)] for entry in os.scandir(self.storage_path)
+            if entry.name.endswith(suffix)
+        ]
+        if not agent_ids:
+            return 0
+
+        records = []
+        migrated = []  # already in the store or read successfully
+        for agent_id in agent_ids:
+            if agent_id not in self.store:
+                try:
+                    records.append((agent_id, self._read_legacy_files(agent_id)))
+                except Exception as e:
+                    print(f"Error migrating identity {agent_id}: {e}")
+                    continue
+            migrated.append(agent_id)
+
+        self.store.put_many(records)
+
+        if remove_files:
+            for agent_id in migrated:
+                for path in self._legacy_paths(agent_id):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+        return len(records)
+
+    def forget_missing(self, agent_id: str = None):
+        """Drop negative cache entries, e.g. after identities were added externally."""
+
+        if agent_id is None:
+            self._missing.clear()
+        else:
+            self._missing.pop(agent_id, None)
+
     def get_identity(self, agent_id: str) -> Optional[AgentIdentity]:
         """Get an identity from memory or load from storage."""
         if agent_id in self.identities:
             return self.identities[agent_id]
         return self.load_identity(agent_id)
 
-    def get_private_key(self, agent_id: str) -> Optional[rsa.RSAPrivateKey]:
+    def get_private_key(self, agent_id: str) -> Optional[PrivateKey]:
         """Get the private key for an agent."""
         if agent_id not in self.private_keys:
-            self.load_identity(agent_id)
+            if agent_id not in self._encoded:
+                self.load_identity(agent_id)
+            self._decode_keys(agent_id)
         return self.private_keys.get(agent_id)
 
     def get_certificate(self, agent_id: str) -> Optional[x509.Certificate]:
         """Get the certificate for an agent."""
         if agent_id not in self.certificates:
-            self.load_identity(agent_id)
+            if agent_id not in self._encoded:
+                self.load_identity(agent_id)
+            self._decode_keys(agent_id)
         return self.certificates.get(agent_id)
 
     def sign_data(self, agent_id: str, data: bytes) -> Optional[str]:
@@ -265,26 +495,87 @@ class IdentityManager:
 
         return identity.verify_signature(data, signature)
 
-    def _save_identity(self, identity: AgentIdentity, private_key: rsa.RSAPrivateKey,
-                      cert: x509.Certificate):
-        """Save identity, private key, and certificate to disk."""
+    def _decode_keys(self, agent_id: str):
+        """Parse a loaded identity's private key and certificate."""
+
+        with self._decode_lock:
+            encoded = self._encoded.pop(agent_id, None)
+        if encoded is None:
+            return
+
+        key_pem, cert_pem = encoded
+        try:
+            private_key = serialization.load_pem_private_key(
+                key_pem,
+                password=None,
+                backend=default_backend()
+            )
+            cert = x509.load_pem_x509_certificate(cert_pem, default_backend())
+        except Exception as e:
+            print(f"Error loading keys for identity {agent_id}: {e}")
+            return
+
+        self.private_keys[agent_id] = private_key
+        self.certificates[agent_id] = cert
+
+    def _legacy_paths(self, agent_id: str) -> Tuple[str, str, str]:
+        return (
+            f"{self.storage_path}/{agent_id}_identity.json",
+            f"{self.storage_path}/{agent_id}_private.pem",
+            f"{self.storage_path}/{agent_id}_cert.pem",
+        )
+
+    def _read_legacy_files(self, agent_id: str) -> Tuple[bytes, bytes, bytes]:
+        """Read an identity saved as separate files, without parsing the keys."""
+
+        contents = []
+        for path in self._legacy_paths(agent_id):
+            with open(path, 'rb') as f:
+                contents.append(f.read())
+
+        # Re-encode the identity document compactly
+        identity_json = json.dumps(json.loads(contents[0]), separators=(",", ":")).encode('utf-8')
+        return identity_json, contents[1], contents[2]
+
+    def _store(self, identity: AgentIdentity, private_key: PrivateKey,
+               cert: x509.Certificate):
+        agent_id = identity.agent_id
+        self.identities[agent_id] = identity
+        self.private_keys[agent_id] = private_key
+        self.certificates[agent_id] = cert
+        self._encoded.pop(agent_id, None)
+        self._missing.pop(agent_id, None)
+
+    def _store_encoded(self, identity: AgentIdentity, key_pem: bytes, cert_pem: bytes):
         agent_id = identity.agent_id
+        self.identities[agent_id] = identity
+        self.private_keys.pop(agent_id, None)
+        self.certificates.pop(agent_id, None)
+        self._encoded[agent_id] = (key_pem, cert_pem)
+        self._missing.pop(agent_id, None)
+
+    def _known_missing(self, agent_id: str) -> bool:
+        """Check the negative cache, expiring stale entries."""
+
+        expires = self._missing.get(agent_id)
+        if expires is None:
+            return False
+        if time.monotonic() < expires:
+            return True
 
-        # Save identity
-        identity_file = f"{self.storage_path}/{agent_id}_identity.json"
-        with open(identity_file, 'w') as f:
-            json.dump(identity.to_dict(), f, indent=2)
+        del self._missing[agent_id]
+        return False
 
-        # Save private key
-        key_file = f"{self.storage_path}/{agent_id}_private.pem"
-        with open(key_file, 'wb') as f:
-            f.write(private_key.private_bytes(
+    def _save_identity(self, identity: AgentIdentity, private_key: PrivateKey,
+                      cert: x509.Certificate):
+        """Save identity, private key, and certificate to the identity store."""
+        self.store.put(
+            identity.agent_id,
+            json.dumps(identity.to_dict(), separators=(",", ":")).encode('utf-8'),
+            private_key.private_bytes(
                 encoding=serialization.Encoding.PEM,
                 format=serialization.PrivateFormat.PKCS8,
                 encryption_algorithm=serialization.NoEncryption()
-            ))
-
-        # Save certificate
-        cert_file = f"{self.storage_path}/{agent_id}_cert.pem"
-        with open(cert_file, 'wb') as f:
-            f.write(cert.public_bytes(serialization.Encoding.PEM))
\ No newline at end of file
+            ),
+            cert.public_bytes(serialization.Encoding.PEM)
+        )
\ No newline at end of file
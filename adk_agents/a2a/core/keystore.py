@@ -0,0 +1,358 @@
+"""
+Identity Keystore for A2A Protocol
+
+Stores every agent identity (identity document, private key and
+certificate) as a record in one append-only file. An in-memory index maps
+agent_id to the record's position, built by skipping from header to header
+when the file is opened, so lookups are a dict hit and a single pread; key
+material is returned as bytes and parsed only by callers that need it.
+Updates and deletions append new records, and compaction rewrites the live
+records to a temporary file that atomically replaces the store.
+
+Several IdentityStore instances, in one or more processes, may share a
+file: appends are single O_APPEND writes under an exclusive file lock, and
+each instance picks up records appended by others by scanning the tail.
+"""
+
+import os
+import zlib
+import fcntl
+import struct
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Any, List, Tuple, Iterable
+
+logger = logging.getLogger(__name__)
+
+STORE_FILE = "identities.keystore"
+FILE_MAGIC = b"A2AKEYS1"
+RECORD_HEADER = struct.Struct(">IBHIII")  # crc32, op, agent_id, identity, key, cert lengths
+OP_PUT = 1
+OP_DELETE = 2
+SCAN_CHUNK = 1 << 20  # bytes read at a time while indexing
+
+# identity document (JSON), private key (PEM), certificate (PEM)
+IdentityRecord = Tuple[bytes, bytes, bytes]
+
+
+class IdentityStore:
+    """Append-only, indexed single-file store of agent identity records."""
+
+    def __init__(self, path: str, fsync: bool = True, compact_ratio: float = 0.5,
+                 compact_min_bytes: int = 1 << 20):
+        self.path = path
+        self.fsync = fsync
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+
+        self._lock = threading.RLock()
+        self._index: Dict[str, Tuple[int, int]] = {}  # agent_id -> (position, record length)
+        self._fd: Optional[int] = None
+        self._inode: Optional[Tuple[int, int]] = None
+        self._end = 0  # bytes of the file indexed so far
+        self._dead_bytes = 0
+        self._synced = 0
+        self.compactions = 0
+
+        self._sync_lock = threading.Lock()
+        self._lock_path = f"{path}.lock"
+        self._lock_depth = 0
+        with self._lock:
+            self._open()
+
+    def __contains__(self, agent_id: str) -> bool:
+        with self._lock:
+            if agent_id not in self._index:
+                self._refresh()
+            return agent_id in self._index
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def agent_ids(self) -> List[str]:
+        """Agent IDs with a stored identity."""
+
+        with self._lock:
+            self._refresh()
+            return list(self._index)
+
+    def get(self, agent_id: str) -> Optional[IdentityRecord]:
+        """Read an agent's identity record, or None if it is not stored."""
+
+        with self._lock:
+            if agent_id not in self._index:
+                self._refresh()
+            for _ in range(2):
+                entry = self._index.get(agent_id)
+                if entry is None:
+                    return None
+                record = self._read_record(agent_id, *entry)
+                if record is not None:
+                    return record
+                # Stale position (the file was compacted elsewhere) - reopen and retry
+                self._reopen()
+
+        logger.error(f"Corrupt identity record for {agent_id} in {self.path}")
+        return None
+
+    def put(self, agent_id: str, identity: bytes, private_key: bytes, certificate: bytes):
+        """Store an identity record durably, replacing any previous one."""
+        self.put_many([(agent_id, (identity, private_key, certificate))])
+
+    def put_many(self, records: Iterable[Tuple[str, IdentityRecord]]):
+        """Store several identity records with one write and one fsync."""
+
+        payload = b"".join(
+            self._encode(OP_PUT, agent_id, identity, private_key, certificate)
+            for agent_id, (identity, private_key, certificate) in records
+        )
+        if payload:
+            self._append(payload)
+
+    def delete(self, agent_id: str) -> bool:
+        """Remove an agent's identity; returns False if it was not stored."""
+
+        if agent_id not in self:
+            return False
+        self._append(self._encode(OP_DELETE, agent_id, b"", b"", b""))
+        return True
+
+    def compact(self):
+        """Rewrite the live records to a new file and atomically swap it in."""
+
+        with self._sync_lock, self._lock, self._file_lock():
+            self._refresh()
+            temp_path = f"{self.path}.compact"
+            index = {}
+
+            with open(temp_path, "wb") as f:
+                f.write(FILE_MAGIC)
+                for agent_id, (position, length) in self._index.items():
+                    record = os.pread(self._fd, length, position)
+                    index[agent_id] = (f.tell(), length)
+                    f.write(record)
+                end = f.tell()
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(temp_path, self.path)
+            self._fsync_directory()
+
+            os.close(self._fd)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND)
+            self._inode = self._file_id(os.fstat(self._fd))
+            self._index = index
+            self._end = self._synced = end
+            self._dead_bytes = 0
+            self.compactions += 1
+
+    def close(self):
+        """Close the store file."""
+
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": self.path,
+                "records": len(self._index),
+                "file_bytes": self._end,
+                "dead_bytes": self._dead_bytes,
+                "compactions": self.compactions,
+            }
+
+    def _open(self):
+        """Open (creating if needed) the store file and index it."""
+
+        with self._file_lock():
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+            if os.fstat(fd).st_size == 0:
+                os.write(fd, FILE_MAGIC)
+                os.fsync(fd)
+            elif os.pread(fd, len(FILE_MAGIC), 0) != FILE_MAGIC:
+                os.close(fd)
+                raise ValueError(f"{self.path} is not an identity keystore")
+
+            self._fd = fd
+            self._inode = self._file_id(os.fstat(fd))
+            self._index = {}
+            self._end = len(FILE_MAGIC)
+            self._dead_bytes = 0
+            self._scan(repair=True)
+            self._synced = self._end
+
+    def _reopen(self):
+        if self._fd is not None:
+            os.close(self._fd)
+        self._open()
+
+    def _refresh(self):
+        """Index records appended by other writers; reopen if the file was replaced."""
+
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return
+
+        if self._file_id(current) != self._inode:
+            self._reopen()
+        elif current.st_size > self._end:
+            self._scan(repair=False)
+
+    def _scan(self, repair: bool):
+        """
+        Index records from the end of the indexed region to the end of the file.
+
+        The file is read in large chunks and only headers are parsed, except
+        for the last record whose checksum is checked to detect a torn write. With repair, a torn tail is truncated
+        (the caller holds the file lock); otherwise it is left for the writer.
+        """
+
+        size = os.fstat(self._fd).st_size
+        position = self._end
+        records = []
+        chunk, chunk_start = b"", position
+
+        def read(start: int, length: int) -> bytes:
+            nonlocal chunk, chunk_start
+            if start < chunk_start or start + length > chunk_start + len(chunk):
+                chunk, chunk_start = os.pread(self._fd, max(length, SCAN_CHUNK), start), start
+            return chunk[start - chunk_start:start - chunk_start + length]
+
+        while position + RECORD_HEADER.size <= size:
+            _, op, id_length, identity_length, key_length, cert_length = RECORD_HEADER.unpack(
+                read(position, RECORD_HEADER.size)
+            )
+            length = RECORD_HEADER.size + id_length + identity_length + key_length + cert_length
+            if position + length > size:
+                break
+            agent_id = read(position + RECORD_HEADER.size, id_length).decode("utf-8", "replace")
+            records.append((position, length, agent_id, op))
+            position += length
+
+        if records and not self._checksum_ok(records[-1][0], records[-1][1]):
+            position = records.pop()[0]
+
+        for start, length, agent_id, op in records:
+            previous = self._index.pop(agent_id, None)
+            if previous is not None:
+                self._dead_bytes += previous[1]
+            if op == OP_PUT:
+                self._index[agent_id] = (start, length)
+            else:
+                self._dead_bytes += length
+
+        if position < size and repair:
+            logger.warning(f"Truncating torn tail of {self.path} at {position} bytes")
+            os.truncate(self.path, position)
+
+        self._end = position
+
+    def _append(self, payload: bytes):
+        with self._lock:
+            with self._file_lock():
+                self._refresh()
+                if self._end != os.fstat(self._fd).st_size:
+                    # Drop a torn tail left by a crashed writer before appending
+                    self._scan(repair=True)
+                os.write(self._fd, payload)
+                self._scan(repair=False)
+                written = self._end
+
+            compact = (self._end >= self.compact_min_bytes and
+                       self._dead_bytes > self._end * self.compact_ratio)
+
+        self._sync(written)
+        if compact:
+            self.compact()
+
+    def _sync(self, position: int):
+        """Group commit: one fsync covers every append made before it."""
+
+        if not self.fsync:
+            return
+
+        with self._sync_lock:
+            if self._synced >= position:
+                return
+            with self._lock:
+                target = self._end
+                fd = self._fd
+            os.fsync(fd)
+            self._synced = max(self._synced, target)
+
+    def _read_record(self, agent_id: str, position: int, length: int) -> Optional[IdentityRecord]:
+        """Read and check one record; None if it does not hold this agent's identity."""
+
+        data = os.pread(self._fd, length, position)
+        if len(data) < length:
+            return None
+
+        crc, op, id_length, identity_length, key_length, cert_length = RECORD_HEADER.unpack_from(data)
+        if op != OP_PUT or zlib.crc32(data[4:]) != crc:
+            return None
+
+        start = RECORD_HEADER.size
+        if data[start:start + id_length].decode("utf-8", "replace") != agent_id:
+            return None
+
+        start += id_length
+        identity = data[start:start + identity_length]
+        start += identity_length
+        private_key = data[start:start + key_length]
+        start += key_length
+        return identity, private_key, data[start:start + cert_length]
+
+    def _checksum_ok(self, position: int, length: int) -> bool:
+        data = os.pread(self._fd, length, position)
+        return len(data) == length and zlib.crc32(data[4:]) == RECORD_HEADER.unpack_from(data)[0]
+
+    @staticmethod
+    def _encode(op: int, agent_id: str, identity: bytes, private_key: bytes,
+                certificate: bytes) -> bytes:
+        agent_id_bytes = agent_id.encode("utf-8")
+        body = RECORD_HEADER.pack(0, op, len(agent_id_bytes), len(identity),
+                                  len(private_key), len(certificate))[4:]
+        body += agent_id_bytes + identity + private_key + certificate
+        return struct.pack(">I", zlib.crc32(body)) + body
+
+    @contextmanager
+    def _file_lock(self):
+        """
+        Exclusive lock shared with other instances and processes writing the
+        same store. Reentrant within an instance; callers hold self._lock.
+        """
+
+        if self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._lock_depth = 1
+            try:
+                yield
+            finally:
+                self._lock_depth = 0
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _fsync_directory(self):
+        fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _file_id(stat: os.stat_result) -> Tuple[int, int]:
+        return stat.st_dev, stat.st_ino
@@ -0,0 +1,207 @@
+"""
+Load-aware Agent Selection for A2A Protocol
+
+Agents report their load (tasks in flight, messages queued, EWMA handler
+latency) with each heartbeat; the discovery service keeps the latest
+report per agent. AgentSelector picks one agent out of the candidates a
+discovery query returned:
+
+- "power_of_two": sample two candidates and take the less loaded one
+- "least_loaded": take the least loaded candidate
+- "affinity": rendezvous-hash a key (e.g. a workflow ID) onto the
+  candidates, skipping any that are over (1 + affinity_slack) times the
+  average load (consistent hashing with bounded loads)
+- "first" and "random": no load information, for comparison
+
+Reports are only as fresh as the last heartbeat, so the selector also
+counts the assignments it made itself and adds those made since an
+agent's last report to it. Otherwise every task between two heartbeats
+would go to the same agent.
+"""
+
+import math
+import time
+import random
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Any, List, Sequence, Callable
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("power_of_two", "least_loaded", "affinity", "first", "random")
+
+
+@dataclass(frozen=True)
+class AgentLoad:
+    """Load reported by an agent in its heartbeat."""
+
+    inflight: int = 0  # Tasks being handled
+    queue_depth: int = 0  # Messages waiting to be handled
+    latency_ewma: float = 0.0  # Seconds per task; 0 if nothing was handled yet
+
+    @property
+    def pending(self) -> int:
+        return self.inflight + self.queue_depth
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"inflight": self.inflight, "queue_depth": self.queue_depth,
+                "latency_ewma": self.latency_ewma}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AgentLoad':
+        return cls(int(data.get("inflight", 0)), int(data.get("queue_depth", 0)),
+                   float(data.get("latency_ewma", 0.0)))
+
+
+class LoadTracker:
+    """Agent side: counts tasks in flight and keeps an EWMA of their latency."""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.inflight = 0
+        self.latency_ewma = 0.0
+        self.completed = 0
+
+    def start(self) -> float:
+        """Note a task starting; pass the result to finish()."""
+        self.inflight += 1
+        return time.monotonic()
+
+    def finish(self, started: float):
+        self.inflight -= 1
+        self.observe(time.monotonic() - started)
+
+    def observe(self, latency: float):
+        """Fold one task's latency into the average."""
+
+        # Plain mean over the first 1/alpha tasks, so one early outlier does not stick
+        self.completed += 1
+        weight = max(self.alpha, 1 / self.completed)
+        self.latency_ewma += weight * (latency - self.latency_ewma)
+
+    def snapshot(self, queue_depth: int = 0) -> AgentLoad:
+        return AgentLoad(self.inflight, queue_depth, self.latency_ewma)
+
+
+class AgentSelector:
+    """Caller side: picks an agent for each task from the candidates discovery returned."""
+
+    def __init__(self, load_of: Callable[[str], Optional[AgentLoad]],
+                 strategy: str = "power_of_two", affinity_slack: float = 0.25,
+                 max_latency_ratio: float = 10.0, rng: random.Random = None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown selection strategy '{strategy}', expected one of {STRATEGIES}")
+
+        self.load_of = load_of
+        self.strategy = strategy
+        self.affinity_slack = affinity_slack
+        self.max_latency_ratio = max_latency_ratio
+        self.rng = rng or random.Random()
+
+        self.outstanding: Dict[str, int] = {}  # agent_id -> our assignments not yet released
+        # agent_id -> (last report seen, our assignments minus releases since then)
+        self._since_report: Dict[str, tuple] = {}
+        self.selections = 0
+
+    def select(self, candidates: Sequence, key: str = None):
+        """
+        Pick one of the candidates (anything with an agent_id), or None if
+        there are none. The key is only used by the affinity strategy.
+        """
+
+        if not candidates:
+            return None
+        if len(candidates) == 1 or self.strategy == "first":
+            return candidates[0]
+
+        self.selections += 1
+        if self.strategy == "random":
+            return self.rng.choice(candidates)
+        if self.strategy == "affinity" and key is not None:
+            return self._select_affinity(candidates, key)
+        if self.strategy == "least_loaded":
+            costs = self._costs(candidates)
+            best = min(costs)
+            return self.rng.choice([c for c, cost in zip(candidates, costs) if cost == best])
+
+        # Power of two choices (also affinity without a key)
+        first, second = self.rng.sample(candidates, 2)
+        first_cost, second_cost = self._costs([first, second])
+        return second if second_cost < first_cost else first
+
+    def acquire(self, agent_id: str):
+        """Count a task assigned to an agent."""
+
+        self.outstanding[agent_id] = self.outstanding.get(agent_id, 0) + 1
+        self._adjust(agent_id, 1)
+
+    def release(self, agent_id: str):
+        """Count a task finished (or abandoned) by an agent."""
+
+        count = self.outstanding.get(agent_id, 0)
+        if count <= 1:
+            self.outstanding.pop(agent_id, None)
+        else:
+            self.outstanding[agent_id] = count - 1
+        if count:
+            self._adjust(agent_id, -1)
+
+    def pending(self, agent_id: str) -> int:
+        """Best estimate of an agent's pending tasks: its last report plus our changes since."""
+
+        load = self.load_of(agent_id)
+        own = self.outstanding.get(agent_id, 0)
+        if load is None:
+            return own
+
+        seen, delta = self._since_report.get(agent_id, (None, 0))
+        if seen is not load:
+            # New report: it already includes what we sent before it
+            self._since_report[agent_id] = (load, 0)
+            delta = 0
+        return max(own, load.pending + delta)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "strategy": self.strategy,
+            "selections": self.selections,
+            "outstanding": sum(self.outstanding.values()),
+        }
+
+    def _adjust(self, agent_id: str, change: int):
+        entry = self._since_report.get(agent_id)
+        if entry is not None:
+            self._since_report[agent_id] = (entry[0], entry[1] + change)
+
+    def _costs(self, candidates: Sequence) -> List[float]:
+        """Expected wait on each candidate: (pending + 1) x its latency."""
+
+        pendings, latencies = [], []
+        for candidate in candidates:
+            load = self.load_of(candidate.agent_id)
+            pendings.append(self.pending(candidate.agent_id))
+            latencies.append(load.latency_ewma if load else 0.0)
+
+        # Agents without a latency yet are assumed to be average, and no agent
+        # counts as more than max_latency_ratio times faster or slower than that
+        known = [latency for latency in latencies if latency > 0]
+        average = sum(known) / len(known) if known else 1.0
+        low, high = average / self.max_latency_ratio, average * self.max_latency_ratio
+        return [(pending + 1) * (min(max(latency, low), high) if latency else average)
+                for pending, latency in zip(pendings, latencies)]
+
+    def _select_affinity(self, candidates: Sequence, key: str):
+        ranked = sorted(candidates, key=lambda c: _rendezvous_weight(key, c.agent_id), reverse=True)
+
+        pendings = {c.agent_id: self.pending(c.agent_id) for c in candidates}
+        average = (sum(pendings.values()) + 1) / len(candidates)
+        capacity = math.ceil(average * (1 + self.affinity_slack))
+        for candidate in ranked:
+            if pendings[candidate.agent_id] + 1 <= capacity:
+                return candidate
+        return ranked[0]
+
+
+def _rendezvous_weight(key: str, agent_id: str) -> bytes:
+    return hashlib.md5(f"{key}/{agent_id}".encode()).digest()
@@ -5,21 +5,30 @@ Handles message creation, encryption, decryption, and routing between agents.
 Supports end-to-end encryption and message integrity verification.
 """
 
+import os
 import json
 import uuid
-import time
-import hashlib
-from datetime import datetime
-from typing import Dict, Optional, Any, List, Union
-from dataclasses import dataclass, asdict
+import logging
+import heapq
+import base64
+import struct
+import asyncio
+from collections import deque, OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Any, List, Union, Tuple, Deque, Set, AsyncIterator, Iterable
+from dataclasses import dataclass, asdict, field
 from cryptography.hazmat.primitives import hashes, hmac
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
 
 from .identity import AgentIdentity
 from .auth import AuthToken
+from .sessions import KeyExchange, Session, SessionCache, SessionConfig
+from .verification import SignatureVerificationPool
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -45,10 +54,18 @@ class Message:
             self.timestamp = datetime.fromisoformat(self.timestamp) if isinstance(self.timestamp, str) else datetime.utcnow()
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert message to dictionary for serialization."""
-        data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
-        return data
+        """Convert message to dictionary for serialization (payload is not copied)."""
+        return {
+            "message_id": self.message_id,
+            "sender_id": self.sender_id,
+            "receiver_id": self.receiver_id,
+            "message_type": self.message_type,
+            "payload": self.payload,
+            "timestamp": self.timestamp.isoformat(),
+            "correlation_id": self.correlation_id,
+            "ttl": self.ttl,
+            "metadata": self.metadata,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Message':
@@ -78,79 +95,139 @@ class Message:
         )
 
 
+GCM_NONCE_SIZE = 12  # 96-bit nonce
+GCM_TAG_SIZE = 16
+FRAME_MAGIC = b"A2AE"
+FRAME_VERSION = 1
+# magic, version, sender length, receiver length, metadata length, timestamp
+FRAME_HEADER = struct.Struct(">4sBHHId")
+
+
 @dataclass
 class EncryptedMessage:
-    """Represents an encrypted A2A message."""
+    """
+    Represents an encrypted A2A message.
 
-    encrypted_data: str  # Base64 encoded encrypted data
-    iv: str  # Base64 encoded initialization vector
-    auth_tag: str  # Base64 encoded authentication tag
+    Nonce and ciphertext are kept as raw bytes. They are base64 encoded only
+    by to_dict() for JSON transports; to_frame() produces a binary frame.
+    """
+
+    ciphertext: bytes  # AES-GCM ciphertext with the authentication tag appended
+    nonce: bytes
     sender_id: str
     receiver_id: str
     timestamp: datetime
     algorithm: str = "AES-256-GCM"
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def auth_tag(self) -> bytes:
+        """The GCM authentication tag."""
+        return bytes(self.ciphertext[-GCM_TAG_SIZE:])
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert encrypted message to dictionary."""
-        data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
-        return data
+        """Convert encrypted message to dictionary (base64 fields) for JSON transports."""
+        return {
+            "encrypted_data": base64.b64encode(self.ciphertext[:-GCM_TAG_SIZE]).decode('ascii'),
+            "iv": base64.b64encode(self.nonce).decode('ascii'),
+            "auth_tag": base64.b64encode(self.auth_tag).decode('ascii'),
+            "sender_id": self.sender_id,
+            "receiver_id": self.receiver_id,
+            "timestamp": self.timestamp.isoformat(),
+            "algorithm": self.algorithm,
+            "metadata": self.metadata,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'EncryptedMessage':
         """Create encrypted message from dictionary."""
-        if 'timestamp' in data:
-            data['timestamp'] = datetime.fromisoformat(data['timestamp'])
-        return cls(**data)
-
-
-class MessageEncryptor:
-    """Handles encryption and decryption of messages."""
-
-    def __init__(self, key_size: int = 32):  # 256-bit key
-        self.key_size = key_size
-
-    def generate_session_key(self, agent_a: str, agent_b: str,
-                           shared_secret: str = None) -> bytes:
-        """Generate a session key for two agents."""
-
-        if shared_secret:
-            key_material = f"{agent_a}:{agent_b}:{shared_secret}:{int(time.time())}"
-        else:
-            # Use a combination of agent IDs and timestamp as key material
-            key_material = f"{agent_a}:{agent_b}:{int(time.time())}"
+        return cls(
+            ciphertext=base64.b64decode(data['encrypted_data']) + base64.b64decode(data['auth_tag']),
+            nonce=base64.b64decode(data['iv']),
+            sender_id=data['sender_id'],
+            receiver_id=data['receiver_id'],
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            algorithm=data.get('algorithm', "AES-256-GCM"),
+            metadata=data.get('metadata') or {},
+        )
 
-        # Derive key using HKDF-like construction
-        key = hashlib.sha256(key_material.encode()).digest()
-        return key[:self.key_size]
+    def to_frame(self) -> bytes:
+        """Serialize to a binary frame for transports that carry raw bytes."""
 
-    def encrypt_message(self, message: Message, session_key: bytes,
-                       sender_identity: AgentIdentity) -> EncryptedMessage:
-        """Encrypt a message using AES-GCM."""
+        sender = self.sender_id.encode('utf-8')
+        receiver = self.receiver_id.encode('utf-8')
+        metadata = json.dumps(self.metadata, separators=(',', ':')).encode('utf-8') if self.metadata else b""
 
-        import os
-        import base64
+        # Timestamps are naive UTC; .timestamp() alone would read them as local time
+        timestamp = self.timestamp.replace(tzinfo=timezone.utc).timestamp()
+        header = FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, len(sender), len(receiver),
+                                   len(metadata), timestamp)
+        return b"".join((header, sender, receiver, metadata, self.nonce, self.ciphertext))
 
-        # Serialize message
-        message_data = json.dumps(message.to_dict(), sort_keys=True).encode('utf-8')
+    @classmethod
+    def from_frame(cls, frame: bytes) -> 'EncryptedMessage':
+        """Parse a binary frame; the ciphertext is a view into the frame."""
+
+        view = memoryview(frame)
+        magic, version, sender_len, receiver_len, metadata_len, timestamp = \
+            FRAME_HEADER.unpack_from(view)
+        if magic != FRAME_MAGIC or version != FRAME_VERSION:
+            raise ValueError("Not an A2A encrypted frame")
+
+        position = FRAME_HEADER.size
+        sender_id = str(view[position:position + sender_len], 'utf-8')
+        position += sender_len
+        receiver_id = str(view[position:position + receiver_len], 'utf-8')
+        position += receiver_len
+        metadata = json.loads(bytes(view[position:position + metadata_len])) if metadata_len else {}
+        position += metadata_len
+        nonce = bytes(view[position:position + GCM_NONCE_SIZE])
+        position += GCM_NONCE_SIZE
+
+        return cls(
+            ciphertext=view[position:],
+            nonce=nonce,
+            sender_id=sender_id,
+            receiver_id=receiver_id,
+            timestamp=datetime.utcfromtimestamp(timestamp),
+            metadata=metadata,
+        )
 
-        # Generate IV
-        iv = os.urandom(12)  # 96-bit IV for GCM
 
-        # Create cipher
-        cipher = Cipher(algorithms.AES(session_key), modes.GCM(iv), backend=default_backend())
-        encryptor = cipher.encryptor()
+class MessageEncryptor:
+    """Handles encryption and decryption of messages."""
 
-        # Encrypt the message
-        ciphertext = encryptor.update(message_data) + encryptor.finalize()
+    def __init__(self, key_size: int = 32, max_cached_ciphers: int = 1024):  # 256-bit key
+        self.key_size = key_size
+        self.max_cached_ciphers = max_cached_ciphers
+        self._ciphers: "OrderedDict[bytes, AESGCM]" = OrderedDict()
 
-        # Get authentication tag
-        auth_tag = encryptor.tag
+    def encrypt_message(self, message: Message, session_key: bytes,
+                       sender_identity: AgentIdentity = None) -> EncryptedMessage:
+        """
+        Encrypt a message using AES-GCM with a cached cipher for the session key.
+
+        The ciphertext gets a buffer of its own per message rather than a
+        reused per-encryptor one: the returned EncryptedMessage keeps it
+        while it is queued or sent, and copying it out of a shared buffer
+        would cost the same allocation.
+        """
+
+        plaintext = json.dumps(message.to_dict(), separators=(',', ':')).encode('utf-8')
+        nonce = os.urandom(GCM_NONCE_SIZE)
+        aad = self._associated_data(message.sender_id, message.receiver_id)
+
+        cipher = self._cipher(session_key)
+        if hasattr(cipher, "encrypt_into"):
+            # Write ciphertext and tag straight into a preallocated buffer
+            ciphertext = bytearray(len(plaintext) + GCM_TAG_SIZE)
+            cipher.encrypt_into(nonce, plaintext, aad, ciphertext)
+        else:
+            ciphertext = cipher.encrypt(nonce, plaintext, aad)
 
         return EncryptedMessage(
-            encrypted_data=base64.b64encode(ciphertext).decode('utf-8'),
-            iv=base64.b64encode(iv).decode('utf-8'),
-            auth_tag=base64.b64encode(auth_tag).decode('utf-8'),
+            ciphertext=ciphertext,
+            nonce=nonce,
             sender_id=message.sender_id,
             receiver_id=message.receiver_id,
             timestamp=datetime.utcnow()
@@ -160,33 +237,103 @@ class MessageEncryptor:
                        session_key: bytes) -> Optional[Message]:
         """Decrypt an encrypted message."""
 
-        import base64
-
         try:
-            # Decode encrypted data
-            ciphertext = base64.b64decode(encrypted_message.encrypted_data)
-            iv = base64.b64decode(encrypted_message.iv)
-            auth_tag = base64.b64decode(encrypted_message.auth_tag)
-
-            # Create cipher
-            cipher = Cipher(algorithms.AES(session_key), modes.GCM(iv, auth_tag),
-                          backend=default_backend())
-            decryptor = cipher.decryptor()
-
-            # Decrypt the message
-            plaintext = decryptor.update(ciphertext) + decryptor.finalize()
+            aad = self._associated_data(encrypted_message.sender_id, encrypted_message.receiver_id)
+            plaintext = self._cipher(session_key).decrypt(
+                encrypted_message.nonce, encrypted_message.ciphertext, aad
+            )
 
             # Deserialize message
-            message_data = json.loads(plaintext.decode('utf-8'))
+            message_data = json.loads(plaintext)
             return Message.from_dict(message_data)
 
         except Exception as e:
-            print(f"Decryption failed: {e}")
+            logger.warning(f"Decryption failed: {e}")
             return None
 
+    def _cipher(self, session_key: bytes) -> AESGCM:
+        """Get the AESGCM context for a key, keeping the most recent ones cached."""
+
+        cipher = self._ciphers.get(session_key)
+        if cipher is not None:
+            self._ciphers.move_to_end(session_key)
+            return cipher
+
+        cipher = AESGCM(session_key)
+        self._ciphers[session_key] = cipher
+        if len(self._ciphers) > self.max_cached_ciphers:
+            self._ciphers.popitem(last=False)
+        return cipher
+
+    def forget_key(self, session_key: bytes):
+        """Drop the cached cipher for a retired session key."""
+        self._ciphers.pop(session_key, None)
+
+    @staticmethod
+    def _associated_data(sender_id: str, receiver_id: str) -> bytes:
+        """Bind the ciphertext to its sender and receiver."""
+        return f"{sender_id}\x00{receiver_id}".encode('utf-8')
+
+
+SIGNATURE_METADATA_KEYS = ("signature", "mac")
+
+
+def _signing_bytes(message: Message) -> bytes:
+    """Canonical bytes a message is signed or MACed over (excluding the signature itself)."""
+
+    data = message.to_dict()
+    if any(key in message.metadata for key in SIGNATURE_METADATA_KEYS):
+        data["metadata"] = {key: value for key, value in message.metadata.items()
+                            if key not in SIGNATURE_METADATA_KEYS}
+    return json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+@dataclass
+class SessionHandshake:
+    """
+    One half of a session handshake: the signer's ephemeral X25519 public key,
+    signed once with its RSA identity key. The initiator sends an "offer",
+    the responder replies with an "answer".
+    """
+
+    session_id: str
+    initiator_id: str
+    responder_id: str
+    public_key: str  # Hex-encoded X25519 public key
+    timestamp: datetime
+    role: str = "offer"  # "offer" or "answer"
+    signature: str = ""
+
+    @property
+    def signer_id(self) -> str:
+        return self.initiator_id if self.role == "offer" else self.responder_id
+
+    def signing_bytes(self) -> bytes:
+        return "|".join((
+            self.session_id, self.initiator_id, self.responder_id, self.role,
+            self.public_key, self.timestamp.isoformat()
+        )).encode('utf-8')
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['timestamp'] = self.timestamp.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SessionHandshake':
+        data = dict(data)
+        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+        return cls(**data)
+
 
 class MessageSigner:
-    """Handles message signing and verification."""
+    """
+    Handles message signing and verification.
+
+    RSA signatures are used per message only when asked for; otherwise RSA
+    signs the session handshake once and each message carries an
+    HMAC-SHA256 under the session's MAC key.
+    """
 
     def __init__(self, identity_manager):
         self.identity_manager = identity_manager
@@ -194,15 +341,51 @@ class MessageSigner:
     def sign_message(self, message: Message, agent_id: str) -> str:
         """Sign a message with the agent's private key."""
 
-        message_data = json.dumps(message.to_dict(), sort_keys=True).encode('utf-8')
-        return self.identity_manager.sign_data(agent_id, message_data)
+        return self.identity_manager.sign_data(agent_id, _signing_bytes(message))
 
     def verify_message_signature(self, message: Message, signature: str,
                                agent_id: str) -> bool:
         """Verify a message signature."""
 
-        message_data = json.dumps(message.to_dict(), sort_keys=True).encode('utf-8')
-        return self.identity_manager.verify_signature(agent_id, message_data, signature)
+        return self.identity_manager.verify_signature(agent_id, _signing_bytes(message), signature)
+
+    def sign_handshake(self, handshake: SessionHandshake) -> bool:
+        """Sign a session handshake with its signer's private key."""
+
+        signature = self.identity_manager.sign_data(handshake.signer_id, handshake.signing_bytes())
+        if not signature:
+            return False
+
+        handshake.signature = signature
+        return True
+
+    def verify_handshake(self, handshake: SessionHandshake) -> bool:
+        """Verify a handshake's signature against its signer's identity."""
+
+        if not handshake.signature:
+            return False
+
+        return self.identity_manager.verify_signature(
+            handshake.signer_id, handshake.signing_bytes(), handshake.signature
+        )
+
+    def mac_message(self, message: Message, mac_key: bytes) -> str:
+        """Authenticate a message with HMAC-SHA256 under a session MAC key."""
+
+        mac = hmac.HMAC(mac_key, hashes.SHA256(), backend=default_backend())
+        mac.update(_signing_bytes(message))
+        return mac.finalize().hex()
+
+    def verify_message_mac(self, message: Message, tag: str, mac_key: bytes) -> bool:
+        """Verify a message's HMAC in constant time."""
+
+        try:
+            mac = hmac.HMAC(mac_key, hashes.SHA256(), backend=default_backend())
+            mac.update(_signing_bytes(message))
+            mac.verify(bytes.fromhex(tag))
+            return True
+        except Exception:
+            return False
 
 
 class MessageRouter:
@@ -245,89 +428,541 @@ class MessageRouter:
         self.pending_responses.pop(message_id, None)
 
 
+class _QueueEntry:
+    """A queued message plus a tombstone flag used for lazy removal."""
+
+    __slots__ = ("message", "removed")
+
+    def __init__(self, message: Message):
+        self.message = message
+        self.removed = False
+
+
 class MessageQueue:
-    """In-memory message queue for agent communication."""
+    """
+    In-memory message queue for agent communication.
+
+    Messages are indexed three ways: a global FIFO for dequeue/peek, a deque
+    per receiver for get_messages_for_agent, and a min-heap on expiry time
+    for clear_expired. Removing a message through one index marks its entry
+    as a tombstone that the other indexes skip or compact away lazily, so
+    every operation is amortized O(1) (O(log n) for messages with a TTL).
+    """
+
+    durable = False  # Whether messages survive a restart until acknowledged
 
     def __init__(self, max_size: int = 1000):
-        self.queue: List[Message] = []
         self.max_size = max_size
-        self.lock = None  # Would use asyncio.Lock in async context
+        self.verified: Set[str] = set()  # IDs of queued messages authenticated before they were queued
+        self._fifo: Deque[_QueueEntry] = deque()
+        self._by_receiver: Dict[str, Deque[_QueueEntry]] = {}
+        self._receiver_sizes: Dict[str, int] = {}
+        self._expiry: List[Tuple[datetime, int, _QueueEntry]] = []
+        self._expiring = 0  # Live entries with a TTL
+        self._sequence = 0  # Tie-breaker for equal expiry times
+        self._size = 0
+        self.rejected = 0  # Messages refused because the queue was full
+
+    @property
+    def queue(self) -> List[Message]:
+        """Snapshot of queued messages in FIFO order."""
+        return [entry.message for entry in self._fifo if not entry.removed]
 
     def enqueue(self, message: Message) -> bool:
         """Add a message to the queue."""
 
-        if len(self.queue) >= self.max_size:
+        if self._size >= self.max_size:
+            self.rejected += 1
             return False
 
-        self.queue.append(message)
+        entry = _QueueEntry(message)
+        self._fifo.append(entry)
+
+        receiver = message.receiver_id
+        receiver_queue = self._by_receiver.get(receiver)
+        if receiver_queue is None:
+            receiver_queue = self._by_receiver[receiver] = deque()
+            self._receiver_sizes[receiver] = 0
+        receiver_queue.append(entry)
+        self._receiver_sizes[receiver] += 1
+
+        if message.ttl:
+            expires_at = message.timestamp + timedelta(seconds=message.ttl)
+            self._sequence += 1
+            heapq.heappush(self._expiry, (expires_at, self._sequence, entry))
+            self._expiring += 1
+
+        self._size += 1
         return True
 
     def dequeue(self) -> Optional[Message]:
         """Remove and return the next message from the queue."""
 
-        if not self.queue:
+        entry = self._head()
+        if entry is None:
             return None
 
-        return self.queue.pop(0)
+        self._fifo.popleft()
+        self._remove(entry)
+
+        # The dequeued entry is the oldest live one for its receiver too
+        receiver = entry.message.receiver_id
+        receiver_queue = self._by_receiver.get(receiver)
+        while receiver_queue and receiver_queue[0].removed:
+            receiver_queue.popleft()
+        if receiver_queue is not None and not receiver_queue:
+            self._drop_receiver(receiver)
+
+        # Expired or dequeued, the heap head is dead either way; drop it now
+        while self._expiry and self._expiry[0][2].removed:
+            heapq.heappop(self._expiry)
+        self._compact()
+
+        return entry.message
 
     def peek(self) -> Optional[Message]:
         """Return the next message without removing it."""
 
-        if not self.queue:
-            return None
-
-        return self.queue[0]
+        entry = self._head()
+        return entry.message if entry else None
 
     def size(self) -> int:
         """Get the current queue size."""
-        return len(self.queue)
+        return self._size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and rejection counters."""
 
-    def clear_expired(self):
-        """Remove expired messages from the queue."""
+        return {
+            "size": self._size,
+            "max_size": self.max_size,
+            "rejected": self.rejected,
+        }
 
-        current_time = datetime.utcnow()
-        self.queue = [
-            msg for msg in self.queue
-            if not msg.is_expired()
-        ]
+    def clear_expired(self) -> List[Message]:
+        """Remove expired messages from the queue and return them."""
+
+        now = datetime.utcnow()
+        expired = []
+        touched = set()
+        while self._expiry and self._expiry[0][0] < now:
+            _, _, entry = heapq.heappop(self._expiry)
+            if not entry.removed:
+                self._remove(entry)
+                expired.append(entry.message)
+                touched.add(entry.message.receiver_id)
+
+        self._compact(touched)
+        return expired
 
     def get_messages_for_agent(self, agent_id: str) -> List[Message]:
         """Get all messages addressed to a specific agent."""
 
-        messages = [msg for msg in self.queue if msg.receiver_id == agent_id]
-        # Remove from queue
-        self.queue = [msg for msg in self.queue if msg.receiver_id != agent_id]
+        receiver_queue = self._by_receiver.get(agent_id)
+        if not receiver_queue:
+            return []
+
+        messages = []
+        for entry in receiver_queue:
+            if not entry.removed:
+                self._remove(entry)
+                messages.append(entry.message)
+
+        self._drop_receiver(agent_id)
+        self._compact()
         return messages
 
+    def ack(self, message: Message) -> bool:
+        """Acknowledge a delivered message. In-memory messages need no acknowledgement."""
+        return True
+
+    def record_delivered(self, message: Message, verified: bool = True) -> bool:
+        """Record a message handed straight to its consumer. In-memory queues keep nothing."""
+        return True
+
+    def commit(self, agent_id: str):
+        """Acknowledge every message delivered to an agent so far."""
+        pass
+
+    def _head(self) -> Optional[_QueueEntry]:
+        """Skip tombstones at the front of the FIFO and return the head."""
+
+        while self._fifo and self._fifo[0].removed:
+            self._fifo.popleft()
+        return self._fifo[0] if self._fifo else None
+
+    def _remove(self, entry: _QueueEntry):
+        """Tombstone an entry and update the live counters."""
+
+        entry.removed = True
+        self._size -= 1
+
+        receiver = entry.message.receiver_id
+        if receiver in self._receiver_sizes:
+            self._receiver_sizes[receiver] -= 1
+        if entry.message.ttl:
+            self._expiring -= 1
+
+    def _drop_receiver(self, receiver: str):
+        """Forget a receiver's index once it holds no live entries."""
+
+        self._by_receiver.pop(receiver, None)
+        self._receiver_sizes.pop(receiver, None)
+
+    def _compact(self, receivers: Set[str] = ()):
+        """Rebuild indexes whose tombstones outnumber their live entries."""
+
+        if len(self._fifo) > 2 * self._size + 64:
+            self._fifo = deque(entry for entry in self._fifo if not entry.removed)
+
+        if len(self._expiry) > 2 * self._expiring + 64:
+            self._expiry = [item for item in self._expiry if not item[2].removed]
+            heapq.heapify(self._expiry)
+
+        for receiver in receivers:
+            receiver_queue = self._by_receiver.get(receiver)
+            if receiver_queue is None:
+                continue
+            live = self._receiver_sizes[receiver]
+            if not live:
+                self._drop_receiver(receiver)
+            elif len(receiver_queue) > 2 * live + 64:
+                self._by_receiver[receiver] = deque(
+                    entry for entry in receiver_queue if not entry.removed
+                )
+
+
+class MessageInbox:
+    """
+    Event-driven inbox with one queue per (receiver, message_type).
+
+    Waiters are woken exactly when a matching message is delivered instead
+    of polling. Waiting with message_type=None accepts any message type.
+    Once a receiver is closed its reads return None and deliveries to it
+    are refused until it is reopened.
+    """
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size  # Per (receiver, message_type) queue
+        self._queues: Dict[Tuple[str, str], Deque[Message]] = {}
+        self._types: Dict[str, Set[str]] = {}  # receiver -> message types with queued messages
+        self._waiters: Dict[Tuple[str, Optional[str]], Deque[asyncio.Future]] = {}
+        self._closed: Set[str] = set()
+
+    def deliver(self, message: Message) -> bool:
+        """Hand a message to a waiting consumer or queue it; False if it was dropped."""
+
+        receiver = message.receiver_id
+        if receiver in self._closed:
+            return False
+
+        # Waiters for this exact type take precedence over catch-all waiters
+        for key in ((receiver, message.message_type), (receiver, None)):
+            waiters = self._waiters.get(key)
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(message)
+                    return True
+
+        key = (receiver, message.message_type)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+        if len(queue) >= self.max_size:
+            return False
+
+        queue.append(message)
+        self._types.setdefault(receiver, set()).add(message.message_type)
+        return True
+
+    def get_nowait(self, receiver: str, message_type: str = None) -> Optional[Message]:
+        """Return a queued message without waiting, or None."""
+
+        if receiver in self._closed:
+            return None
+        if message_type is not None:
+            return self._pop((receiver, message_type))
+
+        # Any type: take the oldest head across this receiver's queues
+        oldest = None
+        for queued_type in self._types.get(receiver, ()):
+            head = self._queues[(receiver, queued_type)][0]
+            if oldest is None or head.timestamp < oldest.timestamp:
+                oldest = head
+
+        if oldest is None:
+            return None
+        return self._pop((receiver, oldest.message_type))
+
+    async def get(self, receiver: str, message_type: str = None,
+                  timeout: float = None) -> Optional[Message]:
+        """Wait for the next matching message; None on timeout or close."""
+
+        message = self.get_nowait(receiver, message_type)
+        if message or receiver in self._closed:
+            return message
+
+        waiter = asyncio.get_running_loop().create_future()
+        key = (receiver, message_type)
+        self._waiters.setdefault(key, deque()).append(waiter)
+
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters is not None:
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[key]
+
+    async def iterate(self, receiver: str, message_type: str = None) -> AsyncIterator[Message]:
+        """Yield matching messages as they arrive until the inbox is closed."""
+
+        while True:
+            message = await self.get(receiver, message_type)
+            if message is None:
+                return
+            yield message
+
+    def close(self, receiver: str):
+        """
+        Close a receiver: every waiter and later read gets None, and queued
+        and later messages for it are dropped.
+        """
+
+        self._closed.add(receiver)
+        for key in [key for key in self._waiters if key[0] == receiver]:
+            for waiter in self._waiters.pop(key):
+                if not waiter.done():
+                    waiter.set_result(None)
+
+        for message_type in self._types.pop(receiver, ()):
+            self._queues.pop((receiver, message_type), None)
+
+    def reopen(self, receiver: str):
+        """Accept messages for a closed receiver again."""
+        self._closed.discard(receiver)
+
+    def size(self, receiver: str = None) -> int:
+        """Number of queued messages, optionally for one receiver."""
+
+        if receiver is None:
+            return sum(len(queue) for queue in self._queues.values())
+        return sum(len(self._queues[(receiver, t)]) for t in self._types.get(receiver, ()))
+
+    def _pop(self, key: Tuple[str, str]) -> Optional[Message]:
+        """Pop the head of a queue and drop bookkeeping for emptied queues."""
+
+        queue = self._queues.get(key)
+        if not queue:
+            return None
+
+        message = queue.popleft()
+        if not queue:
+            del self._queues[key]
+            receiver, message_type = key
+            types = self._types.get(receiver)
+            if types is not None:
+                types.discard(message_type)
+                if not types:
+                    del self._types[receiver]
+        return message
+
 
 class MessagingService:
-    """Central messaging service for A2A communication."""
+    """
+    Central messaging service for A2A communication.
+
+    With signing_mode "session" (the default) RSA is used once per session to
+    sign its handshake; messages are then authenticated by an HMAC or, when
+    encrypted, by the AEAD tag. Message types in rsa_message_types, or every
+    type with signing_mode "rsa", still get a per-message RSA signature.
+    """
+
+    def __init__(self, identity_manager, auth_manager, queue: MessageQueue = None,
+                 signing_mode: str = "session", rsa_message_types: Iterable[str] = (),
+                 session_config: SessionConfig = None, verify_workers: int = None):
+        if signing_mode not in ("session", "rsa"):
+            raise ValueError(f"Unknown signing mode: {signing_mode}")
 
-    def __init__(self, identity_manager, auth_manager):
         self.identity_manager = identity_manager
         self.auth_manager = auth_manager
         self.encryptor = MessageEncryptor()
         self.signer = MessageSigner(identity_manager)
         self.router = MessageRouter()
-        self.queue = MessageQueue()
+        self.queue = queue or MessageQueue()
+        self.inbox = MessageInbox()
+        self._unacked: Dict[str, Message] = {}  # delivered message ID -> its queue record, until acked
+        self.signing_mode = signing_mode
+        self.rsa_message_types = set(rsa_message_types)
+
+        # Sessions for agent pairs, keyed "sender:receiver"
+        self.session_config = session_config or SessionConfig()
+        self.sessions = SessionCache(self.session_config.max_sessions)
+        self._pending_exchanges: Dict[str, KeyExchange] = {}
+        self._seen_offers: Dict[str, Dict[str, datetime]] = {}  # initiator -> offer key -> timestamp
+        self.rotations = 0
+
+        # RSA signatures are verified off the event loop by the async receive paths
+        self.verifier = SignatureVerificationPool(self._verify_rsa_signature, max_workers=verify_workers)
+
+    def offer_session(self, initiator_id: str, responder_id: str) -> SessionHandshake:
+        """Start a session: returns the signed offer to send to the responder."""
+
+        session_id = f"{initiator_id}:{responder_id}"
+        exchange = KeyExchange()
+
+        offer = SessionHandshake(
+            session_id=session_id,
+            initiator_id=initiator_id,
+            responder_id=responder_id,
+            public_key=exchange.public_key,
+            timestamp=datetime.utcnow()
+        )
+        if not self.signer.sign_handshake(offer):
+            logger.warning(f"Could not sign handshake for session {session_id}")
+
+        self._pending_exchanges[session_id] = exchange
+        return offer
+
+    def accept_session(self, offer: SessionHandshake) -> Optional[SessionHandshake]:
+        """Responder side: verify an offer, install the session and return the signed answer."""
 
-        # Session keys for agent pairs
-        self.session_keys: Dict[str, bytes] = {}
+        if (offer.role != "offer"
+                or offer.session_id != f"{offer.initiator_id}:{offer.responder_id}"
+                or not self._offer_is_fresh(offer)
+                or not self.signer.verify_handshake(offer)):
+            logger.warning(f"Rejected session offer {offer.session_id}")
+            return None
 
-    def create_session(self, agent_a: str, agent_b: str) -> str:
-        """Create an encrypted session between two agents."""
+        # The ephemeral key is the offer's nonce: a replayed offer must not replace the session
+        seen = self._seen_offers.setdefault(offer.initiator_id, {})
+        if offer.public_key in seen:
+            logger.warning(f"Rejected replayed session offer {offer.session_id}")
+            return None
+        seen[offer.public_key] = offer.timestamp
+
+        exchange = KeyExchange()
+        answer = SessionHandshake(
+            session_id=offer.session_id,
+            initiator_id=offer.initiator_id,
+            responder_id=offer.responder_id,
+            public_key=exchange.public_key,
+            timestamp=datetime.utcnow(),
+            role="answer"
+        )
+        if not self.signer.sign_handshake(answer):
+            logger.warning(f"Could not sign handshake for session {offer.session_id}")
 
-        session_key = self.encryptor.generate_session_key(agent_a, agent_b)
-        session_id = f"{agent_a}:{agent_b}"
+        root_key = exchange.derive_root_key(
+            offer.public_key, offer.session_id, offer.public_key, answer.public_key
+        )
+        self._install_session(Session(
+            offer.session_id, offer.initiator_id, offer.responder_id, root_key,
+            verified=True, retained_epochs=self.session_config.retained_epochs
+        ))
+        return answer
+
+    def complete_session(self, answer: SessionHandshake) -> bool:
+        """Initiator side: verify the responder's answer and install the session."""
+
+        # The pending exchange is keyed by the responder it was offered to, so an
+        # answer signed by anyone else does not match it
+        exchange = self._pending_exchanges.get(answer.session_id)
+        if (exchange is None or answer.role != "answer"
+                or answer.session_id != f"{answer.initiator_id}:{answer.responder_id}"
+                or not self.signer.verify_handshake(answer)):
+            logger.warning(f"Rejected session answer {answer.session_id}")
+            return False
+        del self._pending_exchanges[answer.session_id]
 
-        self.session_keys[session_id] = session_key
-        return session_id
+        root_key = exchange.derive_root_key(
+            answer.public_key, answer.session_id, exchange.public_key, answer.public_key
+        )
+        self._install_session(Session(
+            answer.session_id, answer.initiator_id, answer.responder_id, root_key,
+            verified=True, retained_epochs=self.session_config.retained_epochs
+        ))
+        return True
+
+    def abandon_session(self, initiator_id: str, responder_id: str):
+        """Forget a handshake that was offered but never answered."""
+        self._pending_exchanges.pop(f"{initiator_id}:{responder_id}", None)
+
+    def create_session(self, agent_a: str, agent_b: str) -> Optional[str]:
+        """Create a session between two agents that are both served by this service."""
+
+        offer = self.offer_session(agent_a, agent_b)
+        self._pending_exchanges.pop(offer.session_id, None)
+
+        if not self.accept_session(offer):
+            return None
+        return offer.session_id
 
     def get_session_key(self, agent_a: str, agent_b: str) -> Optional[bytes]:
-        """Get the session key for two agents."""
+        """Get the current session key for two agents."""
+
+        session = self.sessions.get(f"{agent_a}:{agent_b}")
+        return session.key if session else None
 
-        session_id = f"{agent_a}:{agent_b}"
-        return self.session_keys.get(session_id)
+    def encrypt_for_session(self, message: Message) -> Optional[EncryptedMessage]:
+        """Encrypt a message under its sender's session with the receiver, rotating keys as due."""
+
+        session = self._sending_session(message.sender_id, message.receiver_id)
+        if session is None:
+            return None
+
+        encrypted_message = self.encryptor.encrypt_message(message, session.key)
+        encrypted_message.metadata = {"session_id": session.session_id, "epoch": session.epoch}
+        session.record(len(encrypted_message.ciphertext))
+        return encrypted_message
+
+    def decrypt_from_session(self, encrypted_message: EncryptedMessage,
+                             check_signature: bool = True) -> Optional[Message]:
+        """
+        Decrypt a message received on a session. An RSA signature it carries is
+        copied to the message's metadata and, unless check_signature is False
+        (the caller verifies it, e.g. on the verification pool), checked.
+        """
+
+        session_id = encrypted_message.metadata.get("session_id")
+        keys = self._receiving_keys(
+            session_id, encrypted_message.sender_id, encrypted_message.metadata.get("epoch", 0)
+        )
+        if keys is None:
+            return None
+
+        message = self.encryptor.decrypt_message(encrypted_message, keys.key)
+        authentic = message is not None and message.sender_id == encrypted_message.sender_id
+        self._keys_checked(session_id, keys, authentic)
+        if not authentic:
+            return None
+
+        signature = encrypted_message.metadata.get("signature")
+        if signature:
+            message.metadata["signature"] = signature
+            if check_signature and not self._verify_rsa_signature(message):
+                return None
+        elif self.requires_rsa_signature(message.message_type):
+            return None
+
+        return message
+
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Session cache statistics."""
+
+        stats = self.sessions.get_stats()
+        stats["rotations"] = self.rotations
+        stats["pending_handshakes"] = len(self._pending_exchanges)
+        return stats
+
+    def requires_rsa_signature(self, message_type: str) -> bool:
+        """Check whether a message type is signed with RSA per message."""
+        return self.signing_mode == "rsa" or message_type in self.rsa_message_types
 
     def send_message(self, message: Message, auth_token: AuthToken,
                     encrypt: bool = True) -> bool:
@@ -340,54 +975,140 @@ class MessagingService:
         if not is_valid or agent_id != message.sender_id:
             return False
 
-        # Sign the message
-        signature = self.signer.sign_message(message, message.sender_id)
+        rsa_signed = self.requires_rsa_signature(message.message_type)
+        session = None
+        if encrypt or not rsa_signed:
+            session = self._ensure_session(message.sender_id, message.receiver_id)
+            if session is None:
+                return False
 
         if encrypt:
-            # Get or create session key
-            session_key = self.get_session_key(message.sender_id, message.receiver_id)
-            if not session_key:
-                # Create session if it doesn't exist
-                self.create_session(message.sender_id, message.receiver_id)
-                session_key = self.get_session_key(message.sender_id, message.receiver_id)
-
-            # Encrypt message
-            sender_identity = self.identity_manager.get_identity(message.sender_id)
-            encrypted_message = self.encryptor.encrypt_message(message, session_key, sender_identity)
+            # Encrypt message; the AEAD tag authenticates it within the session
+            encrypted_message = self.encrypt_for_session(message)
 
-            # Add signature to metadata
-            encrypted_message.metadata = {"signature": signature}
+            if rsa_signed:
+                encrypted_message.metadata["signature"] = self.signer.sign_message(
+                    message, message.sender_id
+                )
 
             # Queue encrypted message (would normally send over network)
             return self._queue_encrypted_message(encrypted_message)
-        else:
+
+        if rsa_signed:
             # Queue plain message with signature
-            message.metadata["signature"] = signature
-            return self.queue.enqueue(message)
+            message.metadata["signature"] = self.signer.sign_message(message, message.sender_id)
+        else:
+            self.mac_for_session(message)
+
+        return self.queue.enqueue(message)
+
+    def mac_for_session(self, message: Message) -> bool:
+        """MAC a message under its sender's session with the receiver; False if there is none."""
+
+        session = self._sending_session(message.sender_id, message.receiver_id)
+        if session is None:
+            return False
+
+        message.metadata["session_id"] = session.session_id
+        message.metadata["epoch"] = session.epoch
+        message.metadata["mac"] = self.signer.mac_message(message, session.current.mac_key)
+        session.record(0)
+        return True
 
     def receive_message(self, agent_id: str, auth_token: AuthToken) -> List[Message]:
         """Receive messages for an agent."""
 
-        # Validate authentication
-        is_valid, authenticated_agent = self.auth_manager.validate_authentication(
-            auth_token.token, ["a2a:messaging"]
-        )
-        if not is_valid or authenticated_agent != agent_id:
-            return []
-
-        # Get messages for this agent
-        messages = self.queue.get_messages_for_agent(agent_id)
+        messages = self._take_messages(agent_id, auth_token)
 
-        # Verify signatures
-        verified_messages = []
+        # Verify signatures, decrypting messages that were queued encrypted
+        results = []
         for message in messages:
-            signature = message.metadata.get("signature")
-            if signature and self.signer.verify_message_signature(message, signature, message.sender_id):
-                verified_messages.append(message)
+            if message.message_id in self.queue.verified:
+                self.queue.verified.discard(message.message_id)
+                results.append(message)
+            elif message.message_type == "encrypted":
+                results.append(self._open_queued_encrypted(message))
             else:
-                print(f"Invalid signature for message {message.message_id}")
+                results.append(message if self.verify_message(message) else None)
+
+        return self._hand_over(messages, results)
+
+    async def receive_message_async(self, agent_id: str, auth_token: AuthToken) -> List[Message]:
+        """Receive messages for an agent, verifying RSA signatures off the event loop."""
+
+        messages = self._take_messages(agent_id, auth_token)
+
+        async def check(message: Message) -> Optional[Message]:
+            if message.message_id in self.queue.verified:
+                self.queue.verified.discard(message.message_id)
+                return message
+            if message.message_type == "encrypted":
+                opened = self._open_queued_encrypted(message, check_signature=False)
+                if opened is None:
+                    return None
+                if "signature" in opened.metadata and not await self.verifier.verify(opened):
+                    return None
+                return opened
+            return message if await self.verify_message_async(message) else None
+
+        # Submissions happen in queue order, so per-sender order is kept
+        results = await asyncio.gather(*(check(message) for message in messages))
+        return self._hand_over(messages, results)
+
+    def deliver_verified(self, message: Message) -> bool:
+        """
+        Hand a message that was authenticated on arrival to its receiver's
+        inbox. It is recorded in the queue first, so a durable queue replays
+        it until the consumer acks it. False if the inbox dropped it.
+        """
+
+        self.queue.record_delivered(message)
+        if self.queue.durable:
+            self._unacked[message.message_id] = message
+        if self.inbox.deliver(message):
+            return True
+
+        self.ack(message)
+        return False
+
+    def ack(self, message: Message) -> bool:
+        """
+        Acknowledge a received message once it has been handled. Until then
+        a durable queue replays it after a restart.
+        """
+
+        queued = self._unacked.pop(message.message_id, None)
+        return queued is not None and self.queue.ack(queued)
+
+    async def verify_message_async(self, message: Message) -> bool:
+        """Like verify_message, but RSA signatures are checked on the verification pool."""
+
+        if message.metadata.get("signature"):
+            return await self.verifier.verify(message)
+        return self.verify_message(message)
+
+    def verify_message(self, message: Message) -> bool:
+        """Verify a received message's session MAC or RSA signature."""
+
+        if message.metadata.get("signature"):
+            return self._verify_rsa_signature(message)
+
+        # Types that opt into RSA must carry a signature
+        if self.requires_rsa_signature(message.message_type):
+            return False
 
-        return verified_messages
+        tag = message.metadata.get("mac")
+        if not tag:
+            return False
+
+        session_id = message.metadata.get("session_id")
+        keys = self._receiving_keys(session_id, message.sender_id, message.metadata.get("epoch", 0))
+        if keys is None:
+            return False
+
+        authentic = self.signer.verify_message_mac(message, tag, keys.mac_key)
+        self._keys_checked(session_id, keys, authentic)
+        return authentic
 
     def send_encrypted_message(self, encrypted_message: EncryptedMessage,
                               auth_token: AuthToken) -> bool:
@@ -427,6 +1148,121 @@ class MessagingService:
 
         return self.queue.enqueue(placeholder)
 
+    def _take_messages(self, agent_id: str, auth_token: AuthToken) -> List[Message]:
+        """Authenticate the receiver and take its queued messages."""
+
+        # Validate authentication
+        is_valid, authenticated_agent = self.auth_manager.validate_authentication(
+            auth_token.token, ["a2a:messaging"]
+        )
+        if not is_valid or authenticated_agent != agent_id:
+            return []
+
+        # They stay unacknowledged in the queue until the consumer calls ack()
+        return self.queue.get_messages_for_agent(agent_id)
+
+    def _hand_over(self, messages: List[Message], results: List[Optional[Message]]) -> List[Message]:
+        """Keep verified messages until their consumer acks them; acknowledge (drop) the rest."""
+
+        verified_messages = []
+        for message, verified in zip(messages, results):
+            if verified:
+                if self.queue.durable:
+                    self._unacked[verified.message_id] = message
+                verified_messages.append(verified)
+            else:
+                self.queue.ack(message)
+                logger.warning(f"Invalid signature for message {message.message_id}")
+
+        return verified_messages
+
+    def _verify_rsa_signature(self, message: Message) -> bool:
+        """Check the RSA signature in a message's metadata (safe to call from worker threads)."""
+
+        signature = message.metadata.get("signature")
+        return bool(signature) and self.signer.verify_message_signature(
+            message, signature, message.sender_id
+        )
+
+    def _open_queued_encrypted(self, placeholder: Message,
+                               check_signature: bool = True) -> Optional[Message]:
+        try:
+            encrypted_message = EncryptedMessage.from_dict(placeholder.payload["encrypted_message"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return self.decrypt_from_session(encrypted_message, check_signature)
+
+    def _ensure_session(self, sender_id: str, receiver_id: str) -> Optional[Session]:
+        """Get or create the session from sender to receiver."""
+
+        session = self._sending_session(sender_id, receiver_id)
+        if session is None and self.create_session(sender_id, receiver_id):
+            session = self.sessions.get(f"{sender_id}:{receiver_id}")
+        return session
+
+    def _sending_session(self, sender_id: str, receiver_id: str) -> Optional[Session]:
+        """Get an established session for sending, rotating its key if it is due."""
+
+        session = self.sessions.get(f"{sender_id}:{receiver_id}")
+        if session is not None and session.due_for_rotation(self.session_config):
+            # The next key is already derived on both sides, so this needs no round trip
+            retired = session.rotate()
+            if retired is not None:
+                self.encryptor.forget_key(retired.key)
+            self.rotations += 1
+        return session
+
+    def _receiving_keys(self, session_id: Optional[str], sender_id: str, epoch: Any):
+        """
+        Keys for a received message's session and epoch, if the session is
+        trusted. The session only ratchets forward to a later epoch once
+        _keys_checked() reports that the message authenticated.
+        """
+
+        session = self.sessions.get(session_id) if session_id else None
+        if (session is None or not session.verified or session.initiator_id != sender_id
+                or not isinstance(epoch, int)):
+            return None
+
+        return session.keys_for(epoch, self.session_config.max_epoch_skip)
+
+    def _keys_checked(self, session_id: str, keys, authentic: bool):
+        """Ratchet forward to keys that authenticated a message; drop trial keys that did not."""
+
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+
+        if authentic:
+            for old in session.advance_to(keys.epoch):
+                self.encryptor.forget_key(old.key)
+        elif not session.holds(keys):
+            self.encryptor.forget_key(keys.key)
+
+    def _offer_is_fresh(self, offer: SessionHandshake) -> bool:
+        """Check an offer's timestamp is within handshake_max_age, forgetting offers too old to replay."""
+
+        now = datetime.utcnow()
+        max_age = timedelta(seconds=self.session_config.handshake_max_age)
+        if offer.timestamp.tzinfo is not None or abs(now - offer.timestamp) > max_age:
+            return False
+
+        seen = self._seen_offers.get(offer.initiator_id)
+        if seen:
+            for public_key, timestamp in list(seen.items()):
+                if now - timestamp > max_age:
+                    del seen[public_key]
+        return True
+
+    def _install_session(self, session: Session):
+        replaced = self.sessions.pop(session.session_id)
+        evicted = self.sessions.put(session)
+
+        for old in (replaced, evicted):
+            if old is not None:
+                for keys in old.all_keys():
+                    self.encryptor.forget_key(keys.key)
+
     def route_message(self, message: Message) -> List[str]:
         """Route a message to appropriate handlers."""
 
@@ -13,7 +13,8 @@ from datetime import datetime
 from enum import Enum
 
 from .agent import A2AAgent
-from .discovery import AgentRecord, ServiceQuery
+from .discovery import AgentView, ServiceQuery
+from .load_balancing import AgentSelector
 from .messaging import Message
 from .transport import TransportConfig
 
@@ -132,8 +133,16 @@ class Workflow:
 class OrchestratorAgent(A2AAgent):
     """Agent that orchestrates multi-agent workflows and task delegation."""
 
-    def __init__(self, agent_id: str, transport_config: TransportConfig = None):
-        """Initialize the orchestrator agent."""
+    def __init__(self, agent_id: str, transport_config: TransportConfig = None,
+                 selection_strategy: str = "power_of_two"):
+        """
+        Initialize the orchestrator agent.
+
+        selection_strategy picks among the agents able to run a task by
+        their reported load: "power_of_two", "least_loaded", "affinity"
+        (keeps a workflow's tasks on one agent unless it is overloaded),
+        or "first" and "random".
+        """
 
         super().__init__(
             agent_id=agent_id,
@@ -144,6 +153,7 @@ class OrchestratorAgent(A2AAgent):
         self.workflows: Dict[str, Workflow] = {}
         self.task_assignments: Dict[str, str] = {}  # task_id -> agent_id
         self.agent_capabilities: Dict[str, List[str]] = {}  # Cache of agent capabilities
+        self.selector = AgentSelector(self.discovery.get_agent_load, selection_strategy)
 
     async def initialize(self) -> bool:
         """Initialize the orchestrator agent."""
@@ -197,8 +207,7 @@ class OrchestratorAgent(A2AAgent):
                     }
                 }
 
-                response = message.create_response(status_response)
-                # Send response back to requester
+                return status_response
 
         async def handle_capability_update(message: Message, auth_token):
             """Handle capability updates from agents."""
@@ -320,10 +329,11 @@ class OrchestratorAgent(A2AAgent):
             task.mark_failed("No suitable agents available")
             return
 
-        # Assign to first available agent (could implement load balancing)
-        assigned_agent = suitable_agents[0].agent_id
+        # Balance by reported load, plus the tasks we assigned since
+        assigned_agent = self.selector.select(suitable_agents, key=workflow.workflow_id).agent_id
         task.assigned_agent = assigned_agent
         self.task_assignments[task.task_id] = assigned_agent
+        self.selector.acquire(assigned_agent)
 
         # Send task assignment
         assignment_payload = {
@@ -346,6 +356,7 @@ class OrchestratorAgent(A2AAgent):
             logger.info(f"Assigned task {task.task_id} to agent {assigned_agent}")
         else:
             task.mark_failed("Failed to send task assignment")
+            self._release_assignment(task.task_id)
 
     async def _handle_task_response(self, workflow_id: str, task_id: str, payload: Dict[str, Any]):
         """Handle a task response from an agent."""
@@ -367,14 +378,18 @@ class OrchestratorAgent(A2AAgent):
             logger.error(f"Task {task_id} failed: {error}")
 
         # Clean up assignment
-        if task_id in self.task_assignments:
-            del self.task_assignments[task_id]
+        self._release_assignment(task_id)
+
+    def _release_assignment(self, task_id: str):
+        agent_id = self.task_assignments.pop(task_id, None)
+        if agent_id is not None:
+            self.selector.release(agent_id)
 
-    async def _find_suitable_agents(self, required_capabilities: List[str]) -> List[AgentRecord]:
+    async def _find_suitable_agents(self, required_capabilities: List[str]) -> List[AgentView]:
         """Find agents that have the required capabilities."""
 
-        # Discover agents with required capabilities
-        agents = await self.discover_agents(required_capabilities)
+        # Discover agents with required capabilities (cached, refreshed by registry deltas)
+        agents = self.discovery_cache.find(required_capabilities)
 
         # Filter out this orchestrator agent
         agents = [agent for agent in agents if agent.agent_id != self.agent_id]
@@ -424,6 +439,7 @@ class OrchestratorAgent(A2AAgent):
         for task in workflow.tasks.values():
             if task.status == TaskStatus.RUNNING:
                 task.status = TaskStatus.CANCELLED
+                self._release_assignment(task.task_id)
                 # Notify assigned agent to cancel task
                 if task.assigned_agent:
                     await self.send_message(
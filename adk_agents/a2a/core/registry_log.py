@@ -0,0 +1,164 @@
+"""
+Registry Persistence for A2A Discovery
+
+The discovery registry is persisted as a JSON snapshot plus an append-only
+change log of JSON lines next to it. Mutations append one short entry
+instead of rewriting the registry; compaction writes a fresh snapshot to a
+temporary file, swaps it in atomically and truncates the log. Startup
+folds the log into the snapshot as plain dicts, so only the surviving
+records are ever constructed.
+
+Log positions are counted across truncations: the log starts with a line
+giving the position of its first byte, and the snapshot records the
+position up to which it covers the log. If the process dies after a
+snapshot is swapped in but before the log is truncated, the entries the
+snapshot already covers are skipped on load instead of being replayed
+over newer state.
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class RegistryLog:
+    """JSON snapshot and append-only change log for the agent registry."""
+
+    def __init__(self, snapshot_path: str, fsync: bool = False):
+        self.snapshot_path = snapshot_path
+        self.log_path = f"{snapshot_path}.log"
+        self.fsync = fsync
+        self.entries = 0  # entries in the log since the last snapshot
+        self.generation = 0  # bumped by every compaction
+        self.log_base = 0  # log position of the log file's first byte
+        self.appends = 0
+        self.compactions = 0
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Replay the snapshot and change log into the latest record dict per agent."""
+
+        state: Dict[str, Dict[str, Any]] = {}
+        covered = 0  # log position the snapshot covers
+
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                data = json.load(f)
+            for agent_data in data.get('agents', []):
+                state[agent_data['agent_id']] = agent_data
+            covered = data.get('log_offset', 0)
+        except FileNotFoundError:
+            pass
+
+        self.entries = 0
+        self.log_base = 0
+        try:
+            with open(self.log_path, 'rb') as f:
+                position = 0
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Truncating torn tail of {self.log_path} at {position} bytes")
+                        f.close()
+                        os.truncate(self.log_path, position)
+                        break
+                    if position == 0 and entry.get('op') == 'base':
+                        self.log_base = entry['offset']
+                    elif self.log_base + position >= covered:
+                        self._apply(state, entry)
+                        self.entries += 1
+                    position += len(line)
+        except FileNotFoundError:
+            pass
+
+        return state
+
+    def append(self, entries: List[Dict[str, Any]], generation: int):
+        """
+        Append change entries. Entries taken before the latest compaction
+        captured the registry are already in the snapshot and are dropped.
+        """
+
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+
+        with self._lock:
+            if generation < self.generation:
+                return
+
+            with open(self.log_path, 'a') as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            self.entries += len(entries)
+            self.appends += 1
+
+    def compact(self, records: Iterable[Dict[str, Any]], generation: int):
+        """
+        Write a snapshot of the given record dicts and reset the log. The
+        records must not change while they are written (pass copies).
+        """
+
+        with self._lock:
+            try:
+                log_offset = self.log_base + os.path.getsize(self.log_path)
+            except FileNotFoundError:
+                log_offset = self.log_base
+
+            data = {
+                'agents': list(records),
+                'log_offset': log_offset,
+                'last_updated': datetime.utcnow().isoformat()
+            }
+
+            temp_path = f"{self.snapshot_path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(data, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.snapshot_path)
+
+            # The new log starts where the snapshot ends; swapped in whole, so it
+            # is never found truncated without the line giving its position
+            temp_path = f"{self.log_path}.tmp"
+            with open(temp_path, 'w') as f:
+                f.write(json.dumps({'op': 'base', 'offset': log_offset}) + "\n")
+            os.replace(temp_path, self.log_path)
+
+            self.log_base = log_offset
+            self.entries = 0
+            self.generation = max(self.generation, generation)
+            self.compactions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "log_entries": self.entries,
+            "appends": self.appends,
+            "compactions": self.compactions,
+        }
+
+    @staticmethod
+    def _apply(state: Dict[str, Dict[str, Any]], entry: Dict[str, Any]):
+        op = entry.get('op')
+        if op == 'put':
+            agent = entry['agent']
+            state[agent['agent_id']] = agent
+        elif op == 'delete':
+            state.pop(entry['agent_id'], None)
+        elif op == 'status':
+            agent = state.get(entry['agent_id'])
+            if agent is not None:
+                agent['status'] = entry['status']
+                agent['last_seen'] = entry['last_seen']
+        elif op == 'patch':
+            agent = state.get(entry['agent_id'])
+            if agent is not None:
+                agent.update(entry['changes'])
+                agent['last_seen'] = entry['last_seen']
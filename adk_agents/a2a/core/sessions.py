@@ -0,0 +1,260 @@
+"""
+Session Keys for A2A Protocol
+
+Sessions are established with an ephemeral X25519 exchange whose public
+halves travel in RSA-signed handshakes; HKDF turns the shared secret into
+a root key. Each session then runs a symmetric ratchet: the key for epoch
+n+1 is derived ahead of time from the chain, so rotating after N messages
+or T seconds is a local swap on both sides with no extra round trip, and
+old keys are discarded once they can no longer be needed.
+"""
+
+import time
+import hashlib
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Dict, Optional, Any, List, Deque
+
+from cryptography.hazmat.primitives import hashes, hmac, serialization
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey, X25519PublicKey
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY_SIZE = 32  # AES-256
+
+
+@dataclass
+class SessionConfig:
+    """Configuration for session key management."""
+
+    max_sessions: int = 10000  # Least recently used sessions are evicted beyond this
+    rotate_after_messages: int = 1_000_000
+    rotate_after_bytes: int = 1 << 36  # 64 GiB
+    rotate_after_seconds: float = 3600.0
+    max_epoch_skip: int = 64  # How far a receiver may ratchet forward to catch up
+    retained_epochs: int = 2  # Retired keys kept for messages still in flight or queued
+    handshake_max_age: float = 300.0  # Seconds an offer's timestamp may be off from our clock
+
+
+def _prf(key: bytes, label: bytes) -> bytes:
+    mac = hmac.HMAC(key, hashes.SHA256())
+    mac.update(label)
+    return mac.finalize()
+
+
+class KeyExchange:
+    """Ephemeral X25519 key pair for one side of a handshake."""
+
+    def __init__(self):
+        self._private_key = X25519PrivateKey.generate()
+        self.public_key = self._private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw
+        ).hex()
+
+    def derive_root_key(self, peer_public_key: str, session_id: str,
+                        initiator_public_key: str, responder_public_key: str) -> bytes:
+        """Derive the session root key from the shared secret with HKDF-SHA256."""
+
+        shared_secret = self._private_key.exchange(
+            X25519PublicKey.from_public_bytes(bytes.fromhex(peer_public_key))
+        )
+        salt = hashlib.sha256(
+            bytes.fromhex(initiator_public_key) + bytes.fromhex(responder_public_key)
+        ).digest()
+
+        return HKDF(
+            algorithm=hashes.SHA256(),
+            length=SESSION_KEY_SIZE,
+            salt=salt,
+            info=f"a2a-session:{session_id}".encode('utf-8'),
+        ).derive(shared_secret)
+
+
+class _EpochKeys:
+    """Encryption and MAC keys for one epoch of a session."""
+
+    __slots__ = ("epoch", "key", "mac_key")
+
+    def __init__(self, epoch: int, chain_key: bytes):
+        self.epoch = epoch
+        self.key = _prf(chain_key, b"a2a-message-key")
+        self.mac_key = _prf(self.key, b"a2a-message-mac")
+
+
+class Session:
+    """
+    One direction of communication between two agents.
+
+    The current epoch's keys are used for sending; the next epoch's keys
+    are already derived so rotation never waits on the peer, and the last
+    few retired epochs are kept so messages in flight across a rotation
+    still decrypt.
+    """
+
+    def __init__(self, session_id: str, initiator_id: str, responder_id: str,
+                 root_key: bytes, verified: bool = False, retained_epochs: int = 2):
+        self.session_id = session_id
+        self.initiator_id = initiator_id
+        self.responder_id = responder_id
+        self.verified = verified
+        self.created_at = time.monotonic()
+        self.epoch_started = self.created_at
+
+        # Counters for the current epoch and the session overall
+        self.messages = 0
+        self.bytes = 0
+        self.total_messages = 0
+        self.total_bytes = 0
+
+        self._chain_key = root_key
+        self.current = self._advance_chain(0)
+        self.next = self._advance_chain(1)
+        self.previous: Deque[_EpochKeys] = deque(maxlen=max(0, retained_epochs))
+
+    @property
+    def epoch(self) -> int:
+        return self.current.epoch
+
+    @property
+    def key(self) -> bytes:
+        return self.current.key
+
+    def record(self, size: int):
+        """Count a message sent or received in the current epoch."""
+
+        self.messages += 1
+        self.bytes += size
+        self.total_messages += 1
+        self.total_bytes += size
+
+    def due_for_rotation(self, config: SessionConfig, now: float = None) -> bool:
+        """Check whether the current key has reached its message, byte or age limit."""
+
+        if self.messages >= config.rotate_after_messages or self.bytes >= config.rotate_after_bytes:
+            return True
+
+        now = time.monotonic() if now is None else now
+        return now - self.epoch_started >= config.rotate_after_seconds
+
+    def rotate(self) -> Optional[_EpochKeys]:
+        """Move to the pre-derived next key; returns keys that are no longer retained."""
+
+        retired = None
+        if len(self.previous) == self.previous.maxlen:
+            retired = self.previous[0] if self.previous else self.current
+        if self.previous.maxlen:
+            self.previous.append(self.current)
+        self.current = self.next
+        self.next = self._advance_chain(self.current.epoch + 1)
+        self.messages = 0
+        self.bytes = 0
+        self.epoch_started = time.monotonic()
+        return retired
+
+    def keys_for(self, epoch: int, max_skip: int) -> Optional[_EpochKeys]:
+        """
+        Keys for a received message's epoch (None if unavailable). Keys for a
+        later epoch are derived without changing the session; call
+        advance_to() once the message has been authenticated with them.
+        """
+
+        if epoch == self.current.epoch:
+            return self.current
+        if epoch < self.current.epoch:
+            for keys in self.previous:
+                if keys.epoch == epoch:
+                    return keys
+            return None
+        if epoch - self.current.epoch > max_skip:
+            return None
+        if epoch == self.next.epoch:
+            return self.next
+
+        chain_key = self._chain_key  # Chain for the epoch after next
+        for _ in range(epoch - self.next.epoch - 1):
+            chain_key = _prf(chain_key, b"a2a-chain-step")
+        return _EpochKeys(epoch, chain_key)
+
+    def advance_to(self, epoch: int) -> List[_EpochKeys]:
+        """Ratchet forward to a sender's later epoch; returns the keys no longer retained."""
+
+        retired = []
+        while self.current.epoch < epoch:
+            old = self.rotate()
+            if old is not None:
+                retired.append(old)
+        return retired
+
+    def holds(self, keys: _EpochKeys) -> bool:
+        """Whether keys are among those this session keeps."""
+        return any(held is keys for held in self.all_keys())
+
+    def all_keys(self) -> List[_EpochKeys]:
+        """Every key this session still holds."""
+        return [*self.previous, self.current, self.next]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "epoch": self.epoch,
+            "messages": self.messages,
+            "bytes": self.bytes,
+            "total_messages": self.total_messages,
+            "total_bytes": self.total_bytes,
+            "age": time.monotonic() - self.created_at,
+            "verified": self.verified,
+        }
+
+    def _advance_chain(self, epoch: int) -> _EpochKeys:
+        """Derive the keys for an epoch and step the chain past it."""
+
+        keys = _EpochKeys(epoch, self._chain_key)
+        self._chain_key = _prf(self._chain_key, b"a2a-chain-step")
+        return keys
+
+
+class SessionCache:
+    """Bounded LRU cache of sessions keyed by session ID."""
+
+    def __init__(self, max_sessions: int = 10000):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, session_id: str) -> Optional[Session]:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def put(self, session: Session) -> Optional[Session]:
+        """Add a session; returns the session evicted to make room, if any."""
+
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+
+        if len(self._sessions) > self.max_sessions:
+            _, evicted = self._sessions.popitem(last=False)
+            self.evictions += 1
+            return evicted
+        return None
+
+    def pop(self, session_id: str) -> Optional[Session]:
+        return self._sessions.pop(session_id, None)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "messages": sum(s.total_messages for s in self._sessions.values()),
+            "bytes": sum(s.total_bytes for s in self._sessions.values()),
+        }
@@ -0,0 +1,189 @@
+"""
+TLS Contexts for A2A Protocol
+
+SSL contexts are costly to build (certificate chain and trust store
+loading) and hold the state that TLS session resumption depends on: a
+server context owns the keys that encrypt its session tickets, and the
+client context below remembers the latest ticket from each server. Contexts
+are therefore built once per certificate configuration and shared by every
+transport in the process, so reconnecting agents resume sessions with an
+abbreviated handshake. Replacing a certificate or key file produces a new
+context on the next lookup.
+"""
+
+import os
+import ssl
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Any, Tuple, Sequence
+
+logger = logging.getLogger(__name__)
+
+_contexts: Dict[Tuple, ssl.SSLContext] = {}
+_contexts_lock = threading.Lock()
+
+
+class _SessionCachingSSLObject(ssl.SSLObject):
+    """SSLObject that hands its session to the client context for later reuse."""
+
+    _session_saved = False
+
+    def do_handshake(self):
+        super().do_handshake()
+        self.context.handshake_completed(self)
+
+    def read(self, len=1024, buffer=None):
+        data = super().read(len, buffer)
+        if not self._session_saved:
+            # TLS 1.3 session tickets arrive after the handshake
+            self.context.save_session(self)
+        return data
+
+
+class ClientTLSContext(ssl.SSLContext):
+    """
+    Client SSL context that resumes TLS sessions.
+
+    asyncio (and so aiohttp and websockets) create connections through
+    wrap_bio without a session; this context supplies the last session
+    saved for the server hostname. A session the server no longer accepts
+    simply results in a full handshake.
+    """
+
+    sslobject_class = _SessionCachingSSLObject
+
+    def __new__(cls, protocol: int = ssl.PROTOCOL_TLS_CLIENT, *args, **kwargs):
+        return super().__new__(cls, protocol)
+
+    def __init__(self, protocol: int = ssl.PROTOCOL_TLS_CLIENT, max_sessions: int = 1024):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ssl.SSLSession]" = OrderedDict()
+        self.handshakes = 0
+        self.resumed = 0
+
+    def wrap_bio(self, incoming, outgoing, server_side=False, server_hostname=None, session=None):
+        if session is None and not server_side and server_hostname:
+            session = self._sessions.get(server_hostname)
+        return super().wrap_bio(incoming, outgoing, server_side=server_side,
+                                server_hostname=server_hostname, session=session)
+
+    def handshake_completed(self, ssl_object: ssl.SSLObject):
+        self.handshakes += 1
+        if ssl_object.session_reused:
+            self.resumed += 1
+        self.save_session(ssl_object)
+
+    def save_session(self, ssl_object: ssl.SSLObject):
+        """Remember a connection's session once it can be resumed."""
+
+        session = ssl_object.session
+        hostname = ssl_object.server_hostname
+        if session is None or not hostname:
+            return
+        if not session.has_ticket and ssl_object.version() == "TLSv1.3":
+            return  # no ticket yet
+
+        ssl_object._session_saved = True
+        self._sessions[hostname] = session
+        self._sessions.move_to_end(hostname)
+        if len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def forget_sessions(self):
+        self._sessions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "handshakes": self.handshakes,
+            "resumed": self.resumed,
+            "resumption_rate": self.resumed / self.handshakes if self.handshakes else 0.0,
+            "cached_sessions": len(self._sessions),
+        }
+
+
+def get_server_context(cert_file: Optional[str], key_file: Optional[str],
+                       ca_file: Optional[str] = None,
+                       alpn_protocols: Sequence[str] = (),
+                       session_tickets: int = 2) -> ssl.SSLContext:
+    """
+    Shared server SSL context.
+
+    With ca_file, clients must present a certificate signed by it (mutual
+    TLS). session_tickets is the number of TLS 1.3 tickets issued per
+    handshake; 0 disables resumption.
+    """
+
+    key = ("server", _file_version(cert_file), _file_version(key_file), _file_version(ca_file),
+           tuple(alpn_protocols), session_tickets)
+
+    def build():
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH, cafile=ca_file)
+        if cert_file and key_file:
+            context.load_cert_chain(cert_file, key_file)
+        if ca_file:
+            context.verify_mode = ssl.CERT_REQUIRED
+        if session_tickets > 0:
+            context.num_tickets = session_tickets
+        else:
+            context.options |= ssl.OP_NO_TICKET
+        if alpn_protocols:
+            context.set_alpn_protocols(list(alpn_protocols))
+        return context
+
+    return _shared(key, build)
+
+
+def get_client_context(cert_file: Optional[str] = None, key_file: Optional[str] = None,
+                       ca_file: Optional[str] = None,
+                       alpn_protocols: Sequence[str] = ()) -> ClientTLSContext:
+    """
+    Shared client SSL context that resumes sessions.
+
+    Servers are verified against ca_file, or the system trust store without
+    one; cert_file and key_file are presented as the client certificate.
+    """
+
+    key = ("client", _file_version(cert_file), _file_version(key_file), _file_version(ca_file),
+           tuple(alpn_protocols))
+
+    def build():
+        context = ClientTLSContext()
+        if ca_file:
+            context.load_verify_locations(cafile=ca_file)
+        else:
+            context.load_default_certs(ssl.Purpose.SERVER_AUTH)
+        if cert_file and key_file:
+            context.load_cert_chain(cert_file, key_file)
+        if alpn_protocols:
+            context.set_alpn_protocols(list(alpn_protocols))
+        return context
+
+    return _shared(key, build)
+
+
+def clear_contexts():
+    """Forget every shared context (new connections build fresh ones)."""
+
+    with _contexts_lock:
+        _contexts.clear()
+
+
+def _shared(key: Tuple, build) -> ssl.SSLContext:
+    with _contexts_lock:
+        context = _contexts.get(key)
+        if context is None:
+            context = _contexts[key] = build()
+            logger.debug(f"Created {key[0]} SSL context")
+        return context
+
+
+def _file_version(path: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Identify a file by path and modification time, so replaced files get a new context."""
+
+    if not path:
+        return None
+    try:
+        return path, os.stat(path).st_mtime_ns
+    except OSError:
+        return path, 0
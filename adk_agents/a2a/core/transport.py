@@ -9,16 +9,24 @@ import asyncio
 import json
 import aiohttp
 import websockets
-from typing import Dict, Optional, Any, Callable, List, Union
+from typing import Dict, Optional, Any, Callable, List, Union, Tuple
 from dataclasses import dataclass
 from datetime import datetime
+from urllib.parse import urlsplit
 import logging
 
 from .messaging import Message, EncryptedMessage
 from .auth import AuthToken
+from .tls import get_client_context, get_server_context
+from .flow_control import (
+    CreditManager, SendWindow, CREDIT_WINDOW_HEADER, DEFAULT_CONTROL_MESSAGE_TYPES,
+    UNAUTHENTICATED_PEER
+)
 
 logger = logging.getLogger(__name__)
 
+BINARY_FRAME_CONTENT_TYPE = "application/octet-stream"
+
 
 @dataclass
 class TransportConfig:
@@ -30,9 +38,96 @@ class TransportConfig:
     ssl_enabled: bool = True
     cert_file: Optional[str] = None
     key_file: Optional[str] = None
+    ca_file: Optional[str] = None  # Trusted CA for peers; servers then require client certificates
+    tls_session_tickets: int = 2  # TLS 1.3 tickets issued per handshake; 0 disables resumption
     timeout: float = 30.0
     max_connections: int = 100
     heartbeat_interval: float = 30.0
+    max_pending_requests: int = 1000
+    credit_window: int = 64  # In-flight messages granted to each sender
+    max_inflight: int = 1024  # In-flight messages accepted across all senders
+    max_queued_sends: int = 1000  # Sends waiting for credit, per receiver
+    overflow_policy: str = "queue"  # "queue" or "shed" when out of credit
+    control_message_types: Tuple[str, ...] = DEFAULT_CONTROL_MESSAGE_TYPES
+    binary_frames: bool = True  # Send encrypted messages as raw binary frames instead of base64 JSON
+
+
+class PendingRequests:
+    """Bounded registry of in-flight requests awaiting a correlated response."""
+
+    def __init__(self, max_pending: int = 1000):
+        self.max_pending = max_pending
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._peers: Dict[str, Optional[str]] = {}  # correlation_id -> agent expected to respond
+
+    def register(self, correlation_id: str, peer_id: str = None) -> asyncio.Future:
+        """
+        Register a request and return the future its response will resolve.
+        With peer_id, only a response sent by that agent resolves it.
+        """
+
+        if correlation_id in self._futures:
+            raise ValueError(f"Request {correlation_id} is already pending")
+        if len(self._futures) >= self.max_pending:
+            raise RuntimeError(f"Too many pending requests (limit {self.max_pending})")
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures[correlation_id] = future
+        self._peers[correlation_id] = peer_id
+        return future
+
+    def resolve(self, message: Message) -> bool:
+        """Resolve the pending request matching the message's correlation ID."""
+
+        if not message.correlation_id:
+            return False
+
+        peer_id = self._peers.get(message.correlation_id)
+        if peer_id is not None and message.sender_id != peer_id:
+            return False
+
+        future = self._futures.pop(message.correlation_id, None)
+        self._peers.pop(message.correlation_id, None)
+        if future is None or future.done():
+            return False
+
+        future.set_result(message)
+        return True
+
+    def cancel(self, correlation_id: str) -> bool:
+        """Cancel a pending request."""
+
+        future = self._futures.pop(correlation_id, None)
+        self._peers.pop(correlation_id, None)
+        if future is None or future.done():
+            return False
+
+        future.cancel()
+        return True
+
+    def discard(self, correlation_id: str):
+        """Forget a pending request without touching its future."""
+        self._futures.pop(correlation_id, None)
+        self._peers.pop(correlation_id, None)
+
+    def cancel_all(self):
+        """Cancel every pending request."""
+
+        for future in self._futures.values():
+            if not future.done():
+                future.cancel()
+        self._futures.clear()
+        self._peers.clear()
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+
+def _flow_target(url: str) -> str:
+    """Key flow-control state by receiver origin (scheme://host:port)."""
+
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
 
 
 class HTTP2Transport:
@@ -42,14 +137,26 @@ class HTTP2Transport:
         self.config = config
         self.session: Optional[aiohttp.ClientSession] = None
         self.server = None
+        self.runner = None
         self.routes: Dict[str, Callable] = {}
         self.running = False
+        # Maps a bearer token to the agent it authenticates (None if invalid)
+        self.peer_resolver: Optional[Callable[[str], Optional[str]]] = None
+
+        # Credit-based flow control: receive-side windows and send-side credits
+        self.credits = CreditManager(
+            config.credit_window, config.max_inflight, config.control_message_types
+        )
+        self.send_window = SendWindow(
+            config.credit_window, config.max_queued_sends,
+            config.overflow_policy, config.control_message_types
+        )
 
     async def start(self):
         """Start the HTTP/2 transport."""
 
         if self.config.ssl_enabled:
-            ssl_context = self._create_ssl_context()
+            ssl_context = self._client_ssl_context()
         else:
             ssl_context = None
 
@@ -72,9 +179,10 @@ class HTTP2Transport:
         if self.session:
             await self.session.close()
 
-        if self.server:
-            self.server.close()
-            await self.server.wait_closed()
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+            self.server = None
 
         self.running = False
         logger.info("HTTP/2 transport stopped")
@@ -99,8 +207,14 @@ class HTTP2Transport:
 
         data = message.to_dict()
 
+        target = _flow_target(target_url)
+        if not await self.send_window.acquire(target, message.message_type, self.config.timeout):
+            logger.warning(f"No credit towards {target}, shedding message {message.message_id}")
+            return None
+
         try:
             async with self.session.post(target_url, json=data, headers=headers) as response:
+                self._apply_credit_window(target, response)
                 if response.status == 200:
                     return await response.json()
                 else:
@@ -111,6 +225,9 @@ class HTTP2Transport:
             logger.error(f"HTTP/2 send failed: {e}")
             return None
 
+        finally:
+            self.send_window.release(target, message.message_type)
+
     async def send_encrypted_message(self, encrypted_message: EncryptedMessage,
                                     target_url: str, auth_token: AuthToken) -> Optional[Dict[str, Any]]:
         """Send an encrypted message via HTTP/2."""
@@ -120,14 +237,25 @@ class HTTP2Transport:
 
         headers = {
             "Authorization": f"Bearer {auth_token.token}",
-            "Content-Type": "application/json",
             "A2A-Encrypted": "true",
+            "A2A-Sender": encrypted_message.sender_id,
         }
 
-        data = encrypted_message.to_dict()
+        if self.config.binary_frames:
+            headers["Content-Type"] = BINARY_FRAME_CONTENT_TYPE
+            body = {"data": encrypted_message.to_frame()}
+        else:
+            headers["Content-Type"] = "application/json"
+            body = {"json": encrypted_message.to_dict()}
+
+        target = _flow_target(target_url)
+        if not await self.send_window.acquire(target, timeout=self.config.timeout):
+            logger.warning(f"No credit towards {target}, shedding encrypted message")
+            return None
 
         try:
-            async with self.session.post(target_url, json=data, headers=headers) as response:
+            async with self.session.post(target_url, headers=headers, **body) as response:
+                self._apply_credit_window(target, response)
                 if response.status == 200:
                     return await response.json()
                 else:
@@ -138,6 +266,19 @@ class HTTP2Transport:
             logger.error(f"Encrypted HTTP/2 send failed: {e}")
             return None
 
+        finally:
+            self.send_window.release(target)
+
+    def _apply_credit_window(self, target: str, response: aiohttp.ClientResponse):
+        """Adopt the credit window the receiver advertised on a response."""
+
+        window = response.headers.get(CREDIT_WINDOW_HEADER)
+        if window and window.isdigit():
+            self.send_window.update_window(target, int(window))
+
+        if response.status == 429:
+            self.send_window.record_throttled(target)
+
     def register_handler(self, path: str, handler: Callable):
         """Register a handler for incoming messages."""
         self.routes[path] = handler
@@ -152,6 +293,27 @@ class HTTP2Transport:
         async def message_handler(request):
             """Handle incoming A2A messages."""
 
+            sender_id = self._authenticated_peer(request)
+            message_type = request.headers.get("A2A-Message-Type")
+
+            # Senders over their window are pushed back before any work is done
+            if not self.credits.try_acquire(sender_id, message_type):
+                return web.Response(
+                    status=429, text="Out of credit",
+                    headers={CREDIT_WINDOW_HEADER: str(self.credits.window_for(sender_id))}
+                )
+
+            try:
+                response = await dispatch(request)
+            finally:
+                self.credits.release(sender_id, message_type)
+
+            response.headers[CREDIT_WINDOW_HEADER] = str(self.credits.window_for(sender_id))
+            return response
+
+        async def dispatch(request):
+            """Decode an incoming message and route it to its handler."""
+
             try:
                 # Validate authorization
                 auth_header = request.headers.get("Authorization", "")
@@ -164,26 +326,37 @@ class HTTP2Transport:
                 is_encrypted = request.headers.get("A2A-Encrypted", "false").lower() == "true"
 
                 if is_encrypted:
-                    data = await request.json()
-                    encrypted_message = EncryptedMessage.from_dict(data)
+                    if request.content_type == BINARY_FRAME_CONTENT_TYPE:
+                        encrypted_message = EncryptedMessage.from_frame(await request.read())
+                    else:
+                        encrypted_message = EncryptedMessage.from_dict(await request.json())
 
                     # Route to appropriate handler
                     path = request.path
                     if path in self.routes:
-                        return await self.routes[path](encrypted_message, auth_token)
+                        result = await self.routes[path](encrypted_message, auth_token)
                     else:
                         return web.Response(status=404, text="Handler not found")
                 else:
                     data = await request.json()
                     message = Message.from_dict(data)
 
+                    # The header decided flow control, so it must describe the message
+                    header_type = request.headers.get("A2A-Message-Type")
+                    if header_type is not None and header_type != message.message_type:
+                        return web.Response(status=400, text="Message type does not match header")
+
                     # Route to appropriate handler
                     path = request.path
                     if path in self.routes:
-                        return await self.routes[path](message, auth_token)
+                        result = await self.routes[path](message, auth_token)
                     else:
                         return web.Response(status=404, text="Handler not found")
 
+                if isinstance(result, web.StreamResponse):
+                    return result
+                return web.json_response(result or {"status": "received"})
+
             except Exception as e:
                 logger.error(f"Message handling error: {e}")
                 return web.Response(status=400, text="Bad request")
@@ -197,30 +370,57 @@ class HTTP2Transport:
         await runner.setup()
 
         if self.config.ssl_enabled:
-            ssl_context = self._create_ssl_context()
+            ssl_context = self._server_ssl_context()
             site = web.TCPSite(runner, self.config.host, self.config.port, ssl_context=ssl_context)
         else:
             site = web.TCPSite(runner, self.config.host, self.config.port)
 
         await site.start()
+        self.runner = runner
         self.server = site
 
         logger.info(f"HTTP/2 server started on {self.config.host}:{self.config.port}")
 
-    def _create_ssl_context(self):
-        """Create SSL context for secure connections."""
-
-        import ssl
+    def _authenticated_peer(self, request) -> str:
+        """Flow-control key for a request: the agent its token or client certificate authenticates."""
 
-        ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-
-        if self.config.cert_file and self.config.key_file:
-            ssl_context.load_cert_chain(self.config.cert_file, self.config.key_file)
+        auth_header = request.headers.get("Authorization", "")
+        if self.peer_resolver is not None and auth_header.startswith("Bearer "):
+            try:
+                peer_id = self.peer_resolver(auth_header[7:])
+            except Exception as e:
+                logger.debug(f"Could not resolve peer token: {e}")
+                peer_id = None
+            if peer_id:
+                return peer_id
+
+        # Verified client certificate (mutual TLS)
+        peercert = request.transport.get_extra_info("peercert") if request.transport else None
+        for rdn in (peercert or {}).get("subject", ()):
+            for name, value in rdn:
+                if name == "commonName":
+                    return f"tls:{value}"
+
+        return UNAUTHENTICATED_PEER
+
+    def _client_ssl_context(self):
+        """Shared client SSL context for outgoing connections (resumes TLS sessions)."""
+        return get_client_context(
+            self.config.cert_file, self.config.key_file, self.config.ca_file,
+            alpn_protocols=('h2', 'http/1.1')
+        )
 
-        # Enable HTTP/2
-        ssl_context.set_alpn_protocols(['h2', 'http/1.1'])
+    def _server_ssl_context(self):
+        """Shared server SSL context; its session ticket keys survive server restarts."""
+        return get_server_context(
+            self.config.cert_file, self.config.key_file, self.config.ca_file,
+            alpn_protocols=('h2', 'http/1.1'),
+            session_tickets=self.config.tls_session_tickets
+        )
 
-        return ssl_context
+    def get_tls_stats(self) -> Optional[Dict[str, Any]]:
+        """Handshake and resumption counts for outgoing connections."""
+        return self._client_ssl_context().get_stats() if self.config.ssl_enabled else None
 
 
 class WebSocketTransport:
@@ -264,8 +464,14 @@ class WebSocketTransport:
                           auth_token: AuthToken) -> bool:
         """Send a message via WebSocket."""
 
+        ssl_context = None
+        if self.config.ssl_enabled and target_uri.startswith("wss://"):
+            ssl_context = get_client_context(
+                self.config.cert_file, self.config.key_file, self.config.ca_file
+            )
+
         try:
-            async with websockets.connect(target_uri) as websocket:
+            async with websockets.connect(target_uri, ssl=ssl_context) as websocket:
                 # Send authentication
                 await websocket.send(json.dumps({
                     "type": "auth",
@@ -380,16 +586,11 @@ class WebSocketTransport:
             )
 
     def _create_ssl_context(self):
-        """Create SSL context for secure WebSocket connections."""
-
-        import ssl
-
-        ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-
-        if self.config.cert_file and self.config.key_file:
-            ssl_context.load_cert_chain(self.config.cert_file, self.config.key_file)
-
-        return ssl_context
+        """Shared server SSL context for secure WebSocket connections."""
+        return get_server_context(
+            self.config.cert_file, self.config.key_file, self.config.ca_file,
+            session_tickets=self.config.tls_session_tickets
+        )
 
 
 class TransportLayer:
@@ -399,6 +600,7 @@ class TransportLayer:
         self.config = config
         self.transports: Dict[str, Union[HTTP2Transport, WebSocketTransport]] = {}
         self.current_transport: Optional[str] = None
+        self.pending_requests = PendingRequests(config.max_pending_requests)
 
         # Initialize transports based on protocol
         if config.protocol == "http2":
@@ -423,6 +625,8 @@ class TransportLayer:
     async def stop(self):
         """Stop the transport layer."""
 
+        self.pending_requests.cancel_all()
+
         for transport in self.transports.values():
             await transport.stop()
 
@@ -446,6 +650,44 @@ class TransportLayer:
 
         return None
 
+    async def send_request(self, message: Message, target: str, auth_token: AuthToken,
+                          timeout: float = None) -> Optional[Message]:
+        """
+        Send a message and wait for the response correlated to it. The
+        timeout covers sending (including waiting for credit) and the wait
+        for the response.
+        """
+
+        future = self.pending_requests.register(message.message_id, message.receiver_id)
+
+        async def exchange() -> Optional[Message]:
+            reply = await self.send_message(message, target, auth_token)
+            if not reply:
+                return None
+
+            # HTTP receivers return the handler's response in the reply
+            if isinstance(reply, dict) and isinstance(reply.get("response"), dict):
+                try:
+                    self.pending_requests.resolve(Message.from_dict(reply["response"]))
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"Malformed response to request {message.message_id}: {e}")
+
+            return await future
+
+        try:
+            return await asyncio.wait_for(exchange(), timeout or self.config.timeout)
+
+        except asyncio.TimeoutError:
+            logger.warning(f"Request {message.message_id} to {message.receiver_id} timed out")
+            return None
+
+        finally:
+            self.pending_requests.discard(message.message_id)
+
+    def resolve_response(self, message: Message) -> bool:
+        """Deliver a response to the request waiting on its correlation ID."""
+        return self.pending_requests.resolve(message)
+
     async def send_encrypted_message(self, encrypted_message: EncryptedMessage,
                                     target: str, auth_token: AuthToken) -> Optional[Any]:
         """Send an encrypted message using the current transport."""
@@ -475,6 +717,28 @@ class TransportLayer:
             if hasattr(transport, 'start_server'):
                 await transport.start_server()
 
+    def set_peer_resolver(self, resolver: Callable[[str], Optional[str]]):
+        """Set how receivers map a bearer token to the agent it authenticates, for flow control."""
+
+        for transport in self.transports.values():
+            if isinstance(transport, HTTP2Transport):
+                transport.peer_resolver = resolver
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get request and flow-control metrics for the transport layer."""
+
+        metrics: Dict[str, Any] = {"pending_requests": len(self.pending_requests)}
+
+        for name, transport in self.transports.items():
+            if isinstance(transport, HTTP2Transport):
+                metrics[name] = {
+                    "send": transport.send_window.get_metrics(),
+                    "receive": transport.credits.get_metrics(),
+                    "tls": transport.get_tls_stats(),
+                }
+
+        return metrics
+
     def switch_protocol(self, protocol: str):
         """Switch to a different transport protocol."""
 
@@ -0,0 +1,171 @@
+"""
+Signature Verification Pool for A2A Protocol
+
+Runs RSA signature verification off the event loop. Pending verifications
+are grouped per sender and handed to a thread pool in batches; each
+sender has at most one batch in flight, so results for a sender arrive in
+the order its messages were submitted while different senders verify in
+parallel. The cryptography calls release the GIL, so threads scale.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Any, List, Callable, Deque, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .messaging import Message
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class SignatureVerificationPool:
+    """Batched, per-sender ordered signature verification on a thread pool."""
+
+    def __init__(self, verify: Callable[["Message"], bool], max_workers: int = None,
+                 batch_size: int = 64, max_pending: int = 100000,
+                 latency_window: int = 1024):
+        self._verify = verify
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Deque[Tuple["Message", asyncio.Future, float]]] = {}
+        self._active: Set[str] = set()  # senders with a batch in flight
+
+        # Metrics
+        self.depth = 0  # submitted and not yet answered
+        self.verified = 0
+        self.rejected = 0
+        self.batches = 0
+        self._latencies: Deque[float] = deque(maxlen=latency_window)  # submit -> result
+        self._verify_times: Deque[float] = deque(maxlen=latency_window)  # time in verify()
+
+    def submit(self, message: "Message") -> asyncio.Future:
+        """Queue a message for verification; the future resolves to True or False."""
+
+        if self.depth >= self.max_pending:
+            raise RuntimeError(f"Too many pending verifications (limit {self.max_pending})")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        sender_id = message.sender_id
+        queue = self._pending.get(sender_id)
+        if queue is None:
+            queue = self._pending[sender_id] = deque()
+        queue.append((message, future, time.perf_counter()))
+        self.depth += 1
+
+        if sender_id not in self._active:
+            self._dispatch(sender_id, loop)
+        return future
+
+    async def verify(self, message: "Message") -> bool:
+        """Verify one message off the event loop."""
+        return await self.submit(message)
+
+    async def verify_many(self, messages: List["Message"]) -> List[bool]:
+        """Verify messages off the event loop; results are in input order."""
+        return list(await asyncio.gather(*(self.submit(message) for message in messages)))
+
+    def close(self):
+        """Shut the pool down, failing verifications that have not run."""
+
+        for queue in self._pending.values():
+            for _, future, _ in queue:
+                if not future.done():
+                    future.set_result(False)
+        self.depth -= sum(len(queue) for queue in self._pending.values())
+        self._pending.clear()
+
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, throughput counters and latency percentiles (milliseconds)."""
+
+        latencies = list(self._latencies)
+        verify_times = list(self._verify_times)
+        return {
+            "queue_depth": self.depth,
+            "senders_waiting": len(self._pending),
+            "batches_in_flight": len(self._active),
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "latency_p50_ms": _percentile(latencies, 0.5) * 1000,
+            "latency_p99_ms": _percentile(latencies, 0.99) * 1000,
+            "verify_avg_ms": (sum(verify_times) / len(verify_times) * 1000) if verify_times else 0.0,
+        }
+
+    def _dispatch(self, sender_id: str, loop: asyncio.AbstractEventLoop):
+        """Send the sender's next batch to the pool, or mark it idle."""
+
+        queue = self._pending.get(sender_id)
+        if not queue:
+            self._pending.pop(sender_id, None)
+            self._active.discard(sender_id)
+            return
+
+        batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+        self._active.add(sender_id)
+        self.batches += 1
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="a2a-verify")
+
+        job = loop.run_in_executor(self._executor, self._verify_batch, [item[0] for item in batch])
+        job.add_done_callback(lambda done: self._complete(sender_id, batch, done, loop))
+
+    def _verify_batch(self, messages: List["Message"]) -> List[Tuple[bool, float]]:
+        """Runs on a worker thread."""
+
+        results = []
+        for message in messages:
+            start = time.perf_counter()
+            try:
+                valid = bool(self._verify(message))
+            except Exception as e:
+                logger.error(f"Signature verification error for {message.message_id}: {e}")
+                valid = False
+            results.append((valid, time.perf_counter() - start))
+        return results
+
+    def _complete(self, sender_id: str, batch, job: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        """Resolve a finished batch in submission order, then dispatch the sender's next one."""
+
+        if job.cancelled() or job.exception() is not None:
+            if not job.cancelled():
+                logger.error(f"Signature verification batch failed: {job.exception()}")
+            results = [(False, 0.0)] * len(batch)
+        else:
+            results = job.result()
+
+        now = time.perf_counter()
+        for (_, future, submitted), (valid, took) in zip(batch, results):
+            self.depth -= 1
+            self._latencies.append(now - submitted)
+            self._verify_times.append(took)
+            if valid:
+                self.verified += 1
+            else:
+                self.rejected += 1
+            if not future.done():
+                future.set_result(valid)
+
+        self._active.discard(sender_id)
+        if self._executor is not None:
+            self._dispatch(sender_id, loop)
@@ -0,0 +1,145 @@
+"""
+Tests for A2A agent message dispatch
+"""
+
+import time
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from adk_agents.a2a.core.agent import A2AAgent
+from adk_agents.a2a.core.discovery import AgentRecord, DiscoveryService
+from adk_agents.a2a.core.messaging import Message
+from adk_agents.a2a.core.transport import TransportConfig
+
+
+class TestIncomingMessages:
+    """Test cases for handling messages received by the transport"""
+
+    @pytest.fixture
+    def agent(self, tmp_path):
+        """An agent that is not started (no network)"""
+        return A2AAgent(
+            "bob",
+            identity_storage=str(tmp_path / "identities"),
+            discovery=DiscoveryService(str(tmp_path / "registry.json")),
+            transport_config=TransportConfig(host="127.0.0.1", ssl_enabled=False),
+        )
+
+    @pytest.fixture
+    def session(self, agent):
+        """Identities for alice and bob, and a session from alice to bob"""
+        agent.identity_manager.create_identity(["a2a:messaging"], agent_id="alice", key_type="ed25519")
+        agent.identity_manager.create_identity(["a2a:messaging"], agent_id="bob", key_type="ed25519")
+        session_id = agent.messaging.create_session("alice", "bob")
+        assert session_id is not None
+        return agent.messaging.sessions.get(session_id)
+
+    def test_handler_response_is_returned_in_reply(self, agent, session):
+        """Test a handler's response travels in the reply instead of a separate request"""
+        request = Message(
+            message_id="",
+            sender_id="alice",
+            receiver_id="bob",
+            message_type="ping",
+            payload={},
+            timestamp=datetime.utcnow(),
+        )
+        assert agent.messaging.mac_for_session(request)
+
+        reply = asyncio.run(agent._handle_incoming_message(request, "token"))
+
+        assert reply["status"] == "processed"
+        response = Message.from_dict(reply["response"])
+        assert response.correlation_id == request.message_id
+        assert response.receiver_id == "alice"
+        assert response.payload == {"status": "pong"}
+        # No session from bob to alice yet, so the reply is signed instead
+        assert agent.messaging.verify_message(response)
+
+    def test_tampered_message_is_rejected(self, agent, session):
+        """Test a networked message must carry a valid session MAC"""
+        handled = []
+
+        async def handle_task(message, auth_token):
+            handled.append(message)
+
+        agent.register_message_handler("task", handle_task)
+        message = Message("", "alice", "bob", "task", {"amount": 100}, datetime.utcnow())
+        assert agent.messaging.mac_for_session(message)
+        message.payload["amount"] = 1000000
+        unsigned = Message("", "alice", "bob", "task", {"amount": 100}, datetime.utcnow())
+
+        assert asyncio.run(agent._handle_incoming_message(message, "token")) == {"status": "rejected"}
+        assert asyncio.run(agent._handle_incoming_message(unsigned, "token")) == {"status": "rejected"}
+        assert handled == []
+
+    def test_delivered_message_carries_session_mac(self, agent, session):
+        """Test messages sent over the network are MACed under the sender's session"""
+        assert agent.messaging.create_session("bob", "alice")
+        agent.discovery.register_agent(AgentRecord("alice", "did:a2a:alice", ["a2a:messaging"],
+                                                   ["http://127.0.0.1:9001/a2a"], {}))
+        sent = []
+
+        async def send_message(message, target, auth_token):
+            sent.append(message)
+            return True
+
+        agent.transport.send_message = send_message
+        message = Message("", "bob", "alice", "task", {"amount": 100}, datetime.utcnow())
+
+        assert asyncio.run(agent._deliver(message))
+        assert "mac" in sent[0].metadata and "signature" not in sent[0].metadata
+        assert agent.messaging.verify_message(sent[0])
+
+    def test_inline_response_resolves_request(self, agent):
+        """Test the transport resolves a pending request from the reply's response"""
+        request = Message(
+            message_id="",
+            sender_id="bob",
+            receiver_id="alice",
+            message_type="ping",
+            payload={},
+            timestamp=datetime.utcnow(),
+        )
+        response = request.create_response({"status": "pong"})
+
+        async def send_message(message, target, auth_token):
+            return {"status": "processed", "response": response.to_dict()}
+
+        agent.transport.send_message = send_message
+        result = asyncio.run(agent.transport.send_request(request, "http://alice/a2a/message", None, 1))
+
+        assert result is not None and result.message_id == response.message_id
+        assert len(agent.transport.pending_requests) == 0
+
+    def test_request_timeout_covers_sending(self, agent):
+        """Test a slow send counts against the request's timeout"""
+        request = Message("", "bob", "alice", "ping", {}, datetime.utcnow())
+
+        async def send_message(message, target, auth_token):
+            await asyncio.sleep(5)
+            return {"status": "received"}
+
+        agent.transport.send_message = send_message
+        started = time.monotonic()
+        result = asyncio.run(agent.transport.send_request(request, "http://alice/a2a/message", None, 0.1))
+
+        assert result is None
+        assert time.monotonic() - started < 1
+
+    def test_response_from_other_peer_is_ignored(self, agent):
+        """Test only the agent a request was sent to can resolve it"""
+        request = Message("", "bob", "alice", "ping", {}, datetime.utcnow())
+        spoofed = request.create_response({"status": "pong"})
+        spoofed.sender_id = "mallory"
+
+        async def send_message(message, target, auth_token):
+            assert not agent.transport.resolve_response(spoofed)
+            return {"status": "processed", "response": spoofed.to_dict()}
+
+        agent.transport.send_message = send_message
+        result = asyncio.run(agent.transport.send_request(request, "http://alice/a2a/message", None, 0.1))
+
+        assert result is None
@@ -0,0 +1,201 @@
+"""
+Tests for A2A token authentication
+"""
+
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+
+from adk_agents.a2a.core import auth
+from adk_agents.a2a.core.auth import (
+    AuthenticationManager, EdDSATokenAuthenticator, MutualTLSAuthenticator, TokenValidationCache
+)
+from adk_agents.a2a.core.identity import IdentityManager
+
+
+class TestEdDSATokens:
+    """Test cases for self-issued EdDSA tokens"""
+
+    @pytest.fixture
+    def published_keys(self):
+        """Public keys as agents would publish them in discovery records"""
+        return {}
+
+    @pytest.fixture
+    def verifier(self, tmp_path, published_keys):
+        """Authentication manager of an agent receiving tokens"""
+        return AuthenticationManager(
+            IdentityManager(str(tmp_path / "identities")),
+            key_resolver=lambda issuer_id, key_id: published_keys.get(key_id)
+        )
+
+    @pytest.fixture
+    def mallory(self, published_keys):
+        """An agent issuing tokens with its own published key"""
+        issuer = EdDSATokenAuthenticator()
+        key_id, public_key = issuer.set_signing_key("mallory")
+        published_keys[key_id] = public_key
+        return issuer
+
+    def test_own_token_is_accepted(self, verifier, mallory):
+        """Test a token for the issuer itself validates as the issuer"""
+        token = mallory.create_token("mallory", ["a2a:messaging"])
+
+        assert verifier.validate_authentication(token.token, ["a2a:messaging"]) == (True, "mallory")
+
+    def test_create_token_for_other_agent_is_refused(self, mallory):
+        """Test an issuer cannot create tokens for another agent"""
+        with pytest.raises(ValueError):
+            mallory.create_token("bank", ["a2a:messaging"])
+
+    def test_forged_subject_is_rejected(self, verifier, mallory):
+        """Test a correctly signed token claiming another subject does not impersonate it"""
+        now = int(time.time())
+        forged = jwt.encode(
+            {"iss": "mallory", "sub": "bank", "iat": now, "exp": now + 3600,
+             "permissions": ["a2a:messaging", "a2a:admin"], "metadata": {}},
+            mallory._private_key, algorithm="EdDSA", headers={"kid": mallory.key_id}
+        )
+
+        assert verifier.validate_authentication(forged, ["a2a:messaging"]) == (False, None)
+
+    def test_issuer_must_match_key(self, verifier, mallory):
+        """Test a token naming another issuer than its key is rejected"""
+        now = int(time.time())
+        forged = jwt.encode(
+            {"iss": "bank", "sub": "bank", "iat": now, "exp": now + 3600,
+             "permissions": ["a2a:messaging"], "metadata": {}},
+            mallory._private_key, algorithm="EdDSA", headers={"kid": mallory.key_id}
+        )
+
+        assert verifier.validate_authentication(forged) == (False, None)
+
+
+class TestTokenValidationCache:
+    """Test cases for expiry and revocation of validated tokens"""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Controllable time.time() for the auth module"""
+        now = [1_000_000.0]
+        monkeypatch.setattr(auth.time, "time", lambda: now[0])
+        return now
+
+    @staticmethod
+    def claims(agent_id: str = "alice", iat: int = 1_000_000, exp: int = 1_003_600):
+        return {"sub": agent_id, "iat": iat, "exp": exp, "permissions": ["a2a:messaging"]}
+
+    def test_entry_expires_exactly_at_exp(self, clock):
+        """Test a cached token is served until its exp and not at it"""
+        cache = TokenValidationCache()
+        cache.put("token", self.claims(exp=1_000_010))
+
+        clock[0] = 1_000_009.999
+        assert cache.get("token") is not None
+        clock[0] = 1_000_010.0
+        assert cache.get("token") is None
+        assert cache.get_stats()["entries"] == 0
+
+    def test_revoked_token_is_rejected_until_it_expires(self, clock):
+        """Test a revoked token is not served or re-cached, and its revocation is forgotten after exp"""
+        cache = TokenValidationCache()
+        cache.put("token", self.claims(exp=1_000_010))
+        cache.revoke("token")
+
+        assert cache.get("token") is None
+        assert cache.put("token", self.claims(exp=1_000_010)) is None
+
+        clock[0] = 1_000_010.0
+        cache.revoke("other", expires_at=1_000_100)
+        assert cache.get_stats()["revoked"] == 1
+
+    def test_agent_revocation_in_the_issuing_second(self, clock):
+        """Test tokens issued up to the second an agent is revoked are rejected, later ones are not"""
+        cache = TokenValidationCache()
+        cache.put("before", self.claims(iat=1_000_000))
+        clock[0] = 1_000_000.4
+        cache.revoke_agent("alice")
+
+        assert cache.get("before") is None
+        # Issued in the same second as the revocation: it cannot be told apart from one issued before
+        assert cache.put("same-second", self.claims(iat=1_000_000)) is None
+        assert cache.put("next-second", self.claims(iat=1_000_001)) is not None
+        assert cache.put("bob", self.claims(agent_id="bob", iat=1_000_000)) is not None
+
+    def test_manager_rejects_revoked_tokens(self, tmp_path):
+        """Test revoking a token or its agent makes validation fail even after it was cached"""
+        issuer = EdDSATokenAuthenticator()
+        key_id, public_key = issuer.set_signing_key("alice")
+        manager = AuthenticationManager(
+            IdentityManager(str(tmp_path / "identities")),
+            key_resolver=lambda issuer_id, kid: public_key if kid == key_id else None
+        )
+        first = issuer.create_token("alice", ["a2a:messaging"]).token
+        second = issuer.create_token("alice", ["a2a:messaging"], 60).token
+
+        assert manager.validate_authentication(first, ["a2a:messaging"]) == (True, "alice")
+        manager.revoke_token(first)
+        assert manager.validate_authentication(first, ["a2a:messaging"]) == (False, None)
+
+        assert manager.validate_authentication(second, ["a2a:messaging"]) == (True, "alice")
+        manager.revoke_agent_tokens("alice")
+        assert manager.validate_authentication(second, ["a2a:messaging"]) == (False, None)
+
+
+class TestMutualTLSCache:
+    """Test cases for the verified-certificate cache"""
+
+    @pytest.fixture
+    def identity_manager(self, tmp_path):
+        """Identities whose certificates peers present"""
+        manager = IdentityManager(str(tmp_path / "identities"))
+        for agent_id in ("alice", "bob", "carol"):
+            manager.create_identity(["a2a:messaging"], agent_id=agent_id, key_type="ed25519")
+        return manager
+
+    def test_cache_is_bounded(self, identity_manager):
+        """Test the cache keeps at most max_cached certificates, dropping the oldest"""
+        mtls = MutualTLSAuthenticator(identity_manager, max_cached=2)
+        for agent_id in ("alice", "bob", "carol"):
+            assert mtls.authenticate_client_cert(identity_manager.get_certificate(agent_id)) == agent_id
+
+        assert mtls.get_stats()["entries"] == 2
+        hits = mtls.hits
+        assert mtls.authenticate_client_cert(identity_manager.get_certificate("carol")) == "carol"
+        assert mtls.hits == hits + 1
+        assert mtls.authenticate_client_cert(identity_manager.get_certificate("alice")) == "alice"
+        assert mtls.hits == hits + 1  # alice was evicted and validated again
+
+    def test_disabled_cache_stores_nothing(self, identity_manager):
+        """Test max_cached=0 validates every time without caching"""
+        mtls = MutualTLSAuthenticator(identity_manager, max_cached=0)
+        certificate = identity_manager.get_certificate("alice")
+
+        assert mtls.authenticate_client_cert(certificate) == "alice"
+        assert mtls.authenticate_client_cert(certificate) == "alice"
+        assert mtls.get_stats()["entries"] == 0 and mtls.hits == 0
+
+    def test_entries_expire_after_ttl(self, identity_manager, monkeypatch):
+        """Test a cached certificate is validated again once cache_ttl has passed"""
+        now = [1_000_000.0]
+        monkeypatch.setattr(auth.time, "time", lambda: now[0])
+        mtls = MutualTLSAuthenticator(identity_manager, cache_ttl=60)
+        der = identity_manager.get_certificate("alice").public_bytes(serialization.Encoding.DER)
+
+        assert mtls.authenticate_peer_certificate(der) == "alice"
+        now[0] += 59
+        assert mtls.authenticate_peer_certificate(der) == "alice" and mtls.hits == 1
+        now[0] += 1
+        assert mtls.authenticate_peer_certificate(der) == "alice" and mtls.hits == 1
+        assert mtls.get_stats()["entries"] == 1
+
+    def test_forget_agent_drops_its_certificates(self, identity_manager):
+        """Test forgetting an agent removes only that agent's cache entries"""
+        mtls = MutualTLSAuthenticator(identity_manager)
+        for agent_id in ("alice", "bob"):
+            mtls.authenticate_client_cert(identity_manager.get_certificate(agent_id))
+
+        mtls.forget_agent("alice")
+        assert mtls.get_stats()["entries"] == 1
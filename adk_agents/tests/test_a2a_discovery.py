@@ -0,0 +1,184 @@
+"""
+Tests for the A2A discovery registry
+"""
+
+import asyncio
+
+import pytest
+
+from adk_agents.a2a.core import discovery
+from adk_agents.a2a.core.discovery import AgentRecord, DiscoveryService, ServiceQuery
+from adk_agents.a2a.core.registry_log import RegistryLog
+
+
+def make_record(agent_id: str, capabilities=None, status: str = "active", ttl: int = 300) -> AgentRecord:
+    return AgentRecord(
+        agent_id=agent_id,
+        agent_did=f"did:a2a:{agent_id}",
+        capabilities=capabilities or ["a2a:messaging"],
+        endpoints=[f"http://127.0.0.1:9000/{agent_id}"],
+        metadata={},
+        status=status,
+        ttl=ttl,
+    )
+
+
+class TestRegistryLog:
+    """Test cases for the registry snapshot and change log"""
+
+    def test_log_covered_by_snapshot_is_not_replayed(self, tmp_path):
+        """Test a crash between swapping in a snapshot and truncating the log keeps the snapshot"""
+        path = str(tmp_path / "registry.json")
+        log = RegistryLog(path)
+        log.append([{"op": "put", "agent": make_record("worker", status="busy").to_dict()}], 0)
+        with open(log.log_path) as f:
+            stale_log = f.read()
+
+        log.compact([make_record("worker", status="active").to_dict()], 1)
+        with open(log.log_path, "w") as f:
+            f.write(stale_log)  # as if the process died before the log was reset
+
+        assert RegistryLog(path).load()["worker"]["status"] == "active"
+
+    def test_entries_after_snapshot_are_replayed(self, tmp_path):
+        """Test changes logged after a compaction, and across several, are applied on load"""
+        path = str(tmp_path / "registry.json")
+        log = RegistryLog(path)
+        log.append([{"op": "put", "agent": make_record("a").to_dict()}], 0)
+        log.compact([make_record("a").to_dict()], 1)
+        log.append([{"op": "put", "agent": make_record("b").to_dict()}], 1)
+        log.compact([make_record("a").to_dict(), make_record("b").to_dict()], 2)
+        log.append([{"op": "delete", "agent_id": "a"},
+                    {"op": "put", "agent": make_record("c").to_dict()}], 2)
+
+        reloaded = RegistryLog(path)
+        assert set(reloaded.load()) == {"b", "c"}
+        assert reloaded.entries == 2
+
+    def test_snapshot_is_copied_on_the_loop(self, tmp_path):
+        """Test compaction hands the writer thread copies, not the records the loop updates"""
+
+        async def run():
+            service = DiscoveryService(str(tmp_path / "registry.json"), flush_interval=0, compact_after=1)
+            written = []
+            service.log.compact = lambda records, generation: written.append(records)
+
+            service.register_agent(make_record("worker"))
+            service._start_flush()
+            await service._flush_job
+            service.update_agent_status("worker", "busy")
+            return written
+
+        snapshot = asyncio.run(run())[0]
+        assert isinstance(snapshot[0], dict) and snapshot[0]["status"] == "active"
+
+
+class TestCapabilityIndex:
+    """Test cases for the capability index"""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        return DiscoveryService(str(tmp_path / "registry.json"))
+
+    def found(self, service, *capabilities):
+        return {view.agent_id for view in service.discover_agents(ServiceQuery(capabilities=list(capabilities)))}
+
+    def test_update_moves_only_changed_capabilities(self, service):
+        """Test an update adds and removes the agent from just the sets it joins or leaves"""
+        service.register_agent(make_record("a", ["search", "analysis"]))
+        service.register_agent(make_record("b", ["search"]))
+
+        assert service.update_agent("a", {"capabilities": ["analysis", "translation"]})
+
+        assert service.capability_index == {"search": {"b"}, "analysis": {"a"}, "translation": {"a"}}
+        assert self.found(service, "search") == {"b"}
+        assert self.found(service, "analysis", "translation") == {"a"}
+        assert self.found(service, "search", "analysis") == set()
+
+    def test_list_changed_in_place_is_reindexed(self, service):
+        """Test re-registering a record whose capability list was edited in place updates the index"""
+        record = make_record("a", ["search"])
+        service.register_agent(record)
+
+        record.capabilities.remove("search")
+        record.capabilities.append("analysis")
+        service.register_agent(record)
+
+        assert service.capability_index == {"analysis": {"a"}}
+        assert service.agent_capabilities["a"] == frozenset({"analysis"})
+
+    def test_unregister_empties_the_index(self, service):
+        """Test removing the last agent with a capability removes the capability"""
+        service.register_agent(make_record("a", ["search"]))
+        service.register_agent(make_record("b", ["search", "analysis"]))
+
+        service.unregister_agent("b")
+        assert service.capability_index == {"search": {"a"}}
+        assert service.get_all_capabilities() == ["search"]
+
+        service.unregister_agent("a")
+        assert service.capability_index == {} and service.agent_capabilities == {}
+
+
+class TestExpiryHeap:
+    """Test cases for deadline-driven agent expiry"""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        return DiscoveryService(str(tmp_path / "registry.json"))
+
+    def test_agents_expire_at_their_deadline(self, service):
+        """Test only agents whose deadline has passed are removed"""
+        service.register_agent(make_record("short", ttl=10))
+        service.register_agent(make_record("long", ttl=100))
+        deadline = service._expires_at["short"]
+
+        assert service._expire_due(deadline - 0.001) == []
+        assert service._expire_due(deadline) == ["short"]
+        assert set(service.agents) == {"long"}
+        assert service.expired_count == 1
+
+    def test_heartbeat_moves_deadline_without_growing_heap(self, service, monkeypatch):
+        """Test heartbeats push the deadline back and the stale heap entry is re-armed when due"""
+        now = [1000.0]
+        monkeypatch.setattr(discovery.time, "monotonic", lambda: now[0])
+        service.register_agent(make_record("worker", ttl=10))
+        first = service._expires_at["worker"]
+        for _ in range(1000):
+            now[0] += 1
+            service.heartbeat("worker")
+
+        assert len(service._expiry_heap) == 1
+        assert service._expire_due(first) == []
+        assert service._expiry_heap == [(now[0] + 10, "worker")]
+        assert service._expire_due(now[0] + 10) == ["worker"]
+
+    def test_removed_agents_leave_no_expiry(self, service):
+        """Test an unregistered agent's heap entry is skipped and not reported as expired"""
+        service.register_agent(make_record("worker", ttl=10))
+        deadline = service._expires_at["worker"]
+        service.unregister_agent("worker")
+
+        assert service._expire_due(deadline + 1) == []
+        assert service._expiry_heap == [] and service.expired_count == 0
+
+    def test_cleanup_wakes_for_an_earlier_deadline(self, tmp_path):
+        """Test the cleanup task, asleep until a distant deadline, removes an agent that expires sooner"""
+
+        async def run():
+            service = DiscoveryService(str(tmp_path / "registry.json"))
+            service.start()
+            try:
+                service.register_agent(make_record("long", ttl=3600))
+                await asyncio.sleep(0.05)  # the task now sleeps until "long" expires
+
+                service.register_agent(make_record("short", ttl=0))
+                for _ in range(50):
+                    if "short" not in service.agents:
+                        break
+                    await asyncio.sleep(0.01)
+                return set(service.agents)
+            finally:
+                service.stop()
+
+        assert asyncio.run(run()) == {"long"}
@@ -0,0 +1,92 @@
+"""
+Tests for the client-side discovery cache
+"""
+
+import pytest
+
+from adk_agents.a2a.core.discovery import AgentRecord, DiscoveryService, RegistryChange
+from adk_agents.a2a.core.discovery_cache import DiscoveryCache
+
+
+def make_record(agent_id: str, capabilities=None, port: int = 9000) -> AgentRecord:
+    return AgentRecord(
+        agent_id=agent_id,
+        agent_did=f"did:a2a:{agent_id}",
+        capabilities=capabilities or ["a2a:messaging"],
+        endpoints=[f"http://127.0.0.1:{port}/a2a"],
+        metadata={},
+    )
+
+
+class TestDiscoveryCache:
+    """Test cases for keeping cached lookups current from registry deltas"""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        return DiscoveryService(str(tmp_path / "registry.json"))
+
+    @pytest.fixture
+    def cache(self, service):
+        # A TTL this long means any fresh answer came from a delta, not a re-query
+        return DiscoveryCache(service, ttl=3600)
+
+    def found(self, cache, *capabilities):
+        return {view.agent_id for view in cache.find(list(capabilities))}
+
+    def test_reregistration_updates_cached_endpoint(self, service, cache):
+        """Test a cached agent's new endpoint is served without another query"""
+        service.register_agent(make_record("worker", port=9000))
+        assert cache.resolve("worker").endpoints == ("http://127.0.0.1:9000/a2a",)
+
+        service.register_agent(make_record("worker", port=9001))
+        assert cache.resolve("worker").endpoints == ("http://127.0.0.1:9001/a2a",)
+        assert cache.misses == 1
+
+    def test_removed_or_inactive_agents_are_dropped(self, service, cache):
+        """Test unregistering an agent, or a status other than active, evicts it"""
+        service.register_agent(make_record("a"))
+        service.register_agent(make_record("b"))
+        cache.resolve("a")
+        cache.resolve("b")
+
+        service.unregister_agent("a")
+        service.update_agent_status("b", "busy")
+
+        assert cache.get_stats()["cached_agents"] == 0
+        assert cache.resolve("a") is None and cache.resolve("b") is None
+
+    def test_capability_sets_follow_deltas(self, service, cache):
+        """Test agents join and leave cached capability sets as they register and change"""
+        service.register_agent(make_record("a", ["search"]))
+        assert self.found(cache, "search") == {"a"}
+        misses = cache.misses
+
+        service.register_agent(make_record("b", ["search", "analysis"]))
+        assert self.found(cache, "search") == {"a", "b"}
+
+        service.update_agent("a", {"capabilities": ["analysis"]})
+        assert self.found(cache, "search") == {"b"}
+
+        service.unregister_agent("b")
+        assert self.found(cache, "search") == set()
+        assert cache.misses == misses
+
+    def test_resync_drops_everything(self, service, cache):
+        """Test a resync delta (changes were dropped) makes every lookup query again"""
+        service.register_agent(make_record("a", ["search"]))
+        cache.resolve("a")
+        cache.find(["search"])
+
+        cache._on_change(RegistryChange(service.revision, "resync"))
+
+        assert cache.get_stats()["cached_agents"] == 0
+        assert cache.get_stats()["cached_capabilities"] == 0
+
+    def test_closed_cache_stops_receiving_deltas(self, service, cache):
+        """Test a closed cache is no longer notified"""
+        service.register_agent(make_record("a"))
+        cache.resolve("a")
+        cache.close()
+
+        service.unregister_agent("a")
+        assert cache.get_stats()["deltas"] == 1
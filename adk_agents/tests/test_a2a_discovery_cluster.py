@@ -0,0 +1,118 @@
+"""
+Tests for the sharded, replicated A2A discovery cluster
+"""
+
+import asyncio
+
+import aiohttp
+import pytest
+
+from adk_agents.a2a.core.discovery import AgentRecord, ServiceQuery
+from adk_agents.a2a.core.discovery_cluster import (
+    ClusterConfig, DiscoveryClusterClient, HashRing, LocalCluster, _parse_query
+)
+
+
+def make_record(i: int) -> AgentRecord:
+    return AgentRecord(
+        agent_id=f"agent-{i}",
+        agent_did=f"did:a2a:agent-{i}",
+        capabilities=["a2a:messaging", f"capability-{i % 3}"],
+        endpoints=[f"http://127.0.0.1:{9000 + i}/a2a"],
+        metadata={},
+    )
+
+
+class TestHashRing:
+    """Test cases for key placement"""
+
+    def test_replicas_are_distinct_nodes(self):
+        """Test each key maps to replication-factor different nodes, stably"""
+        ring = HashRing(["a", "b", "c"])
+        for i in range(100):
+            replicas = ring.replicas(f"agent-{i}", 2)
+            assert len(set(replicas)) == 2
+            assert replicas == HashRing(["a", "b", "c"]).replicas(f"agent-{i}", 2)
+
+
+class TestClusterConfig:
+    """Test cases for the cluster layout"""
+
+    def test_default_write_quorum_is_a_majority(self):
+        """Test any two writes that reach the default quorum share a replica"""
+        nodes = [f"http://127.0.0.1:{8700 + i}" for i in range(5)]
+        quorums = {r: ClusterConfig(nodes, replication_factor=r).quorum for r in range(1, 6)}
+
+        assert quorums == {1: 1, 2: 2, 3: 2, 4: 3, 5: 3}
+        assert all(2 * q > r for r, q in quorums.items())
+        assert ClusterConfig(nodes, replication_factor=3, write_quorum=1).quorum == 1
+
+
+class TestQueryParsing:
+    """Test cases for query bodies received by a node"""
+
+    def test_valid_query(self):
+        """Test a client's query round-trips, with null status kept"""
+        query = _parse_query({"capabilities": ["a2a:analysis"], "agent_id": None, "status": None,
+                              "max_results": 10, "include_metadata": True, "fields": None})
+        assert query == ServiceQuery(capabilities=["a2a:analysis"], status=None, max_results=10,
+                                     include_metadata=True)
+
+    @pytest.mark.parametrize("data", [
+        ["agent-1"],
+        {"agent_id": "agent-1", "__class__": "x"},
+        {"capabilities": "a2a:analysis"},
+        {"capabilities": [1]},
+        {"status": 3},
+        {"max_results": "10"},
+        {"max_results": 0},
+        {"max_results": True},
+        {"include_metadata": "yes"},
+    ])
+    def test_invalid_query_is_rejected(self, data):
+        """Test unknown fields and wrongly typed values are refused"""
+        with pytest.raises(ValueError):
+            _parse_query(data)
+
+
+class TestLocalCluster:
+    """Test cases against a local three-node cluster of server processes"""
+
+    def test_register_lookup_and_node_down(self, tmp_path):
+        """Test records stay readable and writable with one of three nodes down"""
+
+        async def run():
+            cluster = LocalCluster(3, 3, registry_dir=str(tmp_path), log_level="ERROR")
+            config = await cluster.start()
+            client = DiscoveryClusterClient(config)
+            try:
+                records = [make_record(i) for i in range(12)]
+                for record in records:
+                    assert await client.register_agent(record)
+
+                found = await client.get_agent_record("agent-5")
+                assert found is not None and found.endpoints == records[5].endpoints
+
+                async with aiohttp.ClientSession() as session:
+                    async with session.post(f"{config.nodes[0]}/discovery/query",
+                                            json={"max_results": "all"}) as response:
+                        assert response.status == 400
+
+                cluster.stop_node(config.nodes[0])
+
+                for record in records:
+                    assert (await client.get_agent_record(record.agent_id)) is not None
+                agents = await client.discover_agents(ServiceQuery(capabilities=["capability-1"]))
+                assert {a.agent_id for a in agents} == {f"agent-{i}" for i in range(1, 12, 3)}
+
+                # Writes still reach a quorum (two of three) of each key's replicas
+                assert await client.register_agent(make_record(12))
+                assert await client.update_agent_status("agent-3", "busy")
+                assert (await client.get_agent_record("agent-3")).status == "busy"
+                assert await client.unregister_agent("agent-4")
+                assert await client.get_agent_record("agent-4") is None
+            finally:
+                await client.close()
+                await cluster.stop()
+
+        asyncio.run(run())
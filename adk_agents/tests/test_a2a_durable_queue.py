@@ -0,0 +1,145 @@
+"""
+Tests for the A2A durable message queue
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from adk_agents.a2a.core.durable_queue import DurableMessageQueue, DurableQueueConfig
+from adk_agents.a2a.core.messaging import Message
+
+
+def make_message(i: int, receiver: str = "worker") -> Message:
+    return Message(
+        message_id=f"m{i}",
+        sender_id="client",
+        receiver_id=receiver,
+        message_type="task",
+        payload={"n": i},
+        timestamp=datetime.utcnow(),
+    )
+
+
+class TestDurableMessageQueue:
+    """Test cases for crash recovery and replay"""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Queue configuration with a small memory bound"""
+        return DurableQueueConfig(storage_path=str(tmp_path / "queue"), max_size=10)
+
+    def test_unacknowledged_messages_survive_crash(self, config):
+        """Test records are replayed by a new queue when the old one was never closed"""
+        queue = DurableMessageQueue(config)
+        for i in range(5):
+            queue.enqueue(make_message(i))
+        queue.flush()
+
+        delivered = queue.get_messages_for_agent("worker")
+        queue.ack(delivered[0])
+        queue.ack(delivered[1])
+        queue.flush()
+
+        recovered = DurableMessageQueue(config)
+        assert [m.message_id for m in recovered.get_messages_for_agent("worker")] == ["m2", "m3", "m4"]
+        recovered.close()
+
+    def test_torn_tail_is_truncated(self, config):
+        """Test a partially written last record is dropped on replay"""
+        queue = DurableMessageQueue(config)
+        for i in range(3):
+            queue.enqueue(make_message(i))
+        queue.close()
+
+        with open(queue.active_segment.log_path, "ab") as f:
+            f.write(b"\x00\x00\x00")
+
+        recovered = DurableMessageQueue(config)
+        assert recovered.size() == 3
+        recovered.enqueue(make_message(3))
+        recovered.close()
+
+        assert DurableMessageQueue(config).size() == 4
+
+    def test_replay_overflow_resumes_in_order(self, config):
+        """Test a backlog larger than memory is replayed in log order as the queue drains"""
+        queue = DurableMessageQueue(config)
+        for i in range(10):
+            queue.enqueue(make_message(i))
+        config.max_size = 4
+        queue.close()
+
+        recovered = DurableMessageQueue(config)
+        assert recovered.size() == 4
+        assert not recovered.enqueue(make_message(10))
+
+        first = recovered.dequeue()
+        recovered.ack(first)
+        seen = [first.message_id]
+
+        # Enqueued while the backlog is pending: delivered after it
+        assert recovered.enqueue(make_message(10))
+
+        while True:
+            message = recovered.dequeue()
+            if message is None:
+                break
+            seen.append(message.message_id)
+            recovered.ack(message)
+
+        assert seen == [f"m{i}" for i in range(11)]
+        recovered.close()
+
+        assert DurableMessageQueue(config).size() == 0
+
+    def test_watermark_stays_below_backlog(self, config):
+        """Test acknowledging replayed messages does not acknowledge the backlog"""
+        queue = DurableMessageQueue(config)
+        for i in range(10):
+            queue.enqueue(make_message(i))
+        config.max_size = 4
+        queue.close()
+
+        recovered = DurableMessageQueue(config)
+        for message in recovered.queue[:2]:
+            recovered.ack(message)
+        recovered.close()
+
+        assert DurableMessageQueue(config).size() == 4
+        config.max_size = 100
+        assert [m.message_id for m in DurableMessageQueue(config).queue] == [f"m{i}" for i in range(2, 10)]
+
+    def test_recorded_delivery_is_replayed_until_acked(self, config):
+        """Test messages handed straight to a consumer are replayed as verified until acked"""
+        queue = DurableMessageQueue(config)
+        kept, handled = make_message(1), make_message(2)
+        queue.record_delivered(kept)
+        queue.record_delivered(handled)
+        queue.ack(handled)
+        queue.close()
+
+        recovered = DurableMessageQueue(config)
+        assert [m.message_id for m in recovered.queue] == ["m1"]
+        assert recovered.verified == {"m1"}
+        recovered.close()
+
+    def test_group_commit_runs_on_flush_task(self, config):
+        """Test reaching the fsync batch wakes the flush task instead of syncing inline"""
+        config.fsync_batch = 4
+
+        async def run():
+            queue = DurableMessageQueue(config)
+            queue.start()
+            flushes = []
+            queue.flush = lambda: flushes.append(True)
+            for i in range(4):
+                queue.enqueue(make_message(i))
+            assert not flushes
+            await asyncio.sleep(0.01)
+            assert queue._unsynced == 0
+            del queue.flush
+            queue.close()
+
+        asyncio.run(run())
@@ -0,0 +1,187 @@
+"""
+Tests for A2A credit-based flow control
+"""
+
+import socket
+import asyncio
+from datetime import datetime
+
+import aiohttp
+import pytest
+
+from adk_agents.a2a.core.flow_control import CREDIT_WINDOW_HEADER, CreditManager, SendWindow
+from adk_agents.a2a.core.messaging import Message
+from adk_agents.a2a.core.transport import HTTP2Transport, TransportConfig
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestCreditManager:
+    """Test cases for receiver-side credits"""
+
+    def test_window_is_enforced_and_refilled(self):
+        """Test a sender over its window is refused until a credit is released"""
+        credits = CreditManager(credit_window=2)
+        assert credits.try_acquire("alice", "task")
+        assert credits.try_acquire("alice", "task")
+        assert not credits.try_acquire("alice", "task")
+        assert credits.try_acquire("bob", "task")
+
+        credits.release("alice", "task")
+        assert credits.try_acquire("alice", "task")
+        assert credits.get_metrics()["rejected"] == 1
+
+    def test_window_shrinks_near_capacity(self):
+        """Test the advertised window shrinks to what the receiver can still take"""
+        credits = CreditManager(credit_window=8, max_inflight=10)
+        for _ in range(8):
+            assert credits.try_acquire("alice", "task")
+
+        assert credits.window_for("bob") == 2
+
+    def test_only_authenticated_control_traffic_bypasses(self):
+        """Test heartbeats bypass the window for authenticated peers only, and pings never do"""
+        credits = CreditManager(credit_window=1)
+        assert credits.try_acquire("alice", "task")
+        assert credits.try_acquire("alice", "heartbeat")
+        assert not credits.try_acquire("alice", "ping")
+
+        assert credits.try_acquire("", "task")
+        assert not credits.try_acquire("", "heartbeat")
+
+
+class TestSendWindow:
+    """Test cases for sender-side credits"""
+
+    def test_queued_send_waits_for_credit(self):
+        """Test a send over the window waits until a credit comes back"""
+
+        async def run():
+            window = SendWindow(initial_window=1)
+            assert await window.acquire("bob", "task")
+
+            waiting = asyncio.create_task(window.acquire("bob", "task", timeout=1))
+            await asyncio.sleep(0.01)
+            assert not waiting.done()
+
+            window.release("bob", "task")
+            assert await waiting
+            return window.get_metrics()
+
+        metrics = asyncio.run(run())
+        assert metrics["stalls"] == 1 and metrics["outstanding"] == {"bob": 1}
+
+    def test_shed_policy_and_queue_bound(self):
+        """Test sends are dropped when shedding or when too many are queued"""
+
+        async def run():
+            shedding = SendWindow(initial_window=1, policy="shed")
+            assert await shedding.acquire("bob", "task")
+            assert not await shedding.acquire("bob", "task")
+
+            queueing = SendWindow(initial_window=1, max_queued=1)
+            assert await queueing.acquire("bob", "task")
+            waiting = asyncio.create_task(queueing.acquire("bob", "task", timeout=1))
+            await asyncio.sleep(0)
+            assert not await queueing.acquire("bob", "task")
+            queueing.release("bob", "task")
+            assert await waiting
+            return shedding.shed, queueing.shed
+
+        assert asyncio.run(run()) == (1, 1)
+
+    def test_larger_window_grants_queued_sends(self):
+        """Test a larger advertised window hands credits to waiting sends"""
+
+        async def run():
+            window = SendWindow(initial_window=1)
+            assert await window.acquire("bob", "task")
+            waiting = asyncio.create_task(window.acquire("bob", "task", timeout=1))
+            await asyncio.sleep(0)
+
+            window.update_window("bob", 4)
+            return await waiting
+
+        assert asyncio.run(run())
+
+
+class TestReceiverCredits:
+    """Test cases for credits enforced by the HTTP server"""
+
+    @pytest.fixture
+    def port(self):
+        return free_port()
+
+    def test_over_window_gets_429_with_window_header(self, port):
+        """Test a peer over its window gets 429 whatever sender or type it claims"""
+
+        async def run():
+            transport = HTTP2Transport(TransportConfig(host="127.0.0.1", port=port, ssl_enabled=False,
+                                                       credit_window=1))
+            transport.peer_resolver = {"token-a": "alice"}.get
+            release = asyncio.Event()
+
+            async def handler(message, auth_token):
+                await release.wait()
+                return {"status": "processed"}
+
+            transport.register_handler("/a2a/message", handler)
+            await transport.start_server()
+
+            url = f"http://127.0.0.1:{port}/a2a/message"
+
+            async def post(session, sender, message_type):
+                message = Message("", sender, "bob", message_type, {}, datetime.utcnow())
+                headers = {"Authorization": "Bearer token-a", "A2A-Sender": sender,
+                           "A2A-Message-Type": message_type}
+                async with session.post(url, json=message.to_dict(), headers=headers) as response:
+                    return response.status, response.headers.get(CREDIT_WINDOW_HEADER)
+
+            try:
+                async with aiohttp.ClientSession() as session:
+                    first = asyncio.create_task(post(session, "alice", "task"))
+                    await asyncio.sleep(0.1)
+
+                    throttled = [await post(session, "alice", "task"),
+                                 await post(session, "someone-else", "task"),
+                                 await post(session, "alice", "ping")]
+
+                    release.set()
+                    accepted = await first
+                    refilled = await post(session, "alice", "task")
+                    return throttled, accepted, refilled
+            finally:
+                await transport.runner.cleanup()
+
+        throttled, accepted, refilled = asyncio.run(run())
+        assert throttled == [(429, "1")] * 3
+        assert accepted == (200, "1")
+        assert refilled == (200, "1")
+
+    def test_type_header_must_match_message(self, port):
+        """Test a message labelled as control traffic in the header only is refused"""
+
+        async def run():
+            transport = HTTP2Transport(TransportConfig(host="127.0.0.1", port=port, ssl_enabled=False))
+            transport.peer_resolver = {"token-a": "alice"}.get
+
+            async def handler(message, auth_token):
+                return {"status": "processed"}
+
+            transport.register_handler("/a2a/message", handler)
+            await transport.start_server()
+            try:
+                message = Message("", "alice", "bob", "task", {}, datetime.utcnow())
+                async with aiohttp.ClientSession() as session:
+                    async with session.post(f"http://127.0.0.1:{port}/a2a/message", json=message.to_dict(),
+                                            headers={"Authorization": "Bearer token-a",
+                                                     "A2A-Message-Type": "heartbeat"}) as response:
+                        return response.status
+            finally:
+                await transport.runner.cleanup()
+
+        assert asyncio.run(run()) == 400
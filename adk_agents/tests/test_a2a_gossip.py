@@ -0,0 +1,117 @@
+"""
+Tests for SWIM gossip membership between nodes on localhost
+"""
+
+import asyncio
+
+from adk_agents.a2a.core.gossip import ALIVE, DEAD, GossipConfig, GossipNode
+
+
+def fast_config(**overrides) -> GossipConfig:
+    """Protocol timings short enough for a test run"""
+    # In a group this small an update's few retransmissions can all go to nodes
+    # that already have it; push-pull repairs that, as it does in production
+    settings = dict(protocol_period=0.05, probe_timeout=0.02, suspicion_mult=2, sync_interval=0.5)
+    settings.update(overrides)
+    return GossipConfig(**settings)
+
+
+async def wait_until(predicate, timeout: float = 5.0) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.02)
+    return True
+
+
+async def start_group(count: int, config: GossipConfig):
+    nodes = [GossipNode(f"node-{i}", config) for i in range(count)]
+    for node in nodes:
+        await node.start()
+    for node in nodes[1:]:
+        assert await node.join([nodes[0].address])
+    return nodes
+
+
+def states(node: GossipNode):
+    return {node_id: member.state for node_id, member in node.members.items()}
+
+
+def converged(nodes, expected):
+    return all(states(node) == expected for node in nodes)
+
+
+class TestGossipNode:
+    """Test cases for membership and record dissemination over UDP"""
+
+    def test_join_converges_and_spreads_records(self):
+        """Test every node learns every member and every published record"""
+
+        async def run():
+            nodes = await start_group(4, fast_config())
+            try:
+                expected = {node.node_id: ALIVE for node in nodes}
+                assert await wait_until(lambda: converged(nodes, expected))
+
+                nodes[2].publish({"agent_id": "worker", "capabilities": ["a2a:analysis"]})
+                assert await wait_until(lambda: all("worker" in node.agents for node in nodes))
+
+                nodes[2].publish({"agent_id": "worker", "capabilities": ["a2a:search"]})
+                assert await wait_until(lambda: all(
+                    node.agents["worker"][2]["capabilities"] == ["a2a:search"] for node in nodes))
+
+                nodes[2].withdraw("worker")
+                assert await wait_until(lambda: all("worker" not in node.agents for node in nodes))
+            finally:
+                for node in nodes:
+                    await node.stop(leave=False)
+
+        asyncio.run(run())
+
+    def test_crashed_node_is_suspected_then_dead(self):
+        """Test a node that stops answering is suspected, declared dead and its records dropped"""
+
+        async def run():
+            nodes = await start_group(4, fast_config())
+            survivors = nodes[:3]
+            try:
+                assert await wait_until(lambda: converged(nodes, {node.node_id: ALIVE for node in nodes}))
+                nodes[3].publish({"agent_id": "worker"})
+                assert await wait_until(lambda: all("worker" in node.agents for node in survivors))
+
+                await nodes[3].stop(leave=False)
+
+                assert await wait_until(lambda: all(
+                    states(node).get("node-3") == DEAD for node in survivors))
+                assert sum(node.stats["suspicions"] for node in survivors) > 0
+                assert all("worker" not in node.agents for node in survivors)
+                assert all(states(node)[node.node_id] == ALIVE for node in survivors)
+            finally:
+                for node in survivors:
+                    await node.stop(leave=False)
+
+        asyncio.run(run())
+
+    def test_graceful_leave_skips_suspicion(self):
+        """Test a node that leaves is marked dead at once rather than after a suspicion timeout"""
+
+        async def run():
+            # Suspicion alone would take far longer than the wait below
+            nodes = await start_group(4, fast_config(suspicion_mult=1000))
+            survivors = nodes[:3]
+            try:
+                assert await wait_until(lambda: converged(nodes, {node.node_id: ALIVE for node in nodes}))
+                nodes[3].publish({"agent_id": "worker"})
+                assert await wait_until(lambda: all("worker" in node.agents for node in survivors))
+
+                await nodes[3].stop(leave=True)
+
+                assert await wait_until(lambda: all(
+                    states(node).get("node-3") == DEAD for node in survivors), timeout=2)
+                assert all("worker" not in node.agents for node in survivors)
+            finally:
+                for node in survivors:
+                    await node.stop(leave=False)
+
+        asyncio.run(run())
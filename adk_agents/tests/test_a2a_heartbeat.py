@@ -0,0 +1,69 @@
+"""
+Tests for batched A2A heartbeats
+"""
+
+import asyncio
+
+from adk_agents.a2a.core.heartbeat import HeartbeatAggregator
+from adk_agents.a2a.core.load_balancing import AgentLoad
+
+
+class SlowDiscovery:
+    """Async discovery client whose batch requests take a while"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.updates = []
+        self.heartbeats = []
+
+    async def apply_updates(self, updates):
+        await asyncio.sleep(self.delay)
+        self.updates.append(updates)
+        return []
+
+    async def heartbeat_many(self, loads):
+        await asyncio.sleep(self.delay)
+        self.heartbeats.append(loads)
+        return []
+
+
+class TestHeartbeatAggregator:
+    """Test cases for delta and heartbeat batching"""
+
+    def test_stop_finishes_batch_in_flight(self):
+        """Test stopping while a batch is being sent does not lose its updates"""
+
+        async def run():
+            discovery = SlowDiscovery()
+            aggregator = HeartbeatAggregator(discovery, interval=0.01)
+            aggregator.add_agent("worker", lambda: AgentLoad(1, 0, 0.1))
+            aggregator.update_agent("worker", {"status": "busy"})
+            aggregator.start()
+
+            await asyncio.sleep(0.03)  # The first batch is in flight
+            await aggregator.stop()
+            return discovery
+
+        discovery = asyncio.run(run())
+        assert discovery.updates[0] == {"worker": {"status": "busy"}}
+
+    def test_cancelled_flush_requeues_updates(self):
+        """Test updates taken by a cancelled flush are sent with the next batch"""
+
+        async def run():
+            discovery = SlowDiscovery()
+            aggregator = HeartbeatAggregator(discovery, interval=3600)
+            aggregator.update_agent("worker", {"status": "busy"})
+
+            flush = asyncio.create_task(aggregator.flush())
+            await asyncio.sleep(0.01)
+            aggregator.update_agent("worker", {"capabilities": ["a2a:analysis"]})
+            flush.cancel()
+            await asyncio.gather(flush, return_exceptions=True)
+
+            assert aggregator.get_stats()["queued_updates"] == 1
+            await aggregator.flush()
+            return discovery
+
+        discovery = asyncio.run(run())
+        assert discovery.updates == [{"worker": {"status": "busy", "capabilities": ["a2a:analysis"]}}]
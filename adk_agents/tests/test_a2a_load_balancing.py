@@ -0,0 +1,88 @@
+"""
+Tests for load-aware agent selection
+"""
+
+import random
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from adk_agents.a2a.core.load_balancing import AgentLoad, AgentSelector
+
+
+def candidates(*agent_ids):
+    return [SimpleNamespace(agent_id=agent_id) for agent_id in agent_ids]
+
+
+class TestAgentSelector:
+    """Test cases for the selection strategies"""
+
+    def test_unknown_strategy_is_rejected(self):
+        """Test a misspelt strategy fails at construction"""
+        with pytest.raises(ValueError):
+            AgentSelector(lambda agent_id: None, strategy="round_robin")
+
+    def test_power_of_two_never_picks_the_most_loaded(self):
+        """Test the busiest agent loses every comparison it is sampled into"""
+        loads = {"a": AgentLoad(1, 0, 0.1), "b": AgentLoad(2, 0, 0.1),
+                 "c": AgentLoad(3, 0, 0.1), "d": AgentLoad(20, 0, 0.1)}
+        selector = AgentSelector(loads.get, "power_of_two", rng=random.Random(7))
+
+        picks = Counter(selector.select(candidates(*loads)).agent_id for _ in range(500))
+
+        assert picks["d"] == 0
+        assert picks["a"] > picks["b"] > picks["c"] > 0
+
+    def test_least_loaded_weighs_pending_by_latency(self):
+        """Test the expected wait, not the task count alone, decides"""
+        loads = {"fast": AgentLoad(3, 1, 0.1), "slow": AgentLoad(1, 0, 1.0)}
+        selector = AgentSelector(loads.get, "least_loaded")
+
+        # fast: (4 + 1) x 0.1 = 0.5s, slow: (1 + 1) x 1.0 = 2s
+        assert selector.select(candidates("fast", "slow")).agent_id == "fast"
+
+    def test_own_assignments_count_until_the_next_report(self):
+        """Test tasks assigned since an agent's last heartbeat spread the load"""
+        loads = {"a": AgentLoad(0, 0, 0.1), "b": AgentLoad(0, 0, 0.1)}
+        selector = AgentSelector(loads.get, "least_loaded")
+
+        picked = []
+        for _ in range(6):
+            agent_id = selector.select(candidates("a", "b")).agent_id
+            selector.acquire(agent_id)
+            picked.append(agent_id)
+        assert Counter(picked) == {"a": 3, "b": 3}
+
+        # A fresh report includes those tasks; b has since finished its own
+        loads["a"] = AgentLoad(3, 0, 0.1)
+        loads["b"] = AgentLoad(0, 0, 0.1)
+        for _ in range(3):
+            selector.release("b")
+        assert selector.pending("a") == 3 and selector.pending("b") == 0
+        assert selector.select(candidates("a", "b")).agent_id == "b"
+
+    def test_affinity_is_stable_per_key(self):
+        """Test a key maps to the same agent, and removing another agent does not move it"""
+        selector = AgentSelector(lambda agent_id: None, "affinity")
+        agents = candidates("a", "b", "c", "d")
+
+        owners = {f"workflow-{i}": selector.select(agents, key=f"workflow-{i}").agent_id for i in range(200)}
+        assert len(set(owners.values())) == 4
+
+        for key, owner in owners.items():
+            remaining = [c for c in agents if c.agent_id == owner or c.agent_id != "d"]
+            assert selector.select(remaining, key=key).agent_id == owner
+
+    def test_affinity_skips_overloaded_owner(self):
+        """Test a key's preferred agent is passed over while it is above the load bound"""
+        loads = {}
+        selector = AgentSelector(lambda agent_id: loads.get(agent_id), "affinity", affinity_slack=0.25)
+        agents = candidates("a", "b", "c", "d")
+        owner = selector.select(agents, key="workflow").agent_id
+
+        loads[owner] = AgentLoad(10, 0, 0.1)
+        assert selector.select(agents, key="workflow").agent_id != owner
+
+        loads[owner] = AgentLoad(0, 0, 0.1)
+        assert selector.select(agents, key="workflow").agent_id == owner
@@ -0,0 +1,120 @@
+"""
+Tests for A2A message queueing and delivery
+"""
+
+import os
+import time
+import asyncio
+from datetime import datetime
+
+from adk_agents.a2a.core.messaging import (
+    EncryptedMessage, Message, MessageEncryptor, MessageInbox, MessageQueue
+)
+
+
+def make_message(i: int, receiver: str = "worker", ttl: int = None) -> Message:
+    return Message(
+        message_id=f"m{i}",
+        sender_id="client",
+        receiver_id=receiver,
+        message_type="task",
+        payload={"n": i},
+        timestamp=datetime.utcnow(),
+        ttl=ttl,
+    )
+
+
+class TestMessageQueue:
+    """Test cases for the indexed in-memory queue"""
+
+    def test_dequeue_does_not_leak_expiry_entries(self):
+        """Test dequeued messages with a TTL do not accumulate in the expiry heap"""
+        queue = MessageQueue(max_size=10)
+        for i in range(5):
+            queue.enqueue(make_message(i, ttl=60))
+
+        for i in range(5, 20005):
+            queue.enqueue(make_message(i, ttl=60))
+            queue.dequeue()
+
+        assert queue.size() == 5
+        assert len(queue._expiry) <= 2 * queue.size() + 64
+        assert [m.message_id for m in queue.queue] == [f"m{i}" for i in range(20000, 20005)]
+
+
+class TestEncryptedMessage:
+    """Test cases for the binary frame format"""
+
+    def test_frame_round_trip_keeps_utc_timestamp(self, monkeypatch):
+        """Test a frame's timestamp survives a round trip outside the UTC time zone"""
+        monkeypatch.setenv("TZ", "America/New_York")
+        time.tzset()
+        try:
+            encrypted = EncryptedMessage(
+                ciphertext=os.urandom(48),
+                nonce=os.urandom(12),
+                sender_id="client",
+                receiver_id="worker",
+                timestamp=datetime(2026, 1, 15, 12, 30, 45, 123456),
+                metadata={"session_id": "client:worker", "epoch": 2},
+            )
+            parsed = EncryptedMessage.from_frame(encrypted.to_frame())
+        finally:
+            monkeypatch.delenv("TZ")
+            time.tzset()
+
+        assert parsed.timestamp == encrypted.timestamp
+        assert bytes(parsed.ciphertext) == encrypted.ciphertext
+        assert parsed.metadata == encrypted.metadata
+
+
+class TestMessageEncryptor:
+    """Test cases for AES-GCM message encryption"""
+
+    def test_ciphertexts_do_not_share_buffers(self):
+        """Test a message encrypted earlier still decrypts after later messages were encrypted"""
+        encryptor = MessageEncryptor()
+        key = os.urandom(32)
+        first = encryptor.encrypt_message(make_message(1), key)
+        for i in range(2, 5):
+            encryptor.encrypt_message(make_message(i), key)
+
+        decrypted = encryptor.decrypt_message(first, key)
+        assert decrypted is not None and decrypted.payload == {"n": 1}
+
+
+class TestMessageInbox:
+    """Test cases for the event-driven inbox"""
+
+    def test_waiter_receives_delivery(self):
+        """Test a waiting consumer is handed a message delivered later"""
+
+        async def run():
+            inbox = MessageInbox()
+            waiter = asyncio.create_task(inbox.get("worker", "task", timeout=1))
+            await asyncio.sleep(0)
+            assert inbox.deliver(make_message(1))
+            return await waiter
+
+        assert asyncio.run(run()).message_id == "m1"
+
+    def test_closed_receiver_does_not_block(self):
+        """Test reads after close return None at once and deliveries are dropped"""
+
+        async def run():
+            inbox = MessageInbox()
+            inbox.deliver(make_message(1))
+            waiter = asyncio.create_task(inbox.get("worker"))
+            inbox.close("worker")
+
+            assert await waiter is None
+            assert await asyncio.wait_for(inbox.get("worker"), 1) is None
+            assert not inbox.deliver(make_message(2))
+            assert inbox.size("worker") == 0
+            assert [m async for m in inbox.iterate("worker")] == []
+
+            inbox.reopen("worker")
+            assert inbox.deliver(make_message(3))
+            assert (await inbox.get("worker", timeout=1)).message_id == "m3"
+
+        asyncio.run(run())
@@ -0,0 +1,120 @@
+"""
+Tests for A2A session handshakes and the key ratchet
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from adk_agents.a2a.core.auth import AuthenticationManager
+from adk_agents.a2a.core.identity import IdentityManager
+from adk_agents.a2a.core.messaging import Message, MessagingService, SessionHandshake
+from adk_agents.a2a.core.sessions import KeyExchange
+
+
+class TestSessions:
+    """Test cases for session establishment and key rotation"""
+
+    @pytest.fixture
+    def identity_manager(self, tmp_path):
+        """Identities for an initiator and a responder"""
+        manager = IdentityManager(str(tmp_path / "identities"))
+        manager.create_identity(["a2a:messaging"], agent_id="alice")
+        manager.create_identity(["a2a:messaging"], agent_id="bob")
+        manager.create_identity(["a2a:messaging"], agent_id="mallory")
+        return manager
+
+    @pytest.fixture
+    def messaging(self, identity_manager):
+        """Messaging service serving both agents"""
+        return MessagingService(identity_manager, AuthenticationManager(identity_manager))
+
+    @pytest.fixture
+    def session(self, messaging):
+        """An established session from alice to bob"""
+        session_id = messaging.create_session("alice", "bob")
+        assert session_id is not None
+        return messaging.sessions.get(session_id)
+
+    def mac_message(self, messaging, session, epoch: int, mac_key: bytes) -> Message:
+        message = Message(
+            message_id="",
+            sender_id="alice",
+            receiver_id="bob",
+            message_type="task",
+            payload={"amount": 100},
+            timestamp=datetime.utcnow(),
+            metadata={"session_id": session.session_id, "epoch": epoch},
+        )
+        message.metadata["mac"] = messaging.signer.mac_message(message, mac_key)
+        return message
+
+    def test_receiver_ratchets_to_sender_epoch(self, messaging, session):
+        """Test a message from a later epoch verifies and moves the session forward"""
+        keys = session.keys_for(3, messaging.session_config.max_epoch_skip)
+        message = self.mac_message(messaging, session, 3, keys.mac_key)
+
+        assert session.epoch == 0
+        assert messaging.verify_message(message)
+        assert session.epoch == 3
+        assert session.current.key == keys.key
+
+    def test_forged_epoch_does_not_ratchet(self, messaging, session):
+        """Test a message with a bad MAC and a later epoch leaves the session's keys alone"""
+        held = [keys.key for keys in session.all_keys()]
+        message = self.mac_message(messaging, session, 60, b"\x00" * 32)
+
+        assert not messaging.verify_message(message)
+        assert session.epoch == 0
+        assert [keys.key for keys in session.all_keys()] == held
+
+        # Messages on the current key still verify
+        message = self.mac_message(messaging, session, 0, session.current.mac_key)
+        assert messaging.verify_message(message)
+
+    def test_epoch_beyond_skip_is_rejected(self, messaging, session):
+        """Test the receiver does not derive keys further ahead than max_epoch_skip"""
+        assert session.keys_for(messaging.session_config.max_epoch_skip + 1,
+                                messaging.session_config.max_epoch_skip) is None
+
+    def test_replayed_offer_is_rejected(self, messaging, session):
+        """Test accepting the same signed offer twice does not replace the session"""
+        offer = messaging.offer_session("alice", "bob")
+        assert messaging.accept_session(offer) is not None
+        current = messaging.sessions.get(offer.session_id)
+
+        assert messaging.accept_session(offer) is None
+        assert messaging.sessions.get(offer.session_id) is current
+
+    def test_stale_offer_is_rejected(self, messaging, session):
+        """Test an offer signed long ago is rejected even with a valid signature"""
+        offer = messaging.offer_session("alice", "bob")
+        offer.timestamp = datetime.utcnow() - timedelta(
+            seconds=messaging.session_config.handshake_max_age + 60
+        )
+        assert messaging.signer.sign_handshake(offer)
+
+        assert messaging.accept_session(offer) is None
+        assert messaging.sessions.get(offer.session_id) is session
+
+    def test_answer_from_wrong_responder_is_rejected(self, identity_manager, messaging):
+        """Test an answer signed by a third party does not complete an offer made to bob"""
+        offer = messaging.offer_session("alice", "bob")
+
+        forged = SessionHandshake(
+            session_id=offer.session_id,
+            initiator_id="alice",
+            responder_id="mallory",
+            public_key=KeyExchange().public_key,
+            timestamp=datetime.utcnow(),
+            role="answer",
+        )
+        assert messaging.signer.sign_handshake(forged)
+
+        assert not messaging.complete_session(forged)
+        assert messaging.sessions.get(offer.session_id) is None
+
+        # The real responder can still answer
+        bob = MessagingService(identity_manager, AuthenticationManager(identity_manager))
+        assert messaging.complete_session(bob.accept_session(offer))
+        assert messaging.sessions.get(offer.session_id).responder_id == "bob"